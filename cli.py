@@ -1,8 +1,13 @@
 from sgbdr.sgbdr import SGBDR
+from sgbdr.utils import to_text
+from itertools import islice
 import readline
 import os
 from pathlib import Path
 
+# Lignes de LOOT affichées par tableau : le résultat est consommé et affiché au fil de l'eau
+PAGE_SIZE = 100
+
 def format_table(data):
     """Formater les résultats de LOOT en tableau ASCII"""
     if not data:
@@ -11,7 +16,7 @@ def format_table(data):
     # Obtenir les colonnes à partir du premier enregistrement
     columns = list(data[0].keys())
     # Calculer la largeur max de chaque colonne
-    widths = {col: max(len(col), max((len(str(row.get(col, ''))) for row in data), default=0)) for col in columns}
+    widths = {col: max(len(col), max((len(to_text(row.get(col, ''))) for row in data), default=0)) for col in columns}
     
     # Construire le tableau
     table = []
@@ -24,13 +29,24 @@ def format_table(data):
     table.append(f"╠{'═' * (sum(widths.values()) + len(columns) * 3 + 1)}╣")
     # Lignes de données
     for row in data:
-        line = "│" + "".join(f" {str(row.get(col, '')):<{widths[col]}}  │" for col in columns)
+        line = "│" + "".join(f" {to_text(row.get(col, '')):<{widths[col]}}  │" for col in columns)
         table.append(line)
     # Ligne inférieure
     table.append(f"╚{'═' * (sum(widths.values()) + len(columns) * 3 + 1)}╝")
     
     return "\n".join(table)
 
+def print_rows(rows):
+    """Afficher les lignes d'un LOOT page par page, sans attendre (ni garder) tout le résultat"""
+    rows = iter(rows)
+    page = list(islice(rows, PAGE_SIZE))
+    if not page:
+        print(format_table(page))
+        return
+    while page:
+        print(format_table(page))
+        page = list(islice(rows, PAGE_SIZE))
+
 def format_databases(databases):
     """Formater la liste des bases en tableau ASCII"""
     if not databases:
@@ -244,7 +260,7 @@ def run_cli():
                 print(f"║ À plus, aventurier ! La quête s’arrête ici !")
                 print(f"╚════════════════════════════════════")
                 break
-            result = dbms.execute_query(query)
+            result = dbms.stream_query(query)
             if result is not None:  # Pour LOOT, LISTE BASES, LISTE TABLEAUX, LISTE JOUEURS, LISTE PERMISSIONS JOUEUR
                 if query.upper() == "LISTE BASES":
                     print(format_databases(result))
@@ -261,8 +277,11 @@ def run_cli():
                 elif query.upper().startswith("LISTE PERMISSIONS JOUEUR"):
                     print(format_user_permissions(result))
                 
-                elif query.upper().startswith("STATS TABLEAU"):
-                    pass  # Les statistiques sont déjà affichées dans table_stat
+                elif query.upper().startswith("STATS TABLEAU") or query.upper() == "STATS CACHE":
+                    pass  # Les statistiques sont déjà affichées dans table_stat / cache_stats
+
+                elif query.upper().startswith("EXPLIQUER"):
+                    pass  # Le plan est déjà affiché par le planner
                 
                 elif query.upper() == "LISTE VUES":
                     print(format_views(result))
@@ -288,7 +307,7 @@ def run_cli():
                     print(format_databases(result))
                
                 else:  # LOOT
-                    print(format_table(result))
+                    print_rows(result)
         except ValueError as e:
             print(f"╔════════════════════════════════════")
             print(f"║  Erreur : {e}")
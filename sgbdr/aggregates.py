@@ -0,0 +1,81 @@
+# sgbdr/aggregates.py
+NUMERIC_TYPES = ("INT", "FLOAT")
+
+
+class Count:
+    """COMPTER(colonne) : valeurs non NULL ; COMPTER(*) : lignes (valeur toujours True)"""
+    __slots__ = ("count",)
+
+    def __init__(self):
+        self.count = 0
+
+    def add(self, value):
+        if value is not None:
+            self.count += 1
+
+    def result(self):
+        return self.count
+
+
+class Sum:
+    """SOMME : entière sur une colonne INT, flottante sur une colonne FLOAT"""
+    __slots__ = ("total", "count")
+
+    def __init__(self):
+        self.total = 0
+        self.count = 0
+
+    def add(self, value):
+        if value is not None:
+            self.total += value
+            self.count += 1
+
+    def result(self):
+        return self.total if self.count else None
+
+
+class Average(Sum):
+    __slots__ = ()
+
+    def result(self):
+        return self.total / self.count if self.count else None
+
+
+class Extremum:
+    """MIN / MAX : comparaison directe des valeurs stockées (nombres, booléens, dates ISO, texte)"""
+    __slots__ = ("maximum", "best")
+
+    def __init__(self, maximum):
+        self.maximum = maximum
+        self.best = None
+
+    def add(self, value):
+        if value is None:
+            return
+        if self.best is None or (value > self.best if self.maximum else value < self.best):
+            self.best = value
+
+    def result(self):
+        return self.best
+
+
+def accumulator_factory(aggregate, col_type):
+    """Fonction sans argument créant un accumulateur neuf pour chaque groupe"""
+    function = aggregate.function
+    if function == "COMPTER":
+        return Count
+    if function in ("SOMME", "MOYENNE"):
+        if col_type not in NUMERIC_TYPES:
+            raise ValueError(f"{aggregate} : {function} demande une colonne numérique (INT ou FLOAT)")
+        return Sum if function == "SOMME" else Average
+    maximum = function == "MAX"
+    return lambda: Extremum(maximum)
+
+
+def output_type(aggregate, col_type):
+    """Type de la colonne produite par un agrégat (pour AYANT et TRIER PAR)"""
+    if aggregate.function == "COMPTER":
+        return "INT"
+    if aggregate.function == "MOYENNE":
+        return "FLOAT"
+    return col_type
@@ -0,0 +1,126 @@
+# sgbdr/btree.py
+from bisect import bisect_left, bisect_right
+
+# Nombre maximal de clés par nœud avant éclatement
+DEFAULT_ORDER = 64
+
+
+class _Leaf:
+    __slots__ = ("keys", "next")
+
+    def __init__(self, keys=None):
+        self.keys = keys or []
+        self.next = None
+
+
+class _Node:
+    __slots__ = ("keys", "children")
+
+    def __init__(self, keys, children):
+        self.keys = keys
+        self.children = children
+
+
+class BPlusTree:
+    """B+tree de clés triées, feuilles chaînées pour les parcours d'intervalle.
+
+    Les clés doivent être uniques et comparables entre elles. La suppression ne fusionne
+    pas les feuilles : une feuille vidée reste dans la chaîne jusqu'à la prochaine reconstruction.
+    """
+
+    def __init__(self, order=DEFAULT_ORDER):
+        self.order = order
+        self.root = _Leaf()
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _find_leaf(self, key):
+        """Descendre jusqu'à la feuille qui contient key, en gardant le chemin parcouru"""
+        node = self.root
+        path = []
+        while isinstance(node, _Node):
+            i = bisect_right(node.keys, key)
+            path.append((node, i))
+            node = node.children[i]
+        return node, path
+
+    def insert(self, key):
+        leaf, path = self._find_leaf(key)
+        i = bisect_left(leaf.keys, key)
+        if i < len(leaf.keys) and leaf.keys[i] == key:
+            return
+        leaf.keys.insert(i, key)
+        self.size += 1
+        if len(leaf.keys) <= self.order:
+            return
+
+        # Éclater la feuille puis remonter tant que les parents débordent
+        mid = len(leaf.keys) // 2
+        right = _Leaf(leaf.keys[mid:])
+        leaf.keys = leaf.keys[:mid]
+        right.next, leaf.next = leaf.next, right
+        separator, new_child = right.keys[0], right
+        while path:
+            parent, i = path.pop()
+            parent.keys.insert(i, separator)
+            parent.children.insert(i + 1, new_child)
+            if len(parent.keys) <= self.order:
+                return
+            mid = len(parent.keys) // 2
+            separator = parent.keys[mid]
+            new_child = _Node(parent.keys[mid + 1:], parent.children[mid + 1:])
+            parent.keys = parent.keys[:mid]
+            parent.children = parent.children[:mid + 1]
+        self.root = _Node([separator], [self.root, new_child])
+
+    def delete(self, key):
+        leaf, _ = self._find_leaf(key)
+        i = bisect_left(leaf.keys, key)
+        if i < len(leaf.keys) and leaf.keys[i] == key:
+            del leaf.keys[i]
+            self.size -= 1
+
+    def iter_from(self, key=None):
+        """Clés >= key dans l'ordre (toutes les clés si key est None)"""
+        if key is None:
+            node = self.root
+            while isinstance(node, _Node):
+                node = node.children[0]
+            leaf, i = node, 0
+        else:
+            leaf, _ = self._find_leaf(key)
+            i = bisect_left(leaf.keys, key)
+        while leaf is not None:
+            keys = leaf.keys
+            while i < len(keys):
+                yield keys[i]
+                i += 1
+            leaf, i = leaf.next, 0
+
+    def __iter__(self):
+        return self.iter_from()
+
+    @classmethod
+    def bulk_load(cls, sorted_keys, order=DEFAULT_ORDER):
+        """Construire l'arbre de bas en haut à partir de clés déjà triées"""
+        tree = cls(order)
+        fill = max(order // 2, 2)
+        leaves = [_Leaf(list(sorted_keys[i:i + fill])) for i in range(0, len(sorted_keys), fill)]
+        if not leaves:
+            return tree
+        for left, right in zip(leaves, leaves[1:]):
+            left.next = right
+        tree.size = len(sorted_keys)
+        level = leaves
+        firsts = [leaf.keys[0] for leaf in leaves]
+        while len(level) > 1:
+            parents, parent_firsts = [], []
+            for i in range(0, len(level), fill + 1):
+                children = level[i:i + fill + 1]
+                parents.append(_Node(firsts[i + 1:i + len(children)], children))
+                parent_firsts.append(firsts[i])
+            level, firsts = parents, parent_firsts
+        tree.root = level[0]
+        return tree
@@ -0,0 +1,146 @@
+# sgbdr/buffer_cache.py
+import os
+import sys
+import threading
+from collections import OrderedDict
+from .rows import compact, compact_rows
+
+# Budget mémoire par défaut du cache (octets)
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+# Nombre de lignes échantillonnées pour estimer la taille d'une table décodée
+SIZE_SAMPLE = 100
+
+
+def estimate_rows_size(rows):
+    """Estimer l'empreinte mémoire d'une liste de lignes (les noms de colonnes, partagés, ne comptent pas)"""
+    if not rows:
+        return sys.getsizeof(rows)
+    sample = rows[:SIZE_SAMPLE]
+    sample_size = sum(sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row.values()) for row in sample)
+    return sys.getsizeof(rows) + sample_size * len(rows) // len(sample)
+
+
+class BufferCache:
+    """Cache LRU des tables décodées, borné en mémoire et partagé par tout le processus.
+
+    Une entrée est valide tant que la génération de la table (incrémentée à chaque écriture)
+    et la signature de son fichier (mtime, taille) n'ont pas changé.
+    Les lignes sont gardées sous forme compacte (rows.Row, en lecture seule) et partagées par les appelants.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MEMORY_BUDGET):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(storage):
+        return (os.path.abspath(storage.db_dir), storage.table_name)
+
+    def _signature(self, key, storage):
+        try:
+            stat = storage.path.stat()
+        except FileNotFoundError:
+            return None
+        return (self._generations.get(key, 0), stat.st_mtime_ns, stat.st_size)
+
+    def read(self, storage):
+        """Lire toutes les lignes d'une table, depuis le cache si possible"""
+        key = self.key_for(storage)
+        with self._lock:
+            signature = self._signature(key, storage)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        rows = list(compact_rows(storage.read_all()))
+        if signature is not None:
+            self._store(key, signature, rows)
+        return rows
+
+    def scan(self, storage):
+        """Itérable des lignes d'une table à parcourir.
+
+        Passe par le cache (read), sauf pour une table dont le fichier dépasse à lui seul le budget :
+        elle est alors lue au fil du parcours, sans jamais être entièrement en mémoire.
+        """
+        if not self.cacheable(storage):
+            with self._lock:
+                self.misses += 1
+            return (compact(row) for _, row in storage.scan())
+        return self.read(storage)
+
+    def cacheable(self, storage):
+        """Faux pour une table dont le fichier dépasse le budget et qui n'est pas en cache : à lire en flux"""
+        try:
+            file_size = storage.path.stat().st_size
+        except FileNotFoundError:
+            file_size = 0
+        return file_size <= self.max_bytes or self.peek(storage) is not None
+
+    def peek(self, storage):
+        """Lignes d'une table si elles sont en cache et à jour, sinon None (sans lecture ni compteurs)"""
+        key = self.key_for(storage)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == self._signature(key, storage):
+                return entry[1]
+        return None
+
+    def generation(self, storage):
+        """Génération d'une table : nombre d'écritures vues depuis le démarrage du processus"""
+        return self._generations.get(self.key_for(storage), 0)
+
+    def _store(self, key, signature, rows):
+        size = estimate_rows_size(rows)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (signature, rows, size)
+            self.used_bytes += size
+            while self.used_bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.used_bytes -= evicted_size
+                self.evictions += 1
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.used_bytes -= entry[2]
+
+    def bump(self, storage):
+        """Invalider une table après une écriture (nouvelle génération)"""
+        key = self.key_for(storage)
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._discard(key)
+
+    def invalidate_database(self, db_dir):
+        """Invalider toutes les tables d'une base (fichiers restaurés, base supprimée)"""
+        db_dir = os.path.abspath(db_dir)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == db_dir]:
+                self._generations[key] = self._generations.get(key, 0) + 1
+                self._discard(key)
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "used_bytes": self.used_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Cache unique du processus, partagé par toutes les instances SGBDR
+BUFFER_CACHE = BufferCache()
@@ -0,0 +1,154 @@
+# sgbdr/catalog.py
+import copy
+import json
+from dataclasses import dataclass, field
+from functools import cached_property
+
+# Format des lignes stockées : 1 = tout en texte ("42", "true", "null"), 2 = valeurs JSON natives
+# (nombres, booléens, null ; dates en texte ISO). Une base au format 1 passe par MIGRER BASE.
+ROW_FORMAT = 2
+
+
+@dataclass(frozen=True)
+class ColumnDef:
+    """Descripteur d'une colonne"""
+    name: str
+    type: str
+    nullable: bool = True
+    size: int = None
+
+    def to_dict(self):
+        return {"type": self.type, "nullable": self.nullable, "size": self.size}
+
+
+@dataclass(frozen=True)
+class ForeignKeyDef:
+    """Descripteur d'une clé étrangère : column → ref_table(ref_column)"""
+    column: str
+    ref_table: str
+    ref_column: str
+
+
+@dataclass(frozen=True)
+class TableDef:
+    """Descripteur d'une table : colonnes typées et contraintes"""
+    name: str
+    columns: dict
+    primary_key: str = None
+    unique: tuple = ()
+    not_null: tuple = ()
+    foreign_keys: dict = field(default_factory=dict)
+    storage: str = "json"
+
+    @cached_property
+    def column_info(self):
+        """Colonnes au format de metadata.json ({nom: {"type", "nullable", "size"}})"""
+        return {name: column.to_dict() for name, column in self.columns.items()}
+
+    @cached_property
+    def column_names(self):
+        return list(self.columns)
+
+    def to_dict(self):
+        """Table au format de metadata.json"""
+        return {
+            "columns": self.column_info,
+            "constraints": {
+                "primary_key": self.primary_key,
+                "foreign_keys": {col: {"table": fk.ref_table, "column": fk.ref_column}
+                                 for col, fk in self.foreign_keys.items()},
+                "unique": list(self.unique),
+                "not_null": list(self.not_null),
+            },
+            "storage": self.storage,
+        }
+
+    def column(self, column_name):
+        if column_name not in self.columns:
+            raise ValueError(f"Colonne {column_name} introuvable dans {self.name}")
+        return self.columns[column_name]
+
+
+@dataclass(frozen=True)
+class ViewDef:
+    """Descripteur d'une vue"""
+    name: str
+    query: str
+    created_by: str = None
+    created_at: str = None
+
+
+@dataclass(frozen=True)
+class IndexDef:
+    """Descripteur d'un index secondaire B+tree : table(column)"""
+    name: str
+    table: str
+    column: str
+
+
+class Catalog:
+    """Catalogue du schéma d'une base, construit une fois à partir de metadata.json"""
+
+    def __init__(self, metadata):
+        self._metadata = metadata
+        # Sans clé "format" : base créée avant les valeurs natives
+        self.format = metadata.get("format", 1)
+        self.tables = {name: self._table_def(name, data) for name, data in metadata.get("tables", {}).items()}
+        self.views = {name: ViewDef(name, data["query"], data.get("created_by"), data.get("created_at"))
+                      for name, data in metadata.get("views", {}).items()}
+        self.indexes = {name: IndexDef(name, data["table"], data["column"])
+                        for name, data in metadata.get("indexes", {}).items()}
+
+    @staticmethod
+    def _table_def(name, data):
+        constraints = data.get("constraints", {})
+        columns = {col_name: ColumnDef(col_name, info["type"], info.get("nullable", True), info.get("size"))
+                   for col_name, info in data["columns"].items()}
+        foreign_keys = {col: ForeignKeyDef(col, fk["table"], fk["column"])
+                        for col, fk in constraints.get("foreign_keys", {}).items()}
+        return TableDef(
+            name=name,
+            columns=columns,
+            primary_key=constraints.get("primary_key"),
+            unique=tuple(constraints.get("unique", [])),
+            not_null=tuple(constraints.get("not_null", [])),
+            foreign_keys=foreign_keys,
+            storage=data.get("storage", "json"),
+        )
+
+    @classmethod
+    def load(cls, metadata_path):
+        with open(metadata_path, "r") as f:
+            return cls(json.load(f))
+
+    def has_table(self, name):
+        return name in self.tables
+
+    def has_view(self, name):
+        return name in self.views
+
+    def table(self, name):
+        if name not in self.tables:
+            raise ValueError(f"Table {name} introuvable. T’as raté la map ?")
+        return self.tables[name]
+
+    def view(self, name):
+        if name not in self.views:
+            raise ValueError(f"Vue {name} introuvable.")
+        return self.views[name]
+
+    def has_index(self, name):
+        return name in self.indexes
+
+    def index(self, name):
+        if name not in self.indexes:
+            raise ValueError(f"Index {name} introuvable.")
+        return self.indexes[name]
+
+    def indexes_for(self, table_name):
+        """Index secondaires d'une table"""
+        return [index for index in self.indexes.values() if index.table == table_name]
+
+    def metadata(self):
+        """Copie modifiable de metadata.json, pour les commandes DDL"""
+        return copy.deepcopy(self._metadata)
@@ -0,0 +1,53 @@
+# sgbdr/catalog_manager.py
+import copy
+import json
+import os
+import threading
+from .catalog import Catalog
+
+
+class CatalogManager:
+    def __init__(self, db_path, sgbdr):
+        self.db_path = db_path
+        self.sgbdr = sgbdr
+        self._catalogs = {}
+        self._lock = threading.Lock()
+
+    def set_sgbdr(self, sgbdr):
+        """Définir la référence à l'instance SGBDR"""
+        self.sgbdr = sgbdr
+
+    def get(self, db_name=None):
+        """Catalogue de la base active (ou de db_name), chargé au premier accès"""
+        db_name = db_name or self.sgbdr.current_db
+        if not db_name:
+            raise ValueError("Aucune base sélectionnée.")
+        catalog = self._catalogs.get(db_name)
+        if catalog is None:
+            with self._lock:
+                catalog = self._catalogs.get(db_name)
+                if catalog is None:
+                    catalog = Catalog.load(self.db_path / db_name / "metadata.json")
+                    self._catalogs[db_name] = catalog
+        return catalog
+
+    def save_metadata(self, metadata, db_name=None):
+        """Écrire metadata.json après une commande DDL et recharger le catalogue"""
+        db_name = db_name or self.sgbdr.current_db
+        # Dans une transaction, le catalogue remplacé est noté pour pouvoir l'annuler
+        self.sgbdr.transaction_manager.record_metadata(db_name)
+        metadata_path = self.db_path / db_name / "metadata.json"
+        tmp_path = metadata_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(tmp_path, metadata_path)
+        with self._lock:
+            self._catalogs[db_name] = Catalog(copy.deepcopy(metadata))
+
+    def invalidate(self, db_name=None):
+        """Oublier le catalogue d'une base (metadata.json restauré ou base supprimée)"""
+        with self._lock:
+            if db_name is None:
+                self._catalogs.clear()
+            else:
+                self._catalogs.pop(db_name, None)
@@ -1,14 +1,25 @@
 # sgbdr/data_manager.py
+import csv
 import json
 import re
+import time
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from .utils import evaluate_condition
+from .utils import compile_condition, to_text
+from .buffer_cache import BUFFER_CACHE
+from .sorting import sort_key, top_k
+from . import vectorized
+
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 
 class DataManager:
     def __init__(self, db_path, sgbdr):
         self.db_path = db_path
         self.sgbdr = sgbdr
+        self.buffer_cache = BUFFER_CACHE
+        # (table, colonne) -> (lignes en cache, ensemble des valeurs) pour les clés étrangères hors index
+        self._fk_key_sets = {}
 
     def set_sgbdr(self, sgbdr):
         """Définir la référence à l’instance SGBDR"""
@@ -16,479 +27,328 @@ class DataManager:
 
     def insert(self, table_name, values):
         """Insérer une ligne avec support BOOLEAN et VARCHAR(n)"""
+        storage, table = self._insert_target(table_name)
+        row = self._validate_row(table, values)
+        self._check_constraints(storage, table, [row])
+        storage.insert(row)
+
+        print(f"╔════════════════════════════════════")
+        print(f"║ 1 loot ajouté dans {table_name} !")
+        print(f"╚════════════════════════════════════")
+
+    def insert_many(self, table_name, rows_values):
+        """Insérer plusieurs lignes : validation complète puis une seule écriture"""
+        storage, table = self._insert_target(table_name)
+        rows = [self._validate_row(table, values) for values in rows_values]
+        self._check_constraints(storage, table, rows)
+        storage.insert_many(rows)
+
+        print(f"╔════════════════════════════════════")
+        print(f"║ {len(rows)} loots ajoutés dans {table_name} !")
+        print(f"╚════════════════════════════════════")
+
+    def load_file(self, table_name, file_path):
+        """Charger un fichier CSV ou JSONL dans une table (CHARGER DANS)"""
+        started = time.perf_counter()
+        storage, table = self._insert_target(table_name)
+        path = Path(file_path)
+        if not path.exists():
+            raise ValueError(f"Fichier {file_path} introuvable")
+
+        rows = []
+        for line_no, values in self._read_load_file(path, table):
+            try:
+                rows.append(self._validate_row(table, values))
+            except ValueError as e:
+                raise ValueError(f"Ligne {line_no} de {path.name} : {e}")
+        self._check_constraints(storage, table, rows)
+        storage.insert_many(rows)
+
+        elapsed = time.perf_counter() - started
+        rate = len(rows) / elapsed if elapsed > 0 else len(rows)
+        print(f"╔════════════════════════════════════")
+        print(f"║ {len(rows)} loots chargés dans {table_name} depuis {path.name} !")
+        print(f"║ Durée : {elapsed:.2f} s ({rate:.0f} lignes/s)")
+        print(f"╚════════════════════════════════════")
+
+    def _read_load_file(self, path, table):
+        """Itérer sur les (numéro de ligne, valeurs dans l'ordre des colonnes) d'un fichier CSV ou JSONL"""
+        column_names = table.column_names
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            if path.suffix.lower() in (".jsonl", ".ndjson"):
+                for line_no, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        raise ValueError(f"Ligne {line_no} de {path.name} : JSON invalide")
+                    if isinstance(record, dict):
+                        unknown = set(record) - set(column_names)
+                        if unknown:
+                            raise ValueError(f"Ligne {line_no} de {path.name} : colonnes inconnues {sorted(unknown)}")
+                        record = [record.get(col) for col in column_names]
+                    yield line_no, [to_text(value) for value in record]
+                return
+
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            header = [name.strip() for name in header]
+            if set(header) <= set(column_names):
+                # En-tête : colonnes nommées, dans n'importe quel ordre (absentes = null)
+                positions = [header.index(col) if col in header else None for col in column_names]
+            else:
+                positions = None
+                yield 1, header
+            for line_no, fields in enumerate(reader, 2):
+                if not fields:
+                    continue
+                if positions is not None:
+                    fields = [fields[i] if i is not None and i < len(fields) else "null" for i in positions]
+                yield line_no, fields
+
+    def _insert_target(self, table_name):
         self.sgbdr.user_manager.check_permission("write")
         if not self.sgbdr.current_db:
             raise ValueError("Aucune base sélectionnée. Faut d'abord switcher vers la base")
         
-        db_dir = self.db_path / self.sgbdr.current_db
-        table_path = db_dir / f"{table_name}.json"
-        if not table_path.exists():
+        storage = self.sgbdr.storage_manager.get_storage(table_name)
+        if not storage.exists():
             raise ValueError(f"Table {table_name} introuvable. T’as raté la map ?")
 
-        # Charger métadonnées
-        with open(db_dir / "metadata.json", "r") as f:
-            metadata = json.load(f)
-        columns = metadata["tables"][table_name]["columns"]
-        constraints = metadata["tables"][table_name]["constraints"]
+        # Schéma depuis le catalogue
+        return storage, self.sgbdr.catalog_manager.get().table(table_name)
+
+    def _validate_row(self, table, values):
+        """Valider les valeurs d'une ligne selon le schéma et construire la ligne stockée
+        (valeurs natives : nombres, booléens, dates ISO, None pour NULL)"""
+        columns = table.columns
 
         if len(values) != len(columns):
             raise ValueError(f"Nombre de valeurs ({len(values)}) ≠ colonnes ({len(columns)})")
 
-        row = {}
-        for (col_name, col_info), val in zip(columns.items(), values):
-            col_type = col_info["type"]
-            nullable = col_info["nullable"]
-            size = col_info.get("size")  # pour VARCHAR
-
-            # --- Validation NOT NULL ---
-            if val == "null" and not nullable:
-                raise ValueError(f"La colonne {col_name} ne peut pas être NULL")
+        return {column.name: self._validate_value(column, val) for column, val in zip(columns.values(), values)}
 
-            # --- Validation par type ---
-            if val != "null":
-                if col_type == "INT":
-                    if not (val.lstrip("-").isdigit()):
-                        raise ValueError(f"{col_name} doit être un INT")
-                    row[col_name] = val
-                elif col_type == "FLOAT":
-                    try:
-                        float(val)
-                    except ValueError:
-                        raise ValueError(f"{col_name} doit être un FLOAT")
-                    row[col_name] = val
-                elif col_type in ("TEXT", "VARCHAR"):
-                    if col_type == "VARCHAR" and size is not None and len(val) > size:
-                        raise ValueError(f"{col_name} trop long (max {size} caractères)")
-                    row[col_name] = val
-                elif col_type == "BOOLEAN":
-                    if val.lower() not in ("true", "false"):
-                        raise ValueError(f"{col_name} doit être TRUE ou FALSE")
-                    row[col_name] = val.lower()  # stocké en minuscules
-                elif col_type == "DATE":
-                    if not re.match(r"^\d{4}-\d{2}-\d{2}$", val):
-                        raise ValueError(f"{col_name} doit être YYYY-MM-DD")
-                    try:
-                        datetime.strptime(val, "%Y-%m-%d")
-                    except ValueError:
-                        raise ValueError(f"Date invalide dans {col_name}")
-                    row[col_name] = val
-                else:
-                    row[col_name] = val
-            else:
-                row[col_name] = "null"
-
-        # --- Charger données existantes ---
-        with open(table_path, "r") as f:
-            data = json.load(f)
-
-        # --- Contraintes ---
-        # PRIMARY KEY
-        if constraints["primary_key"]:
-            pk = constraints["primary_key"]
-            if any(d.get(pk) == row[pk] for d in data if row[pk] != "null"):
-                raise ValueError(f"Valeur {row[pk]} déjà prise pour la clé primaire {pk}")
-
-        # UNIQUE
-        for col in constraints["unique"]:
-            if row[col] != "null":
-                if any(d.get(col) == row[col] for d in data):
-                    raise ValueError(f"Valeur {row[col]} déjà prise pour la colonne unique {col}")
-
-        # FOREIGN KEY
-        for col, fk in constraints["foreign_keys"].items():
-            if row[col] != "null":
-                ref_table = fk["table"]
-                ref_col = fk["column"]
-                ref_path = db_dir / f"{ref_table}.json"
-                if not ref_path.exists():
-                    raise ValueError(f"Table référencée {ref_table} introuvable")
-                with open(ref_path, "r") as f:
-                    ref_data = json.load(f)
-                if not any(d.get(ref_col) == row[col] for d in ref_data):
-                    raise ValueError(f"Valeur {row[col]} dans {col} n'existe pas dans {ref_table}.{ref_col}")
-
-
-        data.append(row)
-        with open(table_path, "w") as f:
-            json.dump(data, f, indent=2)
+    @staticmethod
+    def _validate_value(column, val):
+        """Valider une valeur saisie (texte, "null" pour NULL) pour une colonne du schéma et la
+        convertir en valeur stockée ; utilisé par POP DANS comme par EDIT"""
+        col_name = column.name
+        col_type = column.type
 
+        # --- Validation NOT NULL ---
+        if val == "null":
+            if not column.nullable:
+                raise ValueError(f"La colonne {col_name} ne peut pas être NULL")
+            return None
+
+        # --- Validation par type ---
+        if col_type == "INT":
+            if not (val.lstrip("-").isdigit()):
+                raise ValueError(f"{col_name} doit être un INT")
+            return int(val)
+        if col_type == "FLOAT":
+            try:
+                return float(val)
+            except ValueError:
+                raise ValueError(f"{col_name} doit être un FLOAT")
+        if col_type in ("TEXT", "VARCHAR"):
+            if col_type == "VARCHAR" and column.size is not None and len(val) > column.size:
+                raise ValueError(f"{col_name} trop long (max {column.size} caractères)")
+            return val
+        if col_type == "BOOLEAN":
+            if val.lower() not in ("true", "false"):
+                raise ValueError(f"{col_name} doit être TRUE ou FALSE")
+            return val.lower() == "true"
+        if col_type == "DATE":
+            if not DATE_PATTERN.match(val):
+                raise ValueError(f"{col_name} doit être YYYY-MM-DD")
+            try:
+                datetime.strptime(val, "%Y-%m-%d")
+            except ValueError:
+                raise ValueError(f"Date invalide dans {col_name}")
+            return val
+        return val
+
+    def _check_constraints(self, storage, table, rows):
+        """Vérifier PRIMARY KEY, UNIQUE et FOREIGN KEY pour un lot de lignes, par ensembles de valeurs"""
+        # --- PRIMARY KEY puis UNIQUE (index de hachage + valeurs déjà vues dans le lot) ---
+        unique_columns = [table.primary_key] if table.primary_key else []
+        unique_columns += [col for col in table.unique if col != table.primary_key]
+        for col in unique_columns:
+            label = "la clé primaire" if col == table.primary_key else "la colonne unique"
+            index = storage.indexes.unique(col)
+            seen = set()
+            for row in rows:
+                value = row[col]
+                if value is None:
+                    continue
+                if value in seen or index.get(value) is not None:
+                    raise ValueError(f"Valeur {value} déjà prise pour {label} {col}")
+                seen.add(value)
+
+        # --- FOREIGN KEY : chaque valeur distincte vérifiée une fois ---
+        for col, fk in table.foreign_keys.items():
+            values = dict.fromkeys(row[col] for row in rows if row[col] is not None)
+            if not values:
+                continue
+            ref_storage = self.sgbdr.storage_manager.get_storage(fk.ref_table)
+            if not ref_storage.exists():
+                raise ValueError(f"Table référencée {fk.ref_table} introuvable")
+            for value in values:
+                if not self._foreign_key_exists(fk, value):
+                    raise ValueError(f"Valeur {value} dans {col} n'existe pas dans {fk.ref_table}.{fk.ref_column}")
+
+
+    def _read_table(self, storage):
+        """Lire une table via le buffer cache (lignes partagées : ne pas les modifier)"""
+        return self.buffer_cache.read(storage)
+
+    def _foreign_key_exists(self, fk, value):
+        """Vérifier qu'une valeur existe dans la colonne référencée par une clé étrangère.
+
+        Colonne PRIMARY KEY / UNIQUE : recherche dans son index de hachage. Sinon, ensemble des
+        valeurs de la colonne, recalculé seulement quand le buffer cache relit la table.
+        """
+        ref_storage = self.sgbdr.storage_manager.get_storage(fk.ref_table)
+        ref_def = self.sgbdr.catalog_manager.get().tables.get(fk.ref_table)
+        if ref_def is not None and fk.ref_column in ref_def.unique:
+            return ref_storage.indexes.unique(fk.ref_column).get(value) is not None
+        rows = self._read_table(ref_storage)
+        key = (self.buffer_cache.key_for(ref_storage), fk.ref_column)
+        cached = self._fk_key_sets.get(key)
+        if cached is None or cached[0] is not rows:
+            cached = (rows, {row.get(fk.ref_column) for row in rows})
+            self._fk_key_sets[key] = cached
+        return value in cached[1]
+
+    def cache_stats(self):
+        """Afficher les statistiques du buffer cache et du cache de parsing"""
+        self.sgbdr.user_manager.check_permission("read")
+        stats = self.buffer_cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        hit_ratio = stats["hits"] / lookups * 100 if lookups else 0
         print(f"╔════════════════════════════════════")
-        print(f"║ 1 loot ajouté dans {table_name} !")
+        print(f"║ Buffer cache : {stats['entries']} tables en mémoire")
+        print(f"║ Mémoire : {stats['used_bytes']} / {stats['max_bytes']} octets")
+        print(f"║ Hits : {stats['hits']} | Misses : {stats['misses']} ({hit_ratio:.1f}% de hits)")
+        print(f"║ Évictions : {stats['evictions']}")
+        parse_stats = self.sgbdr.query_parser.cache_info()
+        print(f"║ Cache de parsing : {parse_stats.currsize} requêtes | Hits : {parse_stats.hits} | Misses : {parse_stats.misses}")
         print(f"╚════════════════════════════════════")
+        return [stats]
 
     def _get_column_type(self, table_name, column_name):
-        """Utilitaire pour récupérer le type d'une colonne depuis metadata"""
-        db_dir = self.db_path / self.sgbdr.current_db
-        with open(db_dir / "metadata.json", "r") as f:
-            metadata = json.load(f)
-        return metadata["tables"][table_name]["columns"][column_name]["type"]
-
-    def select(self, table, selected_columns="*", condition=None, order_by=None):
-        """Sélectionner des données avec tri robuste"""
+        """Utilitaire pour récupérer le type d'une colonne depuis le catalogue"""
+        return self.sgbdr.catalog_manager.get().table(table_name).column(column_name).type
+
+    def select(self, table, selected_columns="*", condition=None, order_by=None, limit=None, offset=0,
+               group_by=(), having=None):
+        """Sélectionner des données selon le plan choisi par le planner"""
+        return list(self.select_iter(table, selected_columns, condition, order_by, limit, offset, group_by, having))
+
+    def select_iter(self, table, selected_columns="*", condition=None, order_by=None, limit=None, offset=0,
+                    group_by=(), having=None):
+        """Itérateur des lignes sélectionnées, produites à la demande (seul un tri les matérialise)"""
         self.sgbdr.user_manager.check_permission("read")
         if not self.sgbdr.current_db:
             raise ValueError("Aucune base sélectionnée.")
-        db_dir = self.db_path / self.sgbdr.current_db
-        table_path = db_dir / f"{table}.json"
-        if not table_path.exists():
-            raise ValueError(f"Table {table} introuvable.")
-
-        with open(db_dir / "metadata.json", "r") as f:
-            metadata = json.load(f)
-        table_columns = metadata["tables"][table]["columns"]  # CHANGER columns → table_columns
-
-        with open(table_path, "r") as f:
-            data = json.load(f)
-
-        # Filtrer
-        if condition:
-            filtered_data = [row for row in data if evaluate_condition(row, condition, table_columns)]  # CHANGER columns → table_columns
-        else:
-            filtered_data = data[:]
-
-        # Filtrer les colonnes si spécifiées
-        if selected_columns != "*":  # CHANGER columns → selected_columns
-            
-            result_data = []
-            for row in filtered_data:
-                filtered_row = {}
-                for col in selected_columns:  # CHANGER columns → selected_columns
-                    col_name = col.strip()
-                    if col_name in row:
-                        filtered_row[col_name] = row[col_name]
-                    else:
-                        # Essayer de trouver la colonne sans préfixe de table
-                        simple_col = col_name.split('.')[-1] if '.' in col_name else col_name
-                        if simple_col in row:
-                            filtered_row[col_name] = row[simple_col]
-                        else:
-                            # Colonne non trouvée, mettre None
-                            filtered_row[col_name] = None
-
-                result_data.append(filtered_row)
-            filtered_data = result_data
-
-
-        # ORDER BY
-        if order_by:
-            def sort_key(row):
-                keys = []
-                for order in order_by:
-                    col = order["column"]
-                    direction = order["direction"]
-
-
-                    if col not in table_columns and col not in [c.split('.')[-1] for c in table_columns.keys()]:
-                        raise ValueError(f"Colonne {col} introuvable dans {table}")
-
-                    value = row.get(col, "null")
-
-                    col_type = table_columns.get(col, {}).get("type", "TEXT")
-
-                    # Gestion NULL
-                    if value == "null":
-                        sort_val = (0, None)
-                    else:
-                        if col_type == "INT":
-                            sort_val = (1, int(value))
-                        elif col_type == "FLOAT":
-                            sort_val = (1, float(value))
-                        elif col_type == "DATE":
-                            sort_val = (1, datetime.strptime(value, "%Y-%m-%d"))
-                        elif col_type in ("TEXT", "VARCHAR"):  # VARCHAR ajouté ici
-                            sort_val = (1, value.lower())  # insensible à la casse
-                        elif col_type == "BOOLEAN":
-                            sort_val = (1, value.lower() == "true")
-                        else:
-                            sort_val = (1, str(value))
-
-                    # Inversion pour DESC
-                    if direction == "DESC":
-                        if sort_val[1] is None:
-                            sort_val = (2, None)  # null en dernier
-                        elif isinstance(sort_val[1], (int, float)):
-                            sort_val = (sort_val[0], -sort_val[1])
-                        elif isinstance(sort_val[1], datetime):
-                            sort_val = (sort_val[0], -sort_val[1].timestamp())
-                        elif isinstance(sort_val[1], bool):
-                            sort_val = (sort_val[0], not sort_val[1])
-                        # TEXT et VARCHAR : on garde, on inverse après
-
-                    keys.append(sort_val)
-                return tuple(keys)
-
-            # Tri final
-            filtered_data = sorted(filtered_data, key=sort_key)
-
-            # Pour DESC sur TEXT/VARCHAR : on inverse si nécessaire
-            if any(order["direction"] == "DESC" and table_columns[order["column"]]["type"] in ("TEXT", "VARCHAR") for order in order_by):
-                # Si DESC sur TEXT/VARCHAR, on inverse l'ordre
-                filtered_data = filtered_data[::-1]
+        plan = self.sgbdr.planner.plan_select(table, selected_columns, condition, order_by, limit, offset,
+                                               group_by, having)
+        return self._stream(plan.execute(), f"Loot dans {table} : {{}} lignes trouvées !")
 
-        print(f"╔════════════════════════════════════")
-        print(f"║ Loot dans {table} : {len(filtered_data)} lignes trouvées !")
-        print(f"╚════════════════════════════════════")
-        return filtered_data
 
+    def join_tables(self, table1, table2, columns="*", join_condition=None, order_by=None, limit=None, offset=0,
+                    group_by=(), having=None):
+        """Jointure de deux tables selon le plan choisi par le planner (hachage ou index)"""
+        return list(self.join_iter(table1, table2, columns, join_condition, order_by, limit, offset,
+                                   group_by, having))
 
-    def join_tables(self, table1, table2, columns="*", join_condition=None, order_by=None):
-        """Jointure avec ORDER BY — TEXT/DESC corrigé"""
+    def join_iter(self, table1, table2, columns="*", join_condition=None, order_by=None, limit=None, offset=0,
+                  group_by=(), having=None):
+        """Itérateur des lignes jointes, produites à la demande"""
         self.sgbdr.user_manager.check_permission("read")
         if not self.sgbdr.current_db:
             raise ValueError("Aucune base sélectionnée.")
-        db_dir = self.db_path / self.sgbdr.current_db
-
-        if not (db_dir / f"{table1}.json").exists() or not (db_dir / f"{table2}.json").exists():
-            raise ValueError("Une des tables est introuvable.")
-
-        match = re.match(r"(\w+)\.(\w+)\s*=\s*(\w+)\.(\w+)", join_condition.strip())
-        if not match:
-            raise ValueError("Condition de jointure invalide")
-        t1, c1, t2, c2 = match.groups()
-        if t1 != table1 or t2 != table2:
-            raise ValueError("Les tables dans la condition doivent correspondre.")
-
-        with open(db_dir / f"{table1}.json", "r") as f:
-            data1 = json.load(f)
-        with open(db_dir / f"{table2}.json", "r") as f:
-            data2 = json.load(f)
-
-        with open(db_dir / "metadata.json", "r") as f:
-            metadata = json.load(f)
-
-        result = []
-        for r1 in data1:
-            for r2 in data2:
-                if str(r1.get(c1)) == str(r2.get(c2)):
-                    row = {f"{table1}.{k}": v for k, v in r1.items()}
-                    row.update({f"{table2}.{k}": v for k, v in r2.items()})
-                    result.append(row)
-
-        
-        # CORRECTION : Extraire les conditions supplémentaires de join_condition
-        join_parts = join_condition.split(" ET ")
-        base_join_condition = join_parts[0]  # employes.id = projets.responsable_id
-        additional_conditions = " ET ".join(join_parts[1:]) if len(join_parts) > 1 else None
-
-        # Appliquer les conditions supplémentaires si elles existent
-        if additional_conditions:
-
-            
-            # Créer les métadonnées des colonnes pour les conditions
-            columns_metadata = {}
-            for table in [table1, table2]:
-                if table in metadata["tables"]:
-                    for col_name, col_info in metadata["tables"][table]["columns"].items():
-                        prefixed_col = f"{table}.{col_name}"
-                        columns_metadata[prefixed_col] = col_info
-                        # Ajouter aussi le nom simple pour compatibilité
-                        columns_metadata[col_name] = col_info
-            
-            # Filtrer les résultats avec les conditions supplémentaires
-            from .utils import evaluate_condition
-            filtered_result = []
-            for row in result:
-                try:
-                    if evaluate_condition(row, additional_conditions, columns_metadata):
-                        filtered_result.append(row)
-                except Exception as e:
-
-                    # En cas d'erreur, on garde la ligne pour éviter de tout perdre
-                    filtered_result.append(row)
-            
-            result = filtered_result
-
-
-        # Filtrer les colonnes si spécifiées
-        if columns != "*":
-            filtered_result = []
-            for row in result:
-                filtered_row = {}
-                for col in columns:
-                    col_name = col.strip()
-                    if col_name in row:
-                        filtered_row[col_name] = row[col_name]
-                    else:
-                        # Essayer de trouver la colonne sans préfixe de table
-                        simple_col = col_name.split('.')[-1] if '.' in col_name else col_name
-                        found = False
-                        for key in row.keys():
-                            if key == simple_col or key.endswith('.' + simple_col):
-                                filtered_row[col_name] = row[key]
-                                found = True
-                                break
-                        if not found:
-                            filtered_row[col_name] = None
-                filtered_result.append(filtered_row)
-            result = filtered_result       
-
-        
-        if order_by:
-            def sort_key(row):
-                keys = []
-                for order in order_by:
-                    full_col = order["column"]
-                    direction = order["direction"]
-
-                    if "." in full_col:
-                        table_name, col_name = full_col.split(".", 1)
-                        prefixed = f"{table_name}.{col_name}"
-                        if table_name not in (table1, table2):
-                            raise ValueError(f"Table {table_name} inconnue")
-                    else:
-                        col_name = full_col
-                        prefixed1 = f"{table1}.{col_name}"
-                        prefixed2 = f"{table2}.{col_name}"
-                        if prefixed1 in row:
-                            prefixed = prefixed1
-                            table_name = table1
-                        elif prefixed2 in row:
-                            prefixed = prefixed2
-                            table_name = table2
-                        else:
-                            raise ValueError(f"Colonne {full_col} introuvable")
-
-                    value = row.get(prefixed, "null")
-                    col_type = metadata["tables"][table_name]["columns"][col_name]["type"]
-
-                    if value == "null":
-                        sort_val = (0, None)
-                    else:
-                        if col_type == "INT":
-                            sort_val = (1, int(value))
-                        elif col_type == "FLOAT":
-                            sort_val = (1, float(value))
-                        elif col_type == "DATE":
-                            sort_val = (1, datetime.strptime(value, "%Y-%m-%d"))
-                        elif col_type in ("TEXT", "VARCHAR"):
-                            sort_val = (1, value.lower())
-                        elif col_type == "BOOLEAN":
-                            sort_val = (1, value.lower() == "true")
-                        else:
-                            sort_val = (1, str(value))
-
-                    # DESC : seulement pour numériques
-                    if direction == "DESC":
-                        if sort_val[1] is None:
-                            sort_val = (2, None)
-                        elif isinstance(sort_val[1], (int, float)):
-                            sort_val = (sort_val[0], -sort_val[1])
-                        elif isinstance(sort_val[1], datetime):
-                            sort_val = (sort_val[0], -sort_val[1].timestamp())
-                        elif isinstance(sort_val[1], bool):
-                            sort_val = (sort_val[0], not sort_val[1])
-                        # TEXT : on inverse après
-
-                    keys.append(sort_val)
-                return tuple(keys)
-
-            result = sorted(result, key=sort_key)
-
-            # Inversion manuelle pour TEXT/VARCHAR en DESC
-            has_text_desc = any(
-                order["direction"] == "DESC" and 
-                "." in order["column"] and
-                metadata["tables"][order["column"].split(".", 1)[0]]["columns"][order["column"].split(".", 1)[1]]["type"] in ("TEXT", "VARCHAR")
-                for order in order_by
-            )
-            if has_text_desc:
-                result = result[::-1]
+        plan = self.sgbdr.planner.plan_join(table1, table2, columns, join_condition, order_by, limit, offset,
+                                             group_by, having)
+        return self._stream(plan.execute(), "Jointure : {} lignes trouvées !")
 
+    def select_prepared(self, prepared, params=()):
+        """LOOT d'une requête préparée : son plan gardé, exécuté avec les paramètres liés"""
+        self.sgbdr.user_manager.check_permission("read")
+        if not self.sgbdr.current_db:
+            raise ValueError("Aucune base sélectionnée.")
+        plan = prepared.plan(params)
+        statement = prepared.statement
+        if statement.type == "join_tables":
+            return list(self._stream(plan.execute(), "Jointure : {} lignes trouvées !"))
+        return list(self._stream(plan.execute(), f"Loot dans {statement.table_name} : {{}} lignes trouvées !"))
+
+    @staticmethod
+    def _stream(rows, message):
+        """Relayer les lignes d'un plan, puis afficher leur nombre une fois toutes produites"""
+        count = 0
+        for row in rows:
+            count += 1
+            yield row
         print(f"╔════════════════════════════════════")
-        print(f"║ Jointure : {len(result)} lignes trouvées !")
+        print(f"║ {message.format(count)}")
         print(f"╚════════════════════════════════════")
-        return result
 
-    def update(self, table_name, set_clause, condition):
+    def update(self, table_name, col_name, new_val, condition):
         """Mettre à jour des lignes avec BOOLEAN et VARCHAR"""
         self.sgbdr.user_manager.check_permission("write")
         if not self.sgbdr.current_db:
             raise ValueError("Aucune base sélectionnée.")
         
-        db_dir = self.db_path / self.sgbdr.current_db
-        table_path = db_dir / f"{table_name}.json"
-        if not table_path.exists():
+        storage = self.sgbdr.storage_manager.get_storage(table_name)
+        if not storage.exists():
             raise ValueError(f"Table {table_name} introuvable.")
 
-        with open(db_dir / "metadata.json", "r") as f:
-            metadata = json.load(f)
-        columns = metadata["tables"][table_name]["columns"]
-        constraints = metadata["tables"][table_name]["constraints"]
-
-        # Parser SET col = 'val'
-        match = re.match(r"(\w+)\s*=\s*'([^']*)'", set_clause)
-        if not match:
-            raise ValueError("Syntaxe SET invalide : col = 'val'")
-        col_name, new_val = match.groups()
+        table = self.sgbdr.catalog_manager.get().table(table_name)
+        columns = table.column_info
 
         if col_name not in columns:
             raise ValueError(f"Colonne {col_name} introuvable dans {table_name}")
 
-        col_type = columns[col_name]["type"]
-        nullable = columns[col_name]["nullable"]
-        size = columns[col_name].get("size")
-
-        # --- Validation de la nouvelle valeur ---
-        if new_val == "null" and not nullable:
-            raise ValueError(f"{col_name} ne peut pas être NULL")
-        
-        if new_val != "null":
-            if col_type == "INT":
-                if not (new_val.lstrip("-").isdigit()):
-                    raise ValueError(f"{col_name} doit être un INT")
-            elif col_type == "FLOAT":
-                try:
-                    float(new_val)
-                except ValueError:
-                    raise ValueError(f"{col_name} doit être un FLOAT")
-            elif col_type in ("TEXT", "VARCHAR"):
-                if col_type == "VARCHAR" and size is not None and len(new_val) > size:
-                    raise ValueError(f"{col_name} trop long (max {size})")
-            elif col_type == "BOOLEAN":
-                if new_val.lower() not in ("true", "false"):
-                    raise ValueError(f"{col_name} doit être TRUE ou FALSE")
-                new_val = new_val.lower()
-            elif col_type == "DATE":
-                if not re.match(r"^\d{4}-\d{2}-\d{2}$", new_val):
-                    raise ValueError(f"{col_name} doit être YYYY-MM-DD")
-                try:
-                    datetime.strptime(new_val, "%Y-%m-%d")
-                except ValueError:
-                    raise ValueError(f"Date invalide")
+        # --- Validation de la nouvelle valeur (mêmes règles que POP DANS) ---
+        new_val = self._validate_value(table.column(col_name), new_val)
 
         # --- Charger données ---
-        with open(table_path, "r+") as f:
-            data = json.load(f)
-            updated_count = 0
-
-            for row in data:
-                if evaluate_condition(row, condition, columns):
-                    old_val = row[col_name]
-
-                    # Vérifier contrainte UNIQUE (si changement)
-                    if old_val != new_val and new_val != "null":
-                        for uniq_col in constraints["unique"]:
-                            if uniq_col == col_name:
-                                if any(d.get(col_name) == new_val and d is not row for d in data):
-                                    raise ValueError(f"Valeur {new_val} déjà prise pour {col_name}")
-
-                    # Vérifier FOREIGN KEY
-                    if col_name in constraints["foreign_keys"] and new_val != "null":
-                        fk = constraints["foreign_keys"][col_name]
-                        ref_table = fk["table"]
-                        ref_col = fk["column"]
-                        ref_path = db_dir / f"{ref_table}.json"
-                        with open(ref_path, "r") as rf:
-                            ref_data = json.load(rf)
-                        if not any(d.get(ref_col) == new_val for d in ref_data):
-                            raise ValueError(f"Valeur {new_val} n'existe pas dans {ref_table}.{ref_col}")
-
-                    row[col_name] = new_val
-                    updated_count += 1
-
-            f.seek(0)
-            json.dump(data, f, indent=2)
-            f.truncate()
+        changes = {}
+        predicate = compile_condition(condition, columns)
+        unique_index = storage.indexes.unique(col_name) if col_name in table.unique else None
+        # Une seule ligne peut passer à new_val sur une colonne UNIQUE
+        claimed = False
+        # new_val est la même pour toutes les lignes : clé étrangère vérifiée une seule fois
+        fk_checked = False
+
+        for rid, row in storage.scan():
+            if predicate(row):
+                old_val = row[col_name]
+
+                # Vérifier contrainte UNIQUE (si changement)
+                if unique_index is not None and old_val != new_val and new_val is not None:
+                    if claimed or unique_index.get(new_val) is not None:
+                        raise ValueError(f"Valeur {new_val} déjà prise pour {col_name}")
+                    claimed = True
+
+                # Vérifier FOREIGN KEY
+                if col_name in table.foreign_keys and new_val is not None and not fk_checked:
+                    fk = table.foreign_keys[col_name]
+                    if not self._foreign_key_exists(fk, new_val):
+                        raise ValueError(f"Valeur {new_val} n'existe pas dans {fk.ref_table}.{fk.ref_column}")
+                    fk_checked = True
+
+                row[col_name] = new_val
+                changes[rid] = row
+
+        # Seules les lignes modifiées sont réécrites
+        storage.update_many(changes)
+        updated_count = len(changes)
 
         print(f"╔════════════════════════════════════")
         print(f"║ {updated_count} lignes modifiées dans {table_name} !")
@@ -500,21 +360,16 @@ class DataManager:
         self.sgbdr.user_manager.check_permission("delete")
         if not self.sgbdr.current_db:
             raise ValueError("Aucune base sélectionnée. Faut d'abord switcher vers la base")
-        db_dir = self.db_path / self.sgbdr.current_db
-        if not (db_dir / f"{table_name}.json").exists():
+        storage = self.sgbdr.storage_manager.get_storage(table_name)
+        if not storage.exists():
             raise ValueError(f"Table {table_name} introuvable. T’as raté la map ?")
         
-        with open(db_dir / "metadata.json", "r") as f:
-            metadata = json.load(f)
-        columns = metadata["tables"][table_name]["columns"]
+        columns = self.sgbdr.catalog_manager.get().table(table_name).column_info
         
-        with open(db_dir / f"{table_name}.json", "r+") as f:
-            data = json.load(f)
-            new_data = [row for row in data if not evaluate_condition(row, condition, columns)]
-            deleted_count = len(data) - len(new_data)
-            f.seek(0)
-            json.dump(new_data, f,indent=2)
-            f.truncate()
+        predicate = compile_condition(condition, columns)
+        doomed = [rid for rid, row in storage.scan() if predicate(row)]
+        storage.delete_many(doomed)
+        deleted_count = len(doomed)
         
         print(f"╔════════════════════════════════════")
         print(f"║ {deleted_count} lignes supprimées dans {table_name} !")
@@ -525,34 +380,60 @@ class DataManager:
         self.sgbdr.user_manager.check_permission("read")
         if not self.sgbdr.current_db:
             raise ValueError("Aucune base sélectionnée. Faut d'abord switcher vers la base")
-        db_dir = self.db_path / self.sgbdr.current_db
-        if not (db_dir / f"{table_name}.json").exists():
+        storage = self.sgbdr.storage_manager.get_storage(table_name)
+        if not storage.exists():
             raise ValueError(f"Table {table_name} introuvable. T’as raté la map ?")
         
-        with open(db_dir / "metadata.json", "r") as f:
-            metadata = json.load(f)
-        columns = metadata["tables"][table_name]["columns"]
+        columns = self.sgbdr.catalog_manager.get().table(table_name).column_info
         
-        with open(db_dir / f"{table_name}.json", "r") as f:
-            data = json.load(f)
-        
-        stats = {"row_count": len(data)}
+        # Lignes lues par lots (en flux si la table dépasse le buffer cache) : seuls les cumuls
+        # (min, max, somme, nombre) et les valeurs distinctes restent en mémoire
+        # Dates résumées comme des nombres : numéros de jour, min/max/moyenne réaffichés en dates
+        numeric = [col for col, col_info in columns.items() if col_info["type"] in vectorized.VECTOR_TYPES]
+        distinct = {col: set() for col, col_info in columns.items() if col_info["type"] in ("TEXT", "DATE")}
+        summaries = {}
+        row_count = 0
+        rows = iter(self.buffer_cache.scan(storage))
+        while True:
+            batch = list(islice(rows, vectorized.BATCH_SIZE))
+            if not batch:
+                break
+            row_count += len(batch)
+            for col in numeric:
+                values = [row[col] for row in batch if row[col] is not None]
+                if not values:
+                    continue
+                col_type = columns[col]["type"]
+                if vectorized.available():
+                    low, high, total = vectorized.numeric_summary(values, col_type)
+                else:
+                    convert = vectorized.day_number if col_type == "DATE" else int if col_type == "INT" else float
+                    numeric_values = [convert(v) for v in values]
+                    low, high, total = min(numeric_values), max(numeric_values), sum(numeric_values)
+                count = len(values)
+                if col in summaries:
+                    previous = summaries[col]
+                    low, high = min(previous[0], low), max(previous[1], high)
+                    total, count = previous[2] + total, previous[3] + count
+                summaries[col] = (low, high, total, count)
+            for col, values in distinct.items():
+                values.update(row[col] for row in batch if row[col] is not None)
+
+        stats = {"row_count": row_count}
         for col, col_info in columns.items():
-            col_type = col_info["type"]
-            values = [row[col] for row in data if row[col] != "null"]
             stats[col] = {}
-            if col_type in ("INT", "FLOAT"):
-                if values:
-                    numeric_values = [float(v) for v in values]
-                    stats[col]["min"] = min(numeric_values)
-                    stats[col]["max"] = max(numeric_values)
-                    stats[col]["avg"] = sum(numeric_values) / len(numeric_values)
-                else:
-                    stats[col]["min"] = "N/A"
-                    stats[col]["max"] = "N/A"
-                    stats[col]["avg"] = "N/A"
-            if col_type in ("TEXT", "DATE"):
-                stats[col]["distinct_count"] = len(set(values))
+            if col in summaries:
+                low, high, total, count = summaries[col]
+                avg = total / count
+                if col_info["type"] == "DATE":
+                    low, high, avg = vectorized.day_date(low), vectorized.day_date(high), vectorized.day_date(round(avg))
+                stats[col]["min"], stats[col]["max"], stats[col]["avg"] = low, high, avg
+            elif col in numeric:
+                stats[col]["min"] = "N/A"
+                stats[col]["max"] = "N/A"
+                stats[col]["avg"] = "N/A"
+            if col in distinct:
+                stats[col]["distinct_count"] = len(distinct[col])
         
         print(f"╔════════════════════════════════════")
         print(f"║ Statistiques pour {table_name}")
@@ -571,22 +452,31 @@ class DataManager:
         return stats
 
 
-    def execute_view(self, view_name, condition=None, order_by=None):
-        """Exécuter une vue avec conditions et tri supplémentaires"""
+    def analyze_table(self, table_name):
+        """Recalculer par un parcours les statistiques d'une table utilisées par le planificateur"""
+        self.sgbdr.user_manager.check_permission("read")
+        if not self.sgbdr.current_db:
+            raise ValueError("Aucune base sélectionnée. Faut d'abord switcher vers la base")
+        storage = self.sgbdr.storage_manager.get_storage(table_name)
+        if not storage.exists():
+            raise ValueError(f"Table {table_name} introuvable. T’as raté la map ?")
+        with storage.wal.lock:
+            self.sgbdr.storage_manager.analyze(self.sgbdr.current_db, [table_name])
+        stats = storage.statistics.get()
+
+        print(f"╔════════════════════════════════════")
+        print(f"║ Statistiques de {table_name} recalculées : {stats.row_count} lignes")
+        print(f"╚════════════════════════════════════")
+        return stats
+
+    def execute_view(self, view_name, condition=None, order_by=None, limit=None, offset=0):
+        """Exécuter une vue avec conditions, tri et limite supplémentaires"""
         self.sgbdr.user_manager.check_permission("read")
         if not self.sgbdr.current_db:
             raise ValueError("Aucune base sélectionnée.")
         
-        db_dir = self.db_path / self.sgbdr.current_db
-        
-        # Charger la définition de la vue
-        with open(db_dir / "metadata.json", "r") as f:
-            metadata = json.load(f)
-            
-            if "views" not in metadata or view_name not in metadata["views"]:
-                raise ValueError(f"Vue {view_name} introuvable.")
-            
-            view_query = metadata["views"][view_name]["query"]
+        # Définition de la vue depuis le catalogue
+        view_query = self.sgbdr.catalog_manager.get().view(view_name).query
         
         # Exécuter la requête de la vue via le SGBDR
         print(f"╔════════════════════════════════════")
@@ -601,102 +491,59 @@ class DataManager:
         
         # Appliquer les conditions et tri supplémentaires si présents
         if condition or order_by:
-            filtered_result = self._apply_additional_filters(base_result, condition, order_by, view_columns)
-            return filtered_result
+            base_result = self._apply_additional_filters(base_result, condition, order_by, view_columns,
+                                                         None if limit is None else limit + offset)
         
+        if limit is not None or offset:
+            return base_result[offset:None if limit is None else offset + limit]
         return base_result
 
     def _get_view_columns_metadata(self, view_name, sample_data):
-        """Déduire les types de colonnes à partir des données de la vue"""
+        """Déduire les types de colonnes à partir des valeurs stockées des lignes de la vue"""
         if not sample_data:
             return {}
         
         columns_metadata = {}
         
-        # Analyser le premier élément pour deviner les types
-        first_row = sample_data[0]
-        
-        for col_name, value in first_row.items():
-            if value == "null":
-                columns_metadata[col_name] = {"type": "TEXT"}  # Type par défaut
+        for col_name in sample_data[0]:
+            # Première valeur non NULL de la colonne (TEXT par défaut)
+            value = next((row[col_name] for row in sample_data if row.get(col_name) is not None), None)
+            if isinstance(value, bool):
+                columns_metadata[col_name] = {"type": "BOOLEAN"}
+            elif isinstance(value, int):
+                columns_metadata[col_name] = {"type": "INT"}
+            elif isinstance(value, float):
+                columns_metadata[col_name] = {"type": "FLOAT"}
+            elif isinstance(value, str) and DATE_PATTERN.match(value):
+                columns_metadata[col_name] = {"type": "DATE"}
             else:
-                # Deviner le type basé sur la valeur
-                if value.lower() in ("true", "false"):
-                    columns_metadata[col_name] = {"type": "BOOLEAN"}
-                elif re.match(r"^\d{4}-\d{2}-\d{2}$", value):
-                    columns_metadata[col_name] = {"type": "DATE"}
-                elif value.replace('.', '').replace('-', '').isdigit():
-                    if '.' in value:
-                        columns_metadata[col_name] = {"type": "FLOAT"}
-                    else:
-                        columns_metadata[col_name] = {"type": "INT"}
-                else:
-                    columns_metadata[col_name] = {"type": "TEXT"}
+                columns_metadata[col_name] = {"type": "TEXT"}
         
         return columns_metadata
 
-    def _apply_additional_filters(self, data, condition, order_by, columns_metadata):
-        """Appliquer des conditions et tri supplémentaires sur les résultats d'une vue"""
+    def _apply_additional_filters(self, data, condition, order_by, columns_metadata, limit=None):
+        """Appliquer des conditions et tri supplémentaires sur les résultats d'une vue
+
+        Avec limit, seules les limit premières lignes triées sont gardées (top-k).
+        """
         if not data:
             return data
         
         # Filtrer par condition
         if condition:
-            filtered_data = [row for row in data if evaluate_condition(row, condition, columns_metadata)]
+            predicate = compile_condition(condition, columns_metadata)
+            filtered_data = [row for row in data if predicate(row)]
         else:
             filtered_data = data
         
         # Trier
         if order_by:
-            def sort_key(row):
-                keys = []
-                for order in order_by:
-                    col = order["column"]
-                    direction = order["direction"]
-                    value = row.get(col, "null")
-                    col_type = columns_metadata.get(col, {}).get("type", "TEXT")
-
-                    # Gestion NULL
-                    if value == "null":
-                        sort_val = (0, None)
-                    else:
-                        # Conversion selon le type
-                        if col_type == "INT":
-                            sort_val = (1, int(value))
-                        elif col_type == "FLOAT":
-                            sort_val = (1, float(value))
-                        elif col_type == "DATE":
-                            sort_val = (1, datetime.strptime(value, "%Y-%m-%d"))
-                        elif col_type in ("TEXT", "VARCHAR"):
-                            sort_val = (1, value.lower())  # insensible à la casse
-                        elif col_type == "BOOLEAN":
-                            sort_val = (1, value.lower() == "true")
-                        else:
-                            sort_val = (1, str(value))
-
-                    # Inversion pour DESC
-                    if direction == "DESC":
-                        if sort_val[1] is None:
-                            sort_val = (2, None)  # null en dernier
-                        elif isinstance(sort_val[1], (int, float)):
-                            sort_val = (sort_val[0], -sort_val[1])
-                        elif isinstance(sort_val[1], datetime):
-                            sort_val = (sort_val[0], -sort_val[1].timestamp())
-                        elif isinstance(sort_val[1], bool):
-                            sort_val = (sort_val[0], not sort_val[1])
-                        # TEXT et VARCHAR : on garde, on inverse après
-
-                    keys.append(sort_val)
-                return tuple(keys)
-
-            # Tri final
-            filtered_data = sorted(filtered_data, key=sort_key)
-
-            # Pour DESC sur TEXT/VARCHAR : on inverse si nécessaire
-            if any(order["direction"] == "DESC" and 
-                columns_metadata.get(order["column"], {}).get("type") in ("TEXT", "VARCHAR") 
-                for order in order_by):
-                filtered_data = filtered_data[::-1]
+            key = sort_key([(str(order.column), columns_metadata.get(str(order.column), {}).get("type", "TEXT"),
+                             order.direction) for order in order_by])
+            if limit is not None:
+                filtered_data = top_k(filtered_data, limit, key)
+            else:
+                filtered_data = sorted(filtered_data, key=key)
         
         return filtered_data
 
@@ -716,16 +563,27 @@ class DataManager:
             "LISTE BASES": "LISTE BASES : Liste toutes les bases",
             "EXPORTER BASE": "EXPORTER BASE nom : Exporte une base en ZIP",
             "IMPORTER BASE": "IMPORTER BASE nom FICHIER chemin : Importe une base depuis un ZIP",
+            "MIGRER BASE": "MIGRER BASE nom : Convertit une base à l'ancien format (valeurs en texte) vers les valeurs natives",
             
-            "CRAFTER TABLEAU": "CRAFTER TABLEAU nom (col1 TYPE [constraints], ...) : Crée une table",
+            "CRAFTER TABLEAU": "CRAFTER TABLEAU nom (col1 TYPE [constraints], ...) [STOCKAGE PAGES|JSON|COLONNES] : Crée une table",
             "DEPOP TABLEAU": "DEPOP TABLEAU nom : Supprime une table",
             "LISTE TABLEAUX": "LISTE TABLEAUX : Liste toutes les tables",
+            "CRAFTER INDEX": "CRAFTER INDEX nom SUR table(colonne) : Crée un index B+tree utilisé par LOOT (=, <, >)",
+            "DEPOP INDEX": "DEPOP INDEX nom : Supprime un index",
+            "LISTE INDEX": "LISTE INDEX : Liste tous les index",
             
-            "POP DANS": "POP DANS table VALEURS (val1, val2, ...) : Insère une ligne",
-            "LOOT": "LOOT * DANS table [AVEC condition] [TRIER PAR col1 [ASC|DESC], ...] : Sélectionne des données",
+            "POP DANS": "POP DANS table VALEURS (val1, val2, ...)[, (...)] : Insère une ou plusieurs lignes",
+            "CHARGER DANS": "CHARGER DANS table FICHIER 'chemin.csv' : Charge un fichier CSV ou JSONL en une seule écriture",
+            "PREPARER": "PREPARER nom COMME \"requête avec ?\" : Analyse une requête une fois pour l'exécuter plusieurs fois",
+            "EXECUTER": "EXECUTER nom [VALEURS (val1, ...), (...)] : Exécute une requête préparée (un POP DANS multi-lignes est écrit en un lot)",
+            "LOOT": "LOOT * DANS table [AVEC condition] [TRIER PAR col1 [ASC|DESC], ...] [LIMITE n [DECALAGE m]] : Sélectionne des données",
+            "GROUPER PAR": "LOOT col, COMPTER(*), SOMME(col2) DANS table [AVEC condition] GROUPER PAR col [AYANT COMPTER(*) > '1'] : Agrège les lignes (COMPTER, SOMME, MOYENNE, MIN, MAX) en un seul parcours",
+            "EXPLIQUER": "EXPLIQUER [ANALYSER] LOOT ... : Affiche le plan choisi (ANALYSER l'exécute : lignes réelles et temps par opérateur)",
             "EDIT": "EDIT table DEFINIR col='val' AVEC condition : Met à jour des lignes",
             "DEPOP DANS": "DEPOP DANS table AVEC condition : Supprime des lignes",
             "STATS TABLEAU": "STATS TABLEAU nom : Affiche des statistiques sur une table",
+            "ANALYSER TABLEAU": "ANALYSER TABLEAU nom : Recalcule les statistiques du planificateur (sinon faites par le checkpointer)",
+            "STATS CACHE": "STATS CACHE : Affiche les statistiques du buffer cache",
             
             "DEBUT TRANSACTION": "DEBUT TRANSACTION : Démarre une transaction",
             "VALIDER TRANSACTION": "VALIDER TRANSACTION : Valide la transaction",
@@ -768,9 +626,9 @@ class DataManager:
             # Grouper par catégorie pour une meilleure lisibilité
             categories = {
                 "Joueurs": ["LOGIN JOUEUR", "CRAFTER JOUEUR", "EDIT JOUEUR", "LISTE JOUEURS", "LISTE PERMISSIONS JOUEUR"],
-                "Bases": ["CRAFTER BASE", "DEPOP BASE", "UTILISER", "QUITTER BASE", "LISTE BASES", "EXPORTER BASE", "IMPORTER BASE"],
-                "Tables": ["CRAFTER TABLEAU", "DEPOP TABLEAU", "LISTE TABLEAUX"],
-                "Données": ["POP DANS", "LOOT", "EDIT", "DEPOP DANS", "STATS TABLEAU"],
+                "Bases": ["CRAFTER BASE", "DEPOP BASE", "UTILISER", "QUITTER BASE", "LISTE BASES", "EXPORTER BASE", "IMPORTER BASE", "MIGRER BASE"],
+                "Tables": ["CRAFTER TABLEAU", "DEPOP TABLEAU", "LISTE TABLEAUX", "CRAFTER INDEX", "DEPOP INDEX", "LISTE INDEX"],
+                "Données": ["POP DANS", "CHARGER DANS", "PREPARER", "EXECUTER", "LOOT", "GROUPER PAR", "EXPLIQUER", "EDIT", "DEPOP DANS", "STATS TABLEAU", "ANALYSER TABLEAU", "STATS CACHE"],
                 "Transactions": ["DEBUT TRANSACTION", "VALIDER TRANSACTION", "ANNULER TRANSACTION", "STATUS TRANSACTION"],
                 "Vues": ["CRAFTER VUE", "DEPOP VUE", "LISTE VUES"],
                 "Snapshots": ["SNAPSHOT TABLEAU", "VOIR SNAPSHOT", "VOYAGE TABLEAU", "LISTE SNAPSHOTS", "DEPOP SNAPSHOT"],
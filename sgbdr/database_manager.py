@@ -2,6 +2,8 @@ import json
 import shutil
 import zipfile
 from pathlib import Path
+from .catalog import ROW_FORMAT
+from .migration import migrate_database
 
 class DatabaseManager:
     def __init__(self, db_path, sgbdr):
@@ -23,7 +25,7 @@ class DatabaseManager:
             return
         db_dir.mkdir(exist_ok=True)
         with open(db_dir / "metadata.json", "w") as f:
-            json.dump({"tables": {}}, f, indent=2)
+            json.dump({"format": ROW_FORMAT, "tables": {}}, f, indent=2)
         print(f"╔════════════════════════════════════")
         print(f"║ Base {db_name} craftée avec succès ! GG")
         print(f"╚════════════════════════════════════")
@@ -36,7 +38,10 @@ class DatabaseManager:
         db_dir = self.db_path / db_name
         if not db_dir.exists():
             raise ValueError(f"Base {db_name} introuvable. T’as raté la map ?")
+        self.sgbdr.wal_manager.forget(db_name)
         shutil.rmtree(db_dir)
+        self.sgbdr.catalog_manager.invalidate(db_name)
+        self.sgbdr.storage_manager.invalidate(db_name)
         print(f"╔════════════════════════════════════")
         print(f"║ Base {db_name} pulvérisée !")
         print(f"╚════════════════════════════════════")
@@ -45,6 +50,9 @@ class DatabaseManager:
         """Sélectionner une base de données"""
         self.sgbdr.user_manager.check_permission("read")
         if (self.db_path / db_name).exists():
+            self.sgbdr.wal_manager.recover(db_name)
+            if self.sgbdr.catalog_manager.get(db_name).format < ROW_FORMAT:
+                raise ValueError(f"Base {db_name} à l'ancien format (valeurs en texte). Lance d'abord MIGRER BASE {db_name}")
             self.sgbdr.current_db = db_name
             print(f"╔════════════════════════════════════")
             print(f"║ Switch vers la base {db_name}.")
@@ -74,16 +82,35 @@ class DatabaseManager:
         print(f"╚════════════════════════════════════")
         return databases
 
+    def migrate_database(self, db_name):
+        """Convertir une base à l'ancien format vers les valeurs natives (MIGRER BASE)"""
+        self.sgbdr.user_manager.check_permission("write")
+        self.report_migration(db_name, migrate_database(self.sgbdr, db_name))
+
+    def report_migration(self, db_name, result):
+        print(f"╔════════════════════════════════════")
+        if result is None:
+            print(f"║ Base {db_name} déjà au format {ROW_FORMAT}, rien à migrer.")
+        else:
+            tables, rows, snapshots = result
+            print(f"║ Base {db_name} migrée : {tables} tables, {rows} lignes, {snapshots} snapshots convertis !")
+        print(f"╚════════════════════════════════════")
+
     def export_database(self, db_name):
         """Exporter une base de données dans un fichier ZIP"""
         self.sgbdr.user_manager.check_permission("write")
         db_dir = self.db_path / db_name
         if not db_dir.exists():
             raise ValueError(f"Base {db_name} introuvable. T’as raté la map ?")
+        if self.sgbdr.transaction_manager.in_progress(db_name):
+            raise ValueError(f"Transaction en cours sur {db_name} : valide-la ou annule-la avant d'exporter !")
         zip_path = self.db_path / f"{db_name}.zip"
+        # Les fichiers de tables doivent contenir les écritures encore dans le WAL
+        self.sgbdr.wal_manager.checkpoint(db_name)
         with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-            for file_path in db_dir.glob("*.json"):
-                zipf.write(file_path, f"{db_name}/{file_path.name}")
+            for file_path in db_dir.iterdir():
+                if file_path.is_file():
+                    zipf.write(file_path, f"{db_name}/{file_path.name}")
         print(f"╔════════════════════════════════════")
         print(f"║ Base {db_name} exportée dans {zip_path} !")
         print(f"╚════════════════════════════════════")
@@ -128,4 +155,6 @@ class DatabaseManager:
             
             print(f"╔════════════════════════════════════")
             print(f"║ Base {db_name} importée depuis {zip_path} !")
+            if self.sgbdr.catalog_manager.get(db_name).format < ROW_FORMAT:
+                print(f"║ Ancien format : lance MIGRER BASE {db_name} avant de l'utiliser.")
             print(f"╚════════════════════════════════════")
\ No newline at end of file
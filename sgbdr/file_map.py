@@ -0,0 +1,19 @@
+# sgbdr/file_map.py
+# Lecture des fichiers de tables par projection en mémoire (mmap en lecture seule) : les lecteurs
+# reçoivent des tranches memoryview du cache de pages du système, sans copie dans un tampon Python.
+# Les lecteurs d'un même processus, ou de processus forkés, partagent ainsi les mêmes pages.
+import mmap
+import os
+
+
+def map_file(path):
+    """Contenu d'un fichier en memoryview (vide pour un fichier vide).
+
+    Pas de fermeture explicite : la projection est libérée avec la dernière tranche qui y fait
+    référence, une lecture interrompue (générateur abandonné) ne peut donc pas la laisser ouverte.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return memoryview(b"")
+        # mmap garde son propre descripteur : le fichier peut être fermé tout de suite
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
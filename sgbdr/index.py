@@ -0,0 +1,322 @@
+# sgbdr/index.py
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from .btree import BPlusTree
+from .utils import CONVERTERS, parse_date
+
+
+def index_key(col_type, value):
+    """Clé typée d'une valeur stockée ou d'un littéral pour un B+tree
+    (None pour NULL ou une valeur inconvertible : non indexée)"""
+    if value is None or value == "null":
+        return None
+    try:
+        if col_type == "DATE":
+            return parse_date(value).toordinal()
+        convert = CONVERTERS.get(col_type)
+        key = convert(value) if convert else value
+    except (ValueError, TypeError, AttributeError):
+        return None
+    # NaN n'est comparable à rien
+    return key if key == key else None
+
+
+def hash_key(col_type, value):
+    """Valeur stockée égale à un littéral, à chercher dans un index de hachage pour un test =.
+
+    None si le littéral est NULL ou ne correspond à aucune valeur possible de la colonne.
+    """
+    if value is None or value == "null":
+        return None
+    try:
+        if col_type == "INT":
+            try:
+                return int(value)
+            except ValueError:
+                # Littéral écrit comme un décimal ("3.0") : égal à un entier seulement s'il n'a pas de partie fractionnaire
+                number = float(value)
+                return int(number) if number.is_integer() else None
+        convert = CONVERTERS.get(col_type)
+        key = convert(value) if convert else value
+    except (ValueError, TypeError, OverflowError):
+        return None
+    return key if key == key else None
+
+
+class HashIndex:
+    """Index de hachage d'une colonne PRIMARY KEY / UNIQUE : valeur stockée -> row ID"""
+    kind = "hash"
+
+    def __init__(self, column, col_type=None):
+        self.name = column
+        self.column = column
+        self.col_type = col_type
+        self.entries = {}
+        # Inverse row ID -> valeur : retirer une ligne sans la relire
+        self._values = {}
+
+    def get(self, value):
+        """Row ID de la ligne qui porte cette valeur, ou None"""
+        return self.entries.get(value)
+
+    def add(self, rid, row):
+        value = row.get(self.column)
+        if value is None:
+            return
+        self.entries[value] = rid
+        self._values[rid] = value
+
+    def remove(self, rid):
+        value = self._values.pop(rid, None)
+        if value is not None and self.entries.get(value) == rid:
+            del self.entries[value]
+
+    def remap(self, new_rid):
+        """Renuméroter les row IDs (moteurs à row ID positionnel)"""
+        self._values = {new_rid(rid): value for rid, value in self._values.items()}
+        self.entries = {value: rid for rid, value in self._values.items()}
+
+    def dump(self):
+        return [[value, rid] for value, rid in self.entries.items()]
+
+    def load(self, entries):
+        for value, rid in entries:
+            self.entries[value] = rid
+            self._values[rid] = value
+
+
+class BTreeIndex:
+    """Index secondaire B+tree (CRAFTER INDEX) : clés (valeur typée, row ID) triées"""
+    kind = "btree"
+
+    def __init__(self, name, column, col_type):
+        self.name = name
+        self.column = column
+        self.col_type = col_type
+        self.tree = BPlusTree()
+        self._values = {}
+
+    def key(self, value):
+        return index_key(self.col_type, value)
+
+    def add(self, rid, row):
+        key = self.key(row.get(self.column))
+        if key is None:
+            return
+        self.tree.insert((key, rid))
+        self._values[rid] = key
+
+    def remove(self, rid):
+        key = self._values.pop(rid, None)
+        if key is not None:
+            self.tree.delete((key, rid))
+
+    def range(self, lower=None, lower_inclusive=True, upper=None, upper_inclusive=True):
+        """Row IDs des lignes dont la clé est dans l'intervalle (bornes None : non bornées)"""
+        for key, rid in self.tree.iter_from(None if lower is None else (lower,)):
+            if upper is not None and (key > upper or (key == upper and not upper_inclusive)):
+                break
+            if not lower_inclusive and key == lower:
+                continue
+            yield rid
+
+    def remap(self, new_rid):
+        """Renuméroter les row IDs ; new_rid est croissante, l'ordre des clés est conservé"""
+        self.load([(key, new_rid(rid)) for key, rid in self.tree])
+
+    def dump(self):
+        return [[key, rid] for key, rid in self.tree]
+
+    def load(self, entries):
+        keys = [(key, rid) for key, rid in entries]
+        self.tree = BPlusTree.bulk_load(keys)
+        self._values = {rid: key for key, rid in keys}
+
+
+class TableIndexes:
+    """Index d'une table, chargés depuis _index/ au premier usage et maintenus à chaque écriture.
+
+    Un fichier d'index porte la signature (mtime, taille) du fichier de la table au moment où
+    il a été écrit : s'il ne correspond plus (rejeu du WAL, fichiers restaurés), l'index est
+    reconstruit par un parcours de la table.
+    """
+
+    def __init__(self, storage, table_def=None, index_defs=()):
+        self.storage = storage
+        self.index_dir = storage.db_dir / "_index"
+        self._indexes = None
+        self._changed = False
+        # Faux une fois les fichiers supprimés : inutile de recommencer à chaque écriture
+        self._on_disk = True
+        self._lock = threading.RLock()
+        self.define(table_def, index_defs)
+
+    def define(self, table_def, index_defs):
+        """(Re)définir les index de la table depuis le catalogue : ils sont rechargés au prochain usage"""
+        with self._lock:
+            self.unique_columns = [(col, table_def.column(col).type) for col in table_def.unique] if table_def else []
+            self.btree_defs = [(index.name, index.column, table_def.column(index.column).type)
+                               for index in index_defs]
+            self._indexes = None
+            self._changed = False
+
+    def _path(self, index):
+        return self.index_dir / f"{self.storage.table_name}.{index.name}.{index.kind}"
+
+    def _signature(self):
+        try:
+            stat = self.storage.path.stat()
+        except FileNotFoundError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def _new_indexes(self):
+        indexes = {("hash", column): HashIndex(column, col_type) for column, col_type in self.unique_columns}
+        for name, column, col_type in self.btree_defs:
+            indexes[("btree", name)] = BTreeIndex(name, column, col_type)
+        return indexes
+
+    def _load(self):
+        if self._indexes is not None:
+            return self._indexes
+        indexes = self._new_indexes()
+        if not self._load_files(indexes):
+            indexes = self._new_indexes()
+            for rid, row in self.storage.scan():
+                for index in indexes.values():
+                    index.add(rid, row)
+            self._changed = True
+        self._indexes = indexes
+        self.save()
+        return indexes
+
+    def _load_files(self, indexes):
+        """Charger les index persistés s'ils correspondent à l'état de la table sur disque"""
+        if self.storage.dirty:
+            return False
+        signature = self._signature()
+        for index in indexes.values():
+            path = self._path(index)
+            if not path.exists():
+                return False
+            with open(path, "r") as f:
+                saved = json.load(f)
+            if saved.get("signature") != signature:
+                return False
+            index.load(saved["entries"])
+        return True
+
+    def unique(self, column):
+        """Index de hachage d'une colonne PRIMARY KEY / UNIQUE"""
+        with self._lock:
+            return self._load()[("hash", column)]
+
+    def btrees(self):
+        """Index B+tree de la table"""
+        with self._lock:
+            if not self.btree_defs:
+                return []
+            return [index for index in self._load().values() if index.kind == BTreeIndex.kind]
+
+    def save(self):
+        """Persister les index modifiés, une fois les écritures de la table sur disque"""
+        with self._lock:
+            if self._indexes is None or not self._changed or self.storage.dirty:
+                return
+            signature = self._signature()
+            if signature is None:
+                return
+            self.index_dir.mkdir(exist_ok=True)
+            for index in self._indexes.values():
+                path = self._path(index)
+                tmp_path = path.with_suffix(".tmp")
+                with open(tmp_path, "w") as f:
+                    json.dump({"signature": signature, "entries": index.dump()}, f)
+                os.replace(tmp_path, path)
+            self._changed = False
+            self._on_disk = True
+
+    def reset(self):
+        """Oublier les index : ils seront reconstruits au prochain usage"""
+        with self._lock:
+            self._indexes = None
+            self._changed = False
+            self.drop()
+
+    def drop(self):
+        self._on_disk = False
+        for index in self._new_indexes().values():
+            self._unlink(index)
+
+    def drop_btree(self, name):
+        """Supprimer le fichier d'un index B+tree (DEPOP INDEX)"""
+        self._unlink(BTreeIndex(name, None, None))
+
+    def _unlink(self, index):
+        path = self._path(index)
+        if path.exists():
+            path.unlink()
+
+    # --- Maintenance (appelée par LoggedTableStorage sous le verrou du WAL) ---
+
+    def _loaded(self):
+        """Index en mémoire à maintenir, ou None (ils sont alors invalidés sur disque)"""
+        if self._indexes is None:
+            if self._on_disk:
+                self.drop()
+            return None
+        self._changed = True
+        return self._indexes
+
+    def on_insert(self, rid, row):
+        with self._lock:
+            indexes = self._loaded()
+            for index in (indexes or {}).values():
+                index.add(rid, row)
+
+    def on_update(self, moved, changes):
+        with self._lock:
+            indexes = self._loaded()
+            for index in (indexes or {}).values():
+                for rid in changes:
+                    index.remove(rid)
+                for rid, row in changes.items():
+                    index.add(moved[rid], row)
+
+    def on_delete(self, rids):
+        with self._lock:
+            indexes = self._loaded()
+            if not indexes:
+                return
+            for index in indexes.values():
+                for rid in rids:
+                    index.remove(rid)
+            if not self.storage.stable_rids:
+                # Row IDs positionnels : chaque ligne recule du nombre de lignes supprimées avant elle
+                deleted = sorted(set(rids))
+                for index in indexes.values():
+                    index.remap(lambda rid: rid - bisect_left(deleted, rid))
+
+    def on_restore(self, items):
+        """Lignes remises à leurs row IDs (annulation d'une suppression)"""
+        with self._lock:
+            indexes = self._loaded()
+            if not indexes:
+                return
+            if not self.storage.stable_rids:
+                # Row IDs positionnels : chaque ligne avance du nombre de lignes réinsérées avant sa nouvelle position
+                restored = sorted(rid for rid, _ in items)
+
+                def new_rid(rid):
+                    shift = bisect_right(restored, rid)
+                    while bisect_right(restored, rid + shift) != shift:
+                        shift = bisect_right(restored, rid + shift)
+                    return rid + shift
+
+                for index in indexes.values():
+                    index.remap(new_rid)
+            for index in indexes.values():
+                for rid, row in items:
+                    index.add(rid, row)
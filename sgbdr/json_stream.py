@@ -0,0 +1,83 @@
+# sgbdr/json_stream.py
+# Lecture et écriture en flux d'un tableau JSON de lignes (format du moteur JSON). Le fichier est
+# projeté en mémoire (mmap) puis décodé objet par objet : ni le texte entier ni toutes les lignes
+# ne sont jamais en mémoire en même temps.
+import codecs
+import json
+import os
+from .file_map import map_file
+
+# Octets décodés à la fois depuis le fichier projeté (doublé tant qu'un objet n'est pas complet)
+CHUNK_SIZE = 64 * 1024
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def iter_array(path):
+    """Itérer sur les éléments du tableau JSON d'un fichier, décodés un par un"""
+    data = map_file(path)
+    if not data:
+        raise json.JSONDecodeError("Expecting value", "", 0)
+    return _elements(data, len(data))
+
+
+def _elements(data, size):
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    text, pos, offset = "", 0, 0
+    chunk = CHUNK_SIZE
+    # Attendu ensuite : "[" ouvrant, premier élément (ou "]"), puis "," ou "]" après chaque élément
+    expect = "["
+    while True:
+        while pos < len(text) and text[pos] in _WHITESPACE:
+            pos += 1
+        if pos == len(text) or expect == "value":
+            if pos == len(text) and offset >= size:
+                raise json.JSONDecodeError("Unterminated array", text, pos)
+            if expect == "value":
+                try:
+                    value, end = _DECODER.raw_decode(text, pos)
+                except json.JSONDecodeError:
+                    if offset >= size:
+                        raise
+                    end = None
+                # Valeur coupée par la fin du morceau (ou qui pourrait l'être, comme un nombre) : relire plus loin
+                if end is not None and (end < len(text) or offset >= size):
+                    yield value
+                    pos, expect, chunk = end, ",", CHUNK_SIZE
+                    continue
+                chunk *= 2
+            # Tranche memoryview de la projection : décodée directement, sans copie intermédiaire
+            text = text[pos:] + decoder.decode(data[offset:offset + chunk], final=offset + chunk >= size)
+            pos, offset = 0, offset + chunk
+            continue
+
+        char = text[pos]
+        if expect == "[":
+            if char != "[":
+                raise json.JSONDecodeError("Expecting '['", text, pos)
+            pos, expect = pos + 1, "first"
+        elif char == "]" and expect in ("first", ","):
+            return
+        elif expect == ",":
+            if char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+            pos, expect = pos + 1, "value"
+        else:
+            expect = "value"
+
+
+def write_array(path, rows):
+    """Écrire des lignes au fil de l'itérable dans un fichier temporaire, avec la mise en forme de
+    json.dump(rows, indent=2), puis le mettre à la place de path (os.replace, atomique)"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        separator = "[\n  "
+        for row in rows:
+            f.write(separator)
+            # Les chaînes JSON n'ont pas de saut de ligne brut : réindenter ligne à ligne est sûr
+            f.write(json.dumps(row, indent=2).replace("\n", "\n  "))
+            separator = ",\n  "
+        f.write("[]" if separator == "[\n  " else "\n]")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,97 @@
+# sgbdr/migration.py
+# Passage d'une base du format 1 (valeurs stockées en texte : "42", "true", "null") au format 2
+# (valeurs JSON natives). Chaque valeur n'est convertie qu'une fois ; relancer la migration sur
+# une table déjà convertie ne change rien, une migration interrompue peut donc être reprise.
+import json
+import os
+import sys
+from .catalog import ROW_FORMAT
+from .utils import to_native
+
+
+def migrate_row(row, types):
+    """Ligne au format texte -> ligne aux valeurs natives (colonnes hors schéma gardées telles quelles)"""
+    return {col: to_native(value, types.get(col, "TEXT")) for col, value in row.items()}
+
+
+def _migrate_rows(rows, table_def, where):
+    types = {name: column.type for name, column in table_def.columns.items()}
+    migrated = []
+    for position, row in enumerate(rows, 1):
+        try:
+            migrated.append(migrate_row(row, types))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"{where}, ligne {position} : valeur inconvertible ({e})")
+    return migrated
+
+
+def _migrate_snapshots(db_dir, catalog):
+    """Convertir les lignes des snapshots (restaurées telles quelles par VOYAGE TABLEAU)"""
+    count = 0
+    for table_name, table_def in catalog.tables.items():
+        for snapshot_file in sorted((db_dir / "_snapshots" / table_name).glob("*.json")):
+            with open(snapshot_file, "r") as f:
+                snapshot = json.load(f)
+            snapshot["data"] = _migrate_rows(snapshot["data"], table_def, f"Snapshot {snapshot_file.stem}")
+            tmp_path = snapshot_file.with_suffix(".json.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, f, indent=2)
+            os.replace(tmp_path, snapshot_file)
+            count += 1
+    return count
+
+
+def migrate_database(sgbdr, db_name):
+    """Migrer une base vers le format natif : tables (tous moteurs), snapshots, puis metadata.json.
+
+    Retourne (tables, lignes, snapshots) convertis, ou None si la base est déjà au format courant.
+    """
+    db_dir = sgbdr.db_path / db_name
+    if not (db_dir / "metadata.json").exists():
+        raise ValueError(f"Base {db_name} introuvable. T’as raté la map ?")
+    if sgbdr.transaction_manager.in_progress(db_name):
+        raise ValueError(f"Transaction en cours sur {db_name} : valide-la ou annule-la avant de migrer !")
+    # Écritures encore dans le WAL rejouées et écrites dans les fichiers de tables
+    sgbdr.wal_manager.recover(db_name)
+    sgbdr.wal_manager.checkpoint(db_name)
+    catalog = sgbdr.catalog_manager.get(db_name)
+    if catalog.format >= ROW_FORMAT:
+        return None
+
+    row_count = 0
+    for table_name, table_def in catalog.tables.items():
+        storage = sgbdr.storage_manager.get_storage(table_name, db_name)
+        if not storage.exists():
+            continue
+        rows = _migrate_rows(storage.read_all(), table_def, f"Table {table_name}")
+        # Réécriture complète journalisée ; les index sont reconstruits avec les nouvelles clés
+        storage.write_all(rows)
+        row_count += len(rows)
+    snapshot_count = _migrate_snapshots(db_dir, catalog)
+
+    metadata = catalog.metadata()
+    metadata["format"] = ROW_FORMAT
+    sgbdr.catalog_manager.save_metadata(metadata, db_name)
+    return len(catalog.tables), row_count, snapshot_count
+
+
+def main(argv):
+    """python -m sgbdr.migration nom_base [...] [--dossier bases_de_donnees]"""
+    from .sgbdr import SGBDR
+
+    db_path = "bases_de_donnees"
+    if "--dossier" in argv:
+        position = argv.index("--dossier")
+        db_path = argv[position + 1]
+        argv = argv[:position] + argv[position + 2:]
+    if not argv:
+        print("Usage : python -m sgbdr.migration nom_base [...] [--dossier bases_de_donnees]")
+        return 1
+    sgbdr = SGBDR(db_path)
+    for db_name in argv:
+        sgbdr.database_manager.report_migration(db_name, migrate_database(sgbdr, db_name))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,1020 @@
+# sgbdr/planner.py
+import math
+import time
+from itertools import islice
+from .aggregates import accumulator_factory, output_type
+from .buffer_cache import BUFFER_CACHE
+from .index import hash_key, index_key
+from .query_ast import Aggregate, And, Column, Literal, Or, Parameter
+from .rows import Row, compact, compact_rows, join_rows, layout_of
+from .sorting import DEFAULT_SORT_MEMORY_BUDGET, external_sort, sort_key, top_k
+from .statistics import TableStatistics
+from .utils import compile_atoms, compile_condition, conjunctive_atoms, literal_value
+from .vectorized import compile_vector_condition, filter_batches
+
+# Coûts relatifs, l'unité étant une ligne lue et testée par un parcours séquentiel
+SEQ_ROW_COST = 1.0
+# Ligne isolée lue via un index : sur une table à pages (lecture d'une page au hasard), sur une
+# table JSON (déjà décodée dans le buffer cache, mais parcours de l'index et tri des row IDs en plus)
+RANDOM_ROW_COST = 4.0
+CACHED_ROW_COST = 1.5
+# Descente dans un index (B+tree ou hachage)
+INDEX_PROBE_COST = 2.0
+# Ligne ajoutée à la table de hachage d'une jointure, ligne qui la sonde
+HASH_BUILD_COST = 1.5
+HASH_PROBE_COST = 1.0
+# Comparaison d'un tri (n log n comparaisons)
+SORT_COMPARE_COST = 0.1
+
+# Row IDs lus ensemble par un parcours d'index ou une jointure par index (pages lues une fois par lot)
+FETCH_BATCH_SIZE = 1024
+
+# Sélectivités sans statistiques exploitables
+DEFAULT_EQ_SELECTIVITY = 0.1
+DEFAULT_RANGE_SELECTIVITY = 1 / 3
+
+
+def _atoms_text(atoms):
+    return " ET ".join(f"{column} {op} {value if isinstance(value, Parameter) else Literal(value)}"
+                       for column, op, value in atoms)
+
+
+def _range_bounds(index, conditions):
+    """(borne basse, incluse ?, borne haute, incluse ?) des conditions (opérateur, valeur) =, < et >
+    sur la colonne d'un B+tree, ou None si une valeur n'a pas de clé (NULL, inconvertible)"""
+    lower, lower_inclusive, upper, upper_inclusive = None, True, None, True
+    for op, value in conditions:
+        key = index.key(value)
+        if key is None:
+            return None
+        if op in ("=", ">") and (lower is None or key > lower or (key == lower and op == ">")):
+            lower, lower_inclusive = key, op == "="
+        if op in ("=", "<") and (upper is None or key < upper or (key == upper and op == "<")):
+            upper, upper_inclusive = key, op == "="
+    return lower, lower_inclusive, upper, upper_inclusive
+
+
+def _join_condition_parts(join_condition):
+    """Découper la condition d'une jointure en conditions reliées par ET au premier niveau.
+
+    ET est prioritaire sur OU : t1.a = t2.b ET x OU y se lit (t1.a = t2.b ET x) OU y et reste
+    entière (un seul élément), l'équijointure ne s'appliquant pas à toutes les lignes.
+    """
+    if join_condition is None:
+        return []
+    if isinstance(join_condition, And):
+        return list(join_condition.items)
+    return [join_condition]
+
+
+def _first_comparison(condition):
+    """Première comparaison (la plus à gauche) d'une condition"""
+    while isinstance(condition, (And, Or)):
+        condition = condition.items[0]
+    return condition
+
+
+# --- Opérateurs ---
+
+def _batches(rows, size):
+    """Découper un itérateur en listes d'au plus size éléments"""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+class PlanNode:
+    """Opérateur d'un plan d'exécution (modèle itérateur : chaque opérateur tire les lignes de ses enfants).
+
+    Porte ses estimations (lignes produites, coût cumulé des enfants) et, si le plan est instrumenté
+    (EXPLIQUER ANALYSER), les lignes réellement produites et le temps passé (enfants compris).
+    """
+    name = ""
+
+    def __init__(self, *children):
+        self.children = children
+        self.rows = 0
+        self.cost = 0.0
+        self.analyze = False
+        self.actual_rows = None
+        self.elapsed = None
+
+    def estimate(self, rows, cost):
+        self.rows, self.cost = max(rows, 0), cost
+        return self
+
+    def instrument(self):
+        """Compter lignes et temps de chaque opérateur à la prochaine exécution"""
+        for _, node in self.walk():
+            node.analyze = True
+            node.actual_rows, node.elapsed = 0, 0.0
+        return self
+
+    def execute(self):
+        """Itérateur des lignes de l'opérateur, produites à la demande"""
+        rows = iter(self.run())
+        return self._counted(rows) if self.analyze else rows
+
+    def _counted(self, rows):
+        while True:
+            started = time.perf_counter()
+            try:
+                row = next(rows)
+            except StopIteration:
+                self.elapsed += time.perf_counter() - started
+                return
+            self.elapsed += time.perf_counter() - started
+            self.actual_rows += 1
+            yield row
+
+    def run(self):
+        raise NotImplementedError
+
+    def detail(self):
+        return ""
+
+    def describe(self):
+        detail = self.detail()
+        return f"{self.name} {detail}" if detail else self.name
+
+    def walk(self, depth=0):
+        """(profondeur, opérateur) du plan, en préordre"""
+        yield depth, self
+        for child in self.children:
+            yield from child.walk(depth + 1)
+
+
+class SeqScan(PlanNode):
+    name = "Parcours séquentiel"
+
+    def __init__(self, storage, table, columns=None):
+        super().__init__()
+        self.storage = storage
+        self.table = table
+        # Stockage en colonnes : seules ces colonnes sont lues (None : toutes)
+        self.columns = columns if columns is not None and hasattr(storage, "scan_columns") else None
+
+    def detail(self):
+        if self.columns is not None:
+            return f"de {self.table} (colonnes : {', '.join(self.columns)})"
+        return f"de {self.table}"
+
+    def run(self):
+        # Table déjà décodée dans le buffer cache : rien à relire
+        if self.columns is not None and BUFFER_CACHE.peek(self.storage) is None:
+            return compact_rows(self.storage.scan_columns(self.columns))
+        # Lignes compactes partagées du buffer cache : converties en dicts par la projection
+        return BUFFER_CACHE.scan(self.storage)
+
+
+class IndexScan(PlanNode):
+    """Lignes trouvées par un index : recherche d'une clé (hachage) ou intervalle (B+tree).
+
+    Clé et bornes sont calculées à chaque exécution depuis les conditions servies, avec l'index
+    courant de la table : un plan préparé reste valable pour d'autres valeurs de ses paramètres et
+    après la reconstruction d'un index.
+    """
+    name = "Parcours d'index"
+
+    def __init__(self, storage, table, index, atoms, params=None):
+        super().__init__()
+        self.storage = storage
+        self.table = table
+        self.index = index
+        # Conditions (colonne, opérateur, valeur ou Parameter) servies par l'index
+        self.atoms = atoms
+        self.params = params
+
+    def detail(self):
+        kind = "unique" if self.index.kind == "hash" else "B+tree"
+        return f"{kind} {self.index.name} sur {self.table} ({_atoms_text(self.atoms)})"
+
+    def run(self):
+        bind = self.params.value if self.params is not None else lambda value: value
+        conditions = [(op, bind(value)) for _, op, value in self.atoms]
+        indexes = self.storage.indexes
+        if self.index.kind == "hash":
+            key = hash_key(self.index.col_type, conditions[0][1])
+            index = indexes.unique(self.index.column)
+            rids = None if key is None else [rid for rid in (index.get(key),) if rid is not None]
+        else:
+            index = next(index for index in indexes.btrees() if index.name == self.index.name)
+            bounds = _range_bounds(index, conditions)
+            rids = None if bounds is None else list(index.range(*bounds))
+        if rids is None:
+            # Paramètre lié à NULL ou inconvertible : toutes les lignes, jugées par le filtre au-dessus
+            return BUFFER_CACHE.scan(self.storage)
+        return fetch_rows(self.storage, rids)
+
+
+class Filter(PlanNode):
+    name = "Filtre"
+
+    def __init__(self, child, text, predicate, tolerant=False, vector=None):
+        super().__init__(child)
+        self.text = text
+        self.predicate = predicate
+        # Jointures : une ligne dont le test échoue est gardée plutôt que de tout perdre
+        self.tolerant = tolerant
+        # Même condition évaluée par masques NumPy sur des lots (colonnes INT/FLOAT/DATE), ou None
+        self.vector = vector
+
+    def detail(self):
+        return f"({self.text}, vectorisé)" if self.vector is not None else f"({self.text})"
+
+    def run(self):
+        predicate = self.predicate
+        rows = self.children[0].execute()
+        if self.tolerant:
+            return self._tolerant(predicate, rows)
+        if self.vector is not None:
+            return filter_batches(rows, self.vector, predicate)
+        return filter(predicate, rows)
+
+    @staticmethod
+    def _tolerant(predicate, rows):
+        for row in rows:
+            try:
+                if predicate(row):
+                    yield row
+            except Exception:
+                yield row
+
+
+class HashJoin(PlanNode):
+    """Table de hachage construite sur un côté (seul matérialisé), sondée au fil de l'autre"""
+    name = "Jointure par hachage"
+
+    def __init__(self, left, right, table1, table2, join_keys, build_left=False):
+        super().__init__(left, right)
+        self.table1 = table1
+        self.table2 = table2
+        self.join_keys = join_keys
+        self.build_left = build_left
+
+    def detail(self):
+        keys = " ET ".join(f"{self.table1}.{k1} = {self.table2}.{k2}" for k1, k2 in self.join_keys) \
+            or "produit cartésien"
+        return f"({keys}, hachage de {self.table1 if self.build_left else self.table2})"
+
+    def run(self):
+        keys1 = [k1 for k1, _ in self.join_keys]
+        keys2 = [k2 for _, k2 in self.join_keys]
+        table1, table2 = self.table1, self.table2
+        if self.build_left:
+            buckets = {}
+            for r1 in self.children[0].execute():
+                buckets.setdefault(tuple(r1.get(k) for k in keys1), []).append(r1)
+            for r2 in self.children[1].execute():
+                for r1 in buckets.get(tuple(r2.get(k) for k in keys2), ()):
+                    yield join_rows(table1, r1, table2, r2)
+        else:
+            buckets = {}
+            for r2 in self.children[1].execute():
+                buckets.setdefault(tuple(r2.get(k) for k in keys2), []).append(r2)
+            for r1 in self.children[0].execute():
+                for r2 in buckets.get(tuple(r1.get(k) for k in keys1), ()):
+                    yield join_rows(table1, r1, table2, r2)
+
+
+class IndexNestedLoopJoin(PlanNode):
+    """Pour chaque ligne du côté externe, recherche dans l'index unique du côté interne.
+
+    Les lignes externes sont traitées par lots : les row IDs d'un lot sont rassemblés pour ne lire
+    chaque page interne qu'une fois. Une clé externe NULL rejoint, comme dans la jointure par
+    hachage, les lignes internes NULL : elles sont cherchées par un parcours de la table interne,
+    seulement si besoin.
+    """
+    name = "Jointure par index"
+
+    def __init__(self, outer, inner_storage, inner_table, index, outer_key, other_keys,
+                 inner_filter=None, outer_is_left=True, table1=None, table2=None):
+        super().__init__(outer)
+        self.inner_storage = inner_storage
+        self.inner_table = inner_table
+        self.index = index
+        self.outer_key = outer_key
+        # (clé externe, clé interne) restantes, vérifiées sur chaque paire
+        self.other_keys = other_keys
+        self.inner_filter = inner_filter
+        self.outer_is_left = outer_is_left
+        self.table1 = table1
+        self.table2 = table2
+
+    def detail(self):
+        outer_table = self.table1 if self.outer_is_left else self.table2
+        text = f"{outer_table}.{self.outer_key} = {self.inner_table}.{self.index.column}"
+        if self.inner_filter is not None:
+            text += f", filtre {self.inner_filter[0]}"
+        return f"({text}, index unique {self.index.name} de {self.inner_table})"
+
+    def _inner_accepts(self, row):
+        if self.inner_filter is None:
+            return True
+        try:
+            return self.inner_filter[1](row)
+        except Exception:
+            return True
+
+    def run(self):
+        # Index courant de la table (reconstruit depuis la planification pour un plan préparé)
+        get = self.inner_storage.indexes.unique(self.index.column).get
+        inner_column = self.index.column
+        null_rows = None
+        for batch in _batches(self.children[0].execute(), FETCH_BATCH_SIZE):
+            rids = {}
+            for row in batch:
+                value = row.get(self.outer_key)
+                if value is not None and value not in rids:
+                    rids[value] = get(value)
+            inner_rows = fetch_map(self.inner_storage, [rid for rid in rids.values() if rid is not None])
+
+            for row in batch:
+                value = row.get(self.outer_key)
+                if value is None:
+                    if null_rows is None:
+                        null_rows = [r for r in BUFFER_CACHE.scan(self.inner_storage)
+                                     if r.get(inner_column) is None and self._inner_accepts(r)]
+                    matches = null_rows
+                else:
+                    inner = inner_rows.get(rids.get(value))
+                    matches = (inner,) if inner is not None and self._inner_accepts(inner) else ()
+                for inner in matches:
+                    if any(row.get(ko) != inner.get(ki) for ko, ki in self.other_keys):
+                        continue
+                    if self.outer_is_left:
+                        yield join_rows(self.table1, row, self.table2, inner)
+                    else:
+                        yield join_rows(self.table1, inner, self.table2, row)
+
+
+class Sort(PlanNode):
+    """Opérateur bloquant : matérialise toutes les lignes de son enfant avant d'en produire une
+    (sur disque au-delà de memory_budget)"""
+    name = "Tri"
+
+    def __init__(self, child, order_by, key, limit=None, memory_budget=DEFAULT_SORT_MEMORY_BUDGET):
+        super().__init__(child)
+        self.order_by = order_by
+        self.key = key
+        # LIMITE (+ DECALAGE) : seules les limit premières lignes sont gardées, dans un tas
+        self.limit = limit
+        self.memory_budget = memory_budget
+        self.spilled_runs = 0
+
+    def detail(self):
+        text = ", ".join(f"{order.column} {order.direction}" for order in self.order_by)
+        if self.limit is not None:
+            text += f", top {self.limit}"
+        if self.spilled_runs:
+            text += f", {self.spilled_runs} runs sur disque"
+        return f"({text})"
+
+    def run(self):
+        if self.limit is not None:
+            yield from top_k(self.children[0].execute(), self.limit, self.key)
+            return
+        stats = {}
+        yield from external_sort(self.children[0].execute(), self.key, self.memory_budget, stats)
+        self.spilled_runs = stats.get("runs", 0)
+
+class Project(PlanNode):
+    """Sortie du plan : lignes compactes -> dicts des colonnes demandées"""
+    name = "Projection"
+
+    def __init__(self, child, columns, lookup):
+        super().__init__(child)
+        self.columns = columns
+        # lookup(disposition, colonne) -> position de la colonne dans les lignes, ou None
+        self.lookup = lookup
+
+    def detail(self):
+        return "(*)" if self.columns == "*" else "(" + ", ".join(self.columns) + ")"
+
+    def run(self):
+        rows = self.children[0].execute()
+        if self.columns == "*":
+            return (row.to_dict() for row in rows)
+        return self._project(rows, [col.strip() for col in self.columns])
+
+    def _project(self, rows, columns):
+        # Positions résolues une fois par disposition, pas pour chaque ligne
+        positions = {}
+        for row in rows:
+            layout = row.layout
+            wanted = positions.get(layout)
+            if wanted is None:
+                wanted = positions[layout] = [(col, self.lookup(layout, col)) for col in columns]
+            data = row.data
+            yield {col: None if position is None else data[position] for col, position in wanted}
+
+
+class HashAggregate(PlanNode):
+    """Opérateur bloquant en une passe : un groupe par valeur des colonnes de GROUPER PAR,
+    avec un accumulateur par agrégat ; seuls les groupes sont gardés en mémoire"""
+    name = "Agrégation par hachage"
+
+    def __init__(self, child, group_fields, aggregates):
+        super().__init__(child)
+        # [(nom produit, clé dans la ligne)]
+        self.group_fields = group_fields
+        # [(nom produit, clé dans la ligne ou None pour COMPTER(*), fabrique d'accumulateur)]
+        self.aggregates = aggregates
+
+    def detail(self):
+        text = ", ".join(name for name, _, _ in self.aggregates)
+        if self.group_fields:
+            text += " par " + ", ".join(name for name, _ in self.group_fields)
+        return f"({text})"
+
+    def run(self):
+        group_keys = [key for _, key in self.group_fields]
+        fields = [key for _, key, _ in self.aggregates]
+        factories = [factory for _, _, factory in self.aggregates]
+        groups = {}
+        for row in self.children[0].execute():
+            group = tuple([row.get(key) for key in group_keys])
+            accumulators = groups.get(group)
+            if accumulators is None:
+                accumulators = groups[group] = [factory() for factory in factories]
+            for accumulator, field in zip(accumulators, fields):
+                accumulator.add(True if field is None else row.get(field))
+        if not groups and not group_keys:
+            # Agrégats sans GROUPER PAR : toujours une ligne, même sur une table vide
+            groups[()] = [factory() for factory in factories]
+
+        layout = layout_of(tuple(name for name, _ in self.group_fields) + tuple(name for name, _, _ in self.aggregates))
+        for group, accumulators in groups.items():
+            yield Row(layout, group + tuple(accumulator.result() for accumulator in accumulators))
+
+
+class Limit(PlanNode):
+    """Arrête de tirer des lignes de son enfant une fois count lignes produites (après offset ignorées)"""
+    name = "Limite"
+
+    def __init__(self, child, count=None, offset=0):
+        super().__init__(child)
+        self.count = count
+        self.offset = offset
+
+    def detail(self):
+        parts = [] if self.count is None else [str(self.count)]
+        if self.offset:
+            parts.append(f"décalage {self.offset}")
+        return "(" + ", ".join(parts) + ")"
+
+    def run(self):
+        stop = None if self.count is None else self.offset + self.count
+        return islice(self.children[0].execute(), self.offset, stop)
+
+
+def _select_lookup(layout, col_name):
+    if col_name in layout.positions:
+        return layout.positions[col_name]
+    # Essayer de trouver la colonne sans préfixe de table
+    simple_col = col_name.split('.')[-1] if '.' in col_name else col_name
+    return layout.positions.get(simple_col)
+
+
+def _join_lookup(layout, col_name):
+    if col_name in layout.positions:
+        return layout.positions[col_name]
+    simple_col = col_name.split('.')[-1] if '.' in col_name else col_name
+    for key in layout.names:
+        if key == simple_col or key.endswith('.' + simple_col):
+            return layout.positions[key]
+    return None
+
+
+def fetch_rows(storage, rids):
+    """Lignes des row IDs donnés, dans l'ordre de la table, lues par lots"""
+    rids = sorted(rids)
+    if storage.stable_rids:
+        for start in range(0, len(rids), FETCH_BATCH_SIZE):
+            yield from compact_rows(storage.fetch_many(rids[start:start + FETCH_BATCH_SIZE]))
+        return
+    if not BUFFER_CACHE.cacheable(storage):
+        # Table JSON trop grosse pour le cache : un seul parcours en flux, seules les lignes demandées gardées
+        yield from compact_rows(storage.fetch_many(rids))
+        return
+    # Moteur JSON : row ID = position, la table décodée est déjà dans le buffer cache
+    data = BUFFER_CACHE.read(storage)
+    for rid in rids:
+        if rid < len(data):
+            yield data[rid]
+
+
+def fetch_map(storage, rids):
+    """{row ID: ligne} des row IDs donnés"""
+    if storage.stable_rids or not BUFFER_CACHE.cacheable(storage):
+        return {rid: compact(row) for rid, row in storage.fetch_map(rids).items()}
+    data = BUFFER_CACHE.read(storage)
+    return {rid: data[rid] for rid in rids if rid < len(data)}
+
+
+class Planner:
+    """Traduit un LOOT analysé en arbre d'opérateurs, en choisissant chemins d'accès et jointures
+    d'après les statistiques des tables (EXPLIQUER affiche le plan retenu)"""
+
+    def __init__(self, db_path, sgbdr):
+        self.db_path = db_path
+        self.sgbdr = sgbdr
+        self.buffer_cache = BUFFER_CACHE
+        # Budget mémoire d'un TRIER PAR avant écriture de runs sur disque (octets)
+        self.sort_memory_budget = DEFAULT_SORT_MEMORY_BUDGET
+
+    def set_sgbdr(self, sgbdr):
+        """Définir la référence à l'instance SGBDR"""
+        self.sgbdr = sgbdr
+
+    # --- Statistiques ---
+
+    def statistics(self, storage, table_def):
+        """Statistiques d'une table, tenues à jour par ses écritures : planifier ne lit jamais la table.
+
+        Une table pas encore analysée (par ANALYSER TABLEAU ou le checkpointer) est estimée avec les
+        sélectivités par défaut, d'après le nombre de ses lignes en cache s'il est connu.
+        """
+        stats = storage.statistics.get()
+        if stats is not None:
+            return stats
+        cached_rows = self.buffer_cache.peek(storage)
+        if cached_rows is not None:
+            return TableStatistics.unknown(table_def, len(cached_rows))
+        return TableStatistics.unknown(table_def)
+
+    @staticmethod
+    def _atom_selectivity(stats, table_def, column, op, value):
+        """Proportion estimée des lignes qui vérifient colonne op valeur"""
+        column = column.split(".")[-1]
+        col_stats = stats.columns.get(column)
+        if col_stats is None or not stats.row_count or column not in table_def.columns:
+            return DEFAULT_EQ_SELECTIVITY if op == "=" else 1 - DEFAULT_EQ_SELECTIVITY if op == "!=" else DEFAULT_RANGE_SELECTIVITY
+        null_fraction = col_stats.nulls / stats.row_count
+        if value == "null":
+            return null_fraction if op == "=" else 1 - null_fraction if op == "!=" else 0.0
+        if op in ("=", "!="):
+            if column in table_def.unique:
+                equal = min(1.0, 1 / stats.row_count)
+            else:
+                equal = (1 - null_fraction) / max(col_stats.distinct, 1)
+            return equal if op == "=" else max(0.0, 1 - null_fraction - equal)
+        if isinstance(value, Parameter):
+            # Valeur connue seulement à l'exécution (plan préparé)
+            return DEFAULT_RANGE_SELECTIVITY * (1 - null_fraction)
+        key = index_key(table_def.columns[column].type, value)
+        low, high = col_stats.min, col_stats.max
+        if key is None or not isinstance(low, (int, float)) or not isinstance(key, (int, float)) or high == low:
+            return DEFAULT_RANGE_SELECTIVITY
+        fraction = min(1.0, max(0.0, (key - low) / (high - low)))
+        return (fraction if op == "<" else 1 - fraction) * (1 - null_fraction)
+
+    def _selectivity(self, stats, table_def, condition):
+        """Sélectivité d'une condition : ET = produit, OU = 1 - ∏(1 - s)"""
+        if isinstance(condition, And):
+            return math.prod(self._selectivity(stats, table_def, item) for item in condition.items)
+        if isinstance(condition, Or):
+            return 1 - math.prod(1 - self._selectivity(stats, table_def, item) for item in condition.items)
+        if isinstance(condition.value, Column):
+            return DEFAULT_RANGE_SELECTIVITY
+        return self._atom_selectivity(stats, table_def, condition.column.name, condition.op,
+                                      literal_value(condition.value))
+
+    def _atoms_selectivity(self, stats, table_def, atoms):
+        return math.prod(self._atom_selectivity(stats, table_def, *atom) for atom in atoms)
+
+    # --- Chemins d'accès ---
+
+    def _access_path(self, storage, table_def, stats, atoms, columns=None, params=None):
+        """Parcours séquentiel ou par index le moins coûteux pour les conditions simples données
+
+        columns : colonnes utiles à la requête, seules lues par un parcours séquentiel en colonnes.
+        """
+        n = stats.row_count
+        best = SeqScan(storage, table_def.name, columns).estimate(n, n * SEQ_ROW_COST)
+        random_cost = RANDOM_ROW_COST if storage.stable_rids else CACHED_ROW_COST
+        for node in self._index_paths(storage, table_def, stats, atoms, params):
+            node.cost = INDEX_PROBE_COST + node.rows * random_cost
+            if node.cost < best.cost:
+                best = node
+        return best
+
+    def _index_paths(self, storage, table_def, stats, atoms, params=None):
+        if not atoms:
+            return
+        # Égalité sur une colonne PRIMARY KEY / UNIQUE : une recherche dans son index de hachage
+        for column, op, value in atoms:
+            column = column.split(".")[-1]
+            if op != "=" or column not in table_def.unique:
+                continue
+            if not isinstance(value, Parameter) and hash_key(table_def.columns[column].type, value) is None:
+                continue
+            index = storage.indexes.unique(column)
+            yield IndexScan(storage, table_def.name, index, [(column, op, value)], params).estimate(
+                min(1, stats.row_count), 0)
+
+        # B+tree : les conditions =, < et > sur la colonne indexée forment un intervalle
+        for index in storage.indexes.btrees():
+            used = [(column, op, value) for column, op, value in atoms
+                    if column.split(".")[-1] == index.column and op != "!="
+                    and (isinstance(value, Parameter) or index.key(value) is not None)]
+            if used:
+                rows = stats.row_count * self._atoms_selectivity(stats, table_def, used)
+                yield IndexScan(storage, table_def.name, index, used, params).estimate(rows, 0)
+
+    # --- Plans ---
+
+    def plan(self, statement, params=None):
+        """Plan d'un LOOT (nœud Select ou Join de query_ast).
+
+        Avec params (ParameterValues), les paramètres ? restent dans le plan et sont lus à chaque
+        exécution : un plan générique, réutilisé par une requête préparée.
+        """
+        if statement.type == "join_tables":
+            return self.plan_join(statement.table1, statement.table2, statement.columns,
+                                  statement.join_condition, statement.order_by, statement.limit, statement.offset,
+                                  statement.group_by, statement.having, params)
+        return self.plan_select(statement.table_name, statement.columns, statement.condition, statement.order_by,
+                                statement.limit, statement.offset, statement.group_by, statement.having, params)
+
+    def plan_select(self, table, columns="*", condition=None, order_by=None, limit=None, offset=0,
+                    group_by=(), having=None, params=None):
+        storage = self.sgbdr.storage_manager.get_storage(table)
+        if not storage.exists():
+            raise ValueError(f"Table {table} introuvable.")
+        table_def = self.sgbdr.catalog_manager.get().table(table)
+        table_columns = table_def.column_info
+        stats = self.statistics(storage, table_def)
+
+        needed = _referenced_columns(table_def, columns, condition, order_by, group_by, having)
+        node = self._access_path(storage, table_def, stats, conjunctive_atoms(condition) if condition else [],
+                                 needed, params)
+        if condition:
+            predicate = compile_condition(condition, table_columns, params)
+            rows = stats.row_count * self._selectivity(stats, table_def, condition)
+            vector = compile_vector_condition(condition, table_columns, params)
+            node = Filter(node, str(condition), predicate, vector=vector).estimate(min(rows, node.rows), node.cost)
+
+        if is_aggregated(columns, group_by, having, order_by):
+            def resolve(col):
+                name = col.split(".")[-1]
+                if name not in table_columns:
+                    raise ValueError(f"Colonne {col} introuvable dans {table}")
+                return name, table_columns[name]["type"], stats.columns[name].distinct
+
+            return self._aggregate(node, columns, group_by, having, order_by, limit, offset, resolve, params)
+
+        if order_by:
+            fields = []
+            for order in order_by:
+                if order.column not in table_columns:
+                    raise ValueError(f"Colonne {order.column} introuvable dans {table}")
+                fields.append((order.column, table_columns[order.column]["type"], order.direction))
+            node = self._sort(node, order_by, sort_key(fields), limit, offset)
+
+        return self._limit(Project(node, columns, _select_lookup).estimate(node.rows, node.cost), limit, offset)
+
+    @staticmethod
+    def _limit(node, limit, offset):
+        if limit is None and not offset:
+            return node
+        rows = max(node.rows - offset, 0) if limit is None else min(limit, max(node.rows - offset, 0))
+        return Limit(node, limit, offset).estimate(rows, node.cost)
+
+    def _sort(self, node, order_by, key, limit=None, offset=0):
+        """Tri complet, ou top-k en O(n log k) quand seules les offset + limit premières lignes servent"""
+        n = max(node.rows, 1)
+        k = None if limit is None else limit + offset
+        width = n if k is None else min(max(k, 1), n)
+        return Sort(node, order_by, key, k, self.sort_memory_budget).estimate(
+            node.rows if k is None else min(node.rows, k), node.cost + n * math.log2(width + 1) * SORT_COMPARE_COST)
+
+    def plan_join(self, table1, table2, columns="*", join_condition=None, order_by=None, limit=None, offset=0,
+                  group_by=(), having=None, params=None):
+        storage1 = self.sgbdr.storage_manager.get_storage(table1)
+        storage2 = self.sgbdr.storage_manager.get_storage(table2)
+        if not storage1.exists() or not storage2.exists():
+            raise ValueError("Une des tables est introuvable.")
+
+        # La condition commence par l'équijointure table1.col = table2.col
+        parts = _join_condition_parts(join_condition)
+        base = _first_comparison(parts[0]) if parts else None
+        if base is None or base.op != "=" or not isinstance(base.value, Column) \
+                or not base.column.table or not base.value.table:
+            raise ValueError("Condition de jointure invalide")
+        t1, c1, t2, c2 = base.column.table, base.column.column, base.value.table, base.value.column
+        if t1 != table1 or t2 != table2:
+            raise ValueError("Les tables dans la condition doivent correspondre.")
+
+        catalog = self.sgbdr.catalog_manager.get()
+        def1, def2 = catalog.table(table1), catalog.table(table2)
+
+        if isinstance(parts[0], Or):
+            # OU au premier niveau : aucune clé commune à toutes les lignes jointes, produit cartésien
+            # filtré par la condition entière
+            join_keys, pushed, residual = [], {table1: [], table2: []}, parts[0]
+        else:
+            # Clés d'équijointure, filtres poussés sous la jointure et filtre résiduel
+            join_keys, pushed, residual = self._push_down(table1, table2, [(c1, c2)], parts[1:], catalog)
+        stats1, stats2 = self.statistics(storage1, def1), self.statistics(storage2, def2)
+        input1 = self._join_input(storage1, def1, stats1, pushed[table1], params)
+        input2 = self._join_input(storage2, def2, stats2, pushed[table2], params)
+
+        node = self._choose_join(table1, table2, join_keys, (storage1, def1, stats1, input1, pushed[table1]),
+                                 (storage2, def2, stats2, input2, pushed[table2]), params)
+
+        if residual is not None:
+            # Créer les métadonnées des colonnes pour les conditions (préfixées et simples)
+            columns_metadata = {}
+            for table in (table1, table2):
+                for col_name, col_info in catalog.table(table).column_info.items():
+                    columns_metadata[f"{table}.{col_name}"] = col_info
+                    columns_metadata[col_name] = col_info
+            try:
+                predicate = compile_condition(residual, columns_metadata, params)
+            except ValueError:
+                # Condition illisible : on garde toutes les lignes, comme en cas d'erreur par ligne
+                predicate = lambda row: True
+            node = Filter(node, str(residual), predicate, tolerant=True).estimate(
+                node.rows * DEFAULT_RANGE_SELECTIVITY, node.cost)
+
+        def resolve(col):
+            """Colonne (préfixée ou non) -> (clé dans la ligne jointe, type, valeurs distinctes)"""
+            table_name, _, col_name = col.rpartition(".")
+            if table_name and table_name not in (table1, table2):
+                raise ValueError(f"Table {table_name} inconnue")
+            if not table_name:
+                # Colonne sans préfixe : celle de la première table qui la possède
+                table_name = next((t for t, d in ((table1, def1), (table2, def2)) if col_name in d.columns), None)
+                if table_name is None:
+                    raise ValueError(f"Colonne {col} introuvable")
+            stats = stats1 if table_name == table1 else stats2
+            return (f"{table_name}.{col_name}", catalog.table(table_name).column(col_name).type,
+                    stats.columns[col_name].distinct)
+
+        if is_aggregated(columns, group_by, having, order_by):
+            return self._aggregate(node, columns, group_by, having, order_by, limit, offset, resolve, params)
+
+        if order_by:
+            fields = [resolve(order.column)[:2] + (order.direction,) for order in order_by]
+            node = self._sort(node, order_by, sort_key(fields), limit, offset)
+
+        return self._limit(Project(node, columns, _join_lookup).estimate(node.rows, node.cost), limit, offset)
+
+    def _aggregate(self, node, columns, group_by, having, order_by, limit, offset, resolve, params=None):
+        """Agrégation par hachage, puis AYANT, TRIER PAR et LIMITE sur les lignes agrégées.
+
+        resolve(colonne) -> (clé dans les lignes d'entrée, type, valeurs distinctes).
+        """
+        if columns == "*":
+            raise ValueError("LOOT * impossible avec GROUPER PAR ou des agrégats : liste les colonnes")
+        for col in columns:
+            if not isinstance(col, Aggregate) and col not in group_by:
+                raise ValueError(f"Colonne {col} ni agrégée ni dans GROUPER PAR")
+
+        # Colonnes produites : celles de GROUPER PAR, puis chaque agrégat demandé (liste, AYANT ou TRIER PAR)
+        output_types = {}
+        group_fields = []
+        groups = 1
+        for col in group_by:
+            key, col_type, distinct = resolve(col)
+            group_fields.append((col, key))
+            output_types[col] = col_type
+            groups *= max(distinct, 1)
+        aggregates = []
+        wanted = [col for col in columns if isinstance(col, Aggregate)] + _having_aggregates(having) \
+            + [order.column for order in order_by or () if isinstance(order.column, Aggregate)]
+        for aggregate in wanted:
+            if aggregate.name in output_types:
+                continue
+            key, col_type = (None, "INT") if aggregate.column is None else resolve(aggregate.column)[:2]
+            aggregates.append((aggregate.name, key, accumulator_factory(aggregate, col_type)))
+            output_types[aggregate.name] = output_type(aggregate, col_type)
+        metadata = {name: {"type": col_type} for name, col_type in output_types.items()}
+
+        groups = min(groups, max(node.rows, 1)) if group_by else 1
+        node = HashAggregate(node, group_fields, aggregates).estimate(
+            groups, node.cost + node.rows * HASH_PROBE_COST)
+        if having is not None:
+            node = Filter(node, str(having), compile_condition(having, metadata, params)).estimate(
+                node.rows * DEFAULT_RANGE_SELECTIVITY, node.cost)
+        if order_by:
+            fields = []
+            for order in order_by:
+                name = str(order.column)
+                if name not in output_types:
+                    raise ValueError(f"TRIER PAR {name} : colonne absente de GROUPER PAR")
+                fields.append((name, output_types[name], order.direction))
+            node = self._sort(node, order_by, sort_key(fields), limit, offset)
+
+        names = tuple(str(col) for col in columns)
+        return self._limit(Project(node, names, _select_lookup).estimate(node.rows, node.cost),
+                           limit, offset)
+
+    def _push_down(self, table1, table2, join_keys, additional_conditions, catalog):
+        """Répartir les conditions supplémentaires d'une jointure (reliées par ET).
+
+        Retourne (clés d'équijointure, {table: conditions simples poussées sous la jointure},
+        condition résiduelle évaluée sur les lignes jointes ou None). Une sous-condition avec OU
+        reste résiduelle.
+        """
+        pushed = {table1: [], table2: []}
+        if not additional_conditions or table1 == table2:
+            return join_keys, pushed, And(tuple(additional_conditions)) if additional_conditions else None
+        columns = {table1: catalog.table(table1).columns, table2: catalog.table(table2).columns}
+        join_keys = list(join_keys)
+        residual = []
+        for part in additional_conditions:
+            if isinstance(part, (And, Or)):
+                residual.append(part)
+                continue
+            if isinstance(part.value, Column):
+                ta, ca, tb, cb = part.column.table, part.column.column, part.value.table, part.value.column
+                if part.op == "=" and (ta, tb) == (table1, table2):
+                    join_keys.append((ca, cb))
+                    continue
+                if part.op == "=" and (ta, tb) == (table2, table1):
+                    join_keys.append((cb, ca))
+                    continue
+                residual.append(part)
+                continue
+            prefix, col_name = part.column.table, part.column.column
+            if not prefix:
+                # Même résolution que sur une ligne jointe : les colonnes de table1 d'abord
+                prefix = table1 if col_name in columns[table1] else table2
+            if prefix in pushed and col_name in columns[prefix]:
+                pushed[prefix].append((col_name, part.op, literal_value(part.value)))
+                continue
+            residual.append(part)
+        if not residual:
+            return join_keys, pushed, None
+        return join_keys, pushed, residual[0] if len(residual) == 1 else And(tuple(residual))
+
+    def _join_input(self, storage, table_def, stats, atoms, params=None):
+        """Lignes d'une table filtrées avant la jointure"""
+        node = self._access_path(storage, table_def, stats, atoms, params=params)
+        if not atoms:
+            return node
+        rows = stats.row_count * self._atoms_selectivity(stats, table_def, atoms)
+        return Filter(node, _atoms_text(atoms), compile_atoms(atoms, table_def.column_info, params),
+                      tolerant=True).estimate(min(rows, node.rows), node.cost)
+
+    def _choose_join(self, table1, table2, join_keys, side1, side2, params=None):
+        """Jointure la moins coûteuse : hachage (construite sur l'un ou l'autre côté) ou, si un côté a
+        un index unique sur sa clé de jointure, recherches dans cet index pour chaque ligne de l'autre"""
+        storage1, def1, stats1, input1, atoms1 = side1
+        storage2, def2, stats2, input2, atoms2 = side2
+        distinct = max([1] + [stats.columns[col].distinct for (stats, col) in
+                              [(stats1, k1) for k1, _ in join_keys] + [(stats2, k2) for _, k2 in join_keys]
+                              if col in stats.columns])
+        rows = input1.rows * input2.rows / distinct
+
+        inputs_cost = input1.cost + input2.cost
+        candidates = [
+            HashJoin(input1, input2, table1, table2, join_keys).estimate(
+                rows, inputs_cost + input2.rows * HASH_BUILD_COST + input1.rows * HASH_PROBE_COST),
+            HashJoin(input1, input2, table1, table2, join_keys, build_left=True).estimate(
+                rows, inputs_cost + input1.rows * HASH_BUILD_COST + input2.rows * HASH_PROBE_COST),
+        ]
+        if table1 != table2:
+            for outer_is_left in (True, False):
+                outer_side, inner_side = (side1, side2) if outer_is_left else (side2, side1)
+                keys = join_keys if outer_is_left else [(k2, k1) for k1, k2 in join_keys]
+                node = self._index_join(outer_side, inner_side, keys, outer_is_left, table1, table2, params)
+                if node is not None:
+                    candidates.append(node)
+        return min(candidates, key=lambda node: node.cost)
+
+    def _index_join(self, outer_side, inner_side, keys, outer_is_left, table1, table2, params=None):
+        """Jointure par index sur la première clé dont la colonne interne est PRIMARY KEY / UNIQUE"""
+        _, _, outer_stats, outer, _ = outer_side
+        storage, table_def, stats, inner_input, atoms = inner_side
+        for position, (outer_key, inner_key) in enumerate(keys):
+            if inner_key not in table_def.unique:
+                continue
+            index = storage.indexes.unique(inner_key)
+            inner_filter = (_atoms_text(atoms), compile_atoms(atoms, table_def.column_info, params)) if atoms else None
+            random_cost = RANDOM_ROW_COST if storage.stable_rids else CACHED_ROW_COST
+            cost = outer.cost + outer.rows * (INDEX_PROBE_COST + random_cost)
+            # Clés externes NULL : un parcours de la table interne pour ses clés NULL
+            outer_key_stats = outer_stats.columns.get(outer_key)
+            if outer_key_stats is None or outer_key_stats.nulls:
+                cost += stats.row_count * SEQ_ROW_COST
+            fraction = inner_input.rows / stats.row_count if stats.row_count else 0
+            other_keys = keys[:position] + keys[position + 1:]
+            return IndexNestedLoopJoin(outer, storage, table_def.name, index, outer_key, other_keys,
+                                       inner_filter, outer_is_left, table1, table2).estimate(outer.rows * fraction, cost)
+        return None
+
+    # --- EXPLIQUER ---
+
+    def explain(self, statement, analyze=False):
+        """Afficher le plan d'un LOOT ; avec ANALYSER, l'exécuter et afficher lignes et temps par opérateur"""
+        self.sgbdr.user_manager.check_permission("read")
+        if not self.sgbdr.current_db:
+            raise ValueError("Aucune base sélectionnée.")
+        if statement.type == "select" and self.sgbdr.catalog_manager.get().has_view(statement.table_name):
+            raise ValueError(f"{statement.table_name} est une vue : explique plutôt sa requête LOOT")
+
+        plan = self.plan(statement)
+        if analyze:
+            for _ in plan.instrument().execute():
+                pass
+
+        lines = []
+        for depth, node in plan.walk():
+            line = {"opération": "   " * (depth - 1) + " -> " * bool(depth) + node.describe(),
+                    "lignes estimées": round(node.rows), "coût": round(node.cost, 1)}
+            if analyze:
+                line["lignes réelles"] = node.actual_rows
+                line["temps (ms)"] = round(node.elapsed * 1000, 3)
+            lines.append(line)
+
+        print(f"╔════════════════════════════════════")
+        print(f"║ Plan {'exécuté' if analyze else 'choisi'} pour : {_statement_text(statement)}")
+        print(f"╠════════════════════════════════════")
+        for line in lines:
+            text = f"║ {line['opération']}  (lignes estimées : {line['lignes estimées']}, coût : {line['coût']})"
+            if analyze:
+                text += f"  [réel : {line['lignes réelles']} lignes, {line['temps (ms)']} ms]"
+            print(text)
+        if analyze:
+            print(f"╠════════════════════════════════════")
+            print(f"║ Temps total : {plan.elapsed * 1000:.3f} ms")
+        print(f"╚════════════════════════════════════")
+        return lines
+
+
+def is_aggregated(columns, group_by, having, order_by):
+    """Vrai si un LOOT passe par une agrégation (GROUPER PAR, AYANT ou un agrégat demandé)"""
+    return bool(group_by) or having is not None \
+        or columns != "*" and any(isinstance(col, Aggregate) for col in columns) \
+        or any(isinstance(order.column, Aggregate) for order in order_by or ())
+
+
+def _referenced_columns(table_def, columns, condition, order_by, group_by, having):
+    """Colonnes de la table utilisées par un LOOT (dans l'ordre de la table), None pour LOOT *"""
+    if columns == "*":
+        return None
+    names = set()
+
+    def add(column):
+        if isinstance(column, Aggregate):
+            column = column.column
+        if column is not None:
+            names.add(column.split(".")[-1])
+
+    def walk(expr):
+        if expr is None:
+            return
+        if isinstance(expr, (And, Or)):
+            for item in expr.items:
+                walk(item)
+            return
+        add(expr.column.name if isinstance(expr.column, Column) else expr.column)
+        if isinstance(expr.value, Column):
+            add(expr.value.name)
+
+    for column in columns:
+        add(column)
+    for column in group_by or ():
+        add(column)
+    for order in order_by or ():
+        add(order.column)
+    walk(condition)
+    walk(having)
+    return [name for name in table_def.columns if name in names]
+
+
+def _having_aggregates(condition):
+    """Agrégats utilisés par une condition AYANT"""
+    if condition is None:
+        return []
+    if isinstance(condition, (And, Or)):
+        return [aggregate for item in condition.items for aggregate in _having_aggregates(item)]
+    return [condition.column] if isinstance(condition.column, Aggregate) else []
+
+
+def _statement_text(statement):
+    """Résumé d'un LOOT pour l'en-tête d'EXPLIQUER"""
+    columns = "*" if statement.columns == "*" else ", ".join(str(col) for col in statement.columns)
+    if statement.type == "join_tables":
+        text = f"LOOT {columns} DANS {statement.table1}, {statement.table2} AVEC {statement.join_condition}"
+    else:
+        text = f"LOOT {columns} DANS {statement.table_name}"
+        if statement.condition is not None:
+            text += f" AVEC {statement.condition}"
+    if statement.group_by:
+        text += " GROUPER PAR " + ", ".join(statement.group_by)
+    if statement.having is not None:
+        text += f" AYANT {statement.having}"
+    if statement.order_by:
+        text += " TRIER PAR " + ", ".join(f"{order.column} {order.direction}" for order in statement.order_by)
+    if statement.limit is not None:
+        text += f" LIMITE {statement.limit}"
+    if statement.offset:
+        text += f" DECALAGE {statement.offset}"
+    return text
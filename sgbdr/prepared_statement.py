@@ -0,0 +1,121 @@
+# sgbdr/prepared_statement.py
+from .query_ast import bind_parameters, count_parameters
+from .statistics import STATS_REFRESH_RATIO, STATS_REFRESH_WRITES
+from .utils import ParameterValues, to_text
+
+
+class PreparedStatement:
+    """Requête analysée une seule fois, exécutée autant de fois que voulu avec des paramètres ?.
+
+    Un LOOT sur des tables est aussi planifié une seule fois : son plan générique lit les paramètres
+    à chaque exécution. Il est refait quand la base active, le catalogue (tables, index) ou les
+    moteurs ouverts de ses tables changent, ou quand la taille d'une table a trop dérivé.
+    """
+
+    def __init__(self, sgbdr, query):
+        self.sgbdr = sgbdr
+        self.query = query
+        self.statement = sgbdr.query_parser.parse_query(query)
+        self.parameter_count = count_parameters(self.statement)
+        self.params = ParameterValues()
+        self._plan = None
+        # (base active, [catalogue, moteurs des tables]) et lignes des tables lors de la planification
+        self._planned_for = None
+        self._planned_rows = None
+
+    def _values(self, params):
+        params = [to_text(value) for value in params]
+        if len(params) != self.parameter_count:
+            raise ValueError(f"Nombre de paramètres ({len(params)}) ≠ paramètres attendus ({self.parameter_count})")
+        return params
+
+    def bind(self, params=()):
+        """Requête analysée avec les paramètres substitués"""
+        params = self._values(params)
+        if not params:
+            return self.statement
+        return bind_parameters(self.statement, params)
+
+    def plannable(self):
+        """LOOT sur une ou deux tables (pas sur une vue) : exécuté par un plan gardé"""
+        if self.statement.type == "join_tables":
+            return True
+        return self.statement.type == "select" and not self.sgbdr._is_view(self.statement.table_name)
+
+    def plan(self, params=()):
+        """Plan générique du LOOT, paramètres liés pour la prochaine exécution"""
+        values = self._values(params)
+        statement = self.statement
+        tables = (statement.table1, statement.table2) if statement.type == "join_tables" else (statement.table_name,)
+        storages = [self.sgbdr.storage_manager.get_storage(table) for table in tables]
+        planned_for = (self.sgbdr.current_db, [self.sgbdr.catalog_manager.get()] + storages)
+        rows = [self._row_count(storage) for storage in storages]
+        if self._plan is None or not self._same(planned_for) or self._drifted(rows):
+            self._plan = self.sgbdr.planner.plan(statement, self.params)
+            self._planned_for, self._planned_rows = planned_for, rows
+        self.params.bind(values)
+        return self._plan
+
+    def _same(self, planned_for):
+        db_name, objects = planned_for
+        return db_name == self._planned_for[0] and all(a is b for a, b in zip(objects, self._planned_for[1]))
+
+    @staticmethod
+    def _row_count(storage):
+        stats = storage.statistics.get()
+        return None if stats is None else stats.row_count
+
+    def _drifted(self, rows):
+        """Une table a-t-elle grossi ou diminué au point de changer le plan (ou vient d'être analysée) ?"""
+        for before, now in zip(self._planned_rows, rows):
+            if (before is None) != (now is None):
+                return True
+            if before is not None and abs(now - before) > max(STATS_REFRESH_WRITES, STATS_REFRESH_RATIO * before):
+                return True
+        return False
+
+    def execute(self, params=()):
+        if self.plannable():
+            return self.sgbdr.data_manager.select_prepared(self, params)
+        return self.sgbdr.execute_statement(self.bind(params))
+
+    def executemany(self, seq_of_params):
+        """Exécuter pour chaque jeu de paramètres ; un POP DANS est validé puis écrit en un seul lot"""
+        if self.statement.type == "insert":
+            rows = [self.bind(params).values for params in seq_of_params]
+            self.sgbdr.data_manager.insert_many(self.statement.table_name, rows)
+            return None
+        return [self.execute(params) for params in seq_of_params]
+
+
+class PreparedStatementManager:
+    def __init__(self, db_path, sgbdr):
+        self.db_path = db_path
+        self.sgbdr = sgbdr
+        # Requêtes préparées par PREPARER, par nom (le temps de la session)
+        self.statements = {}
+
+    def set_sgbdr(self, sgbdr):
+        """Définir la référence à l'instance SGBDR"""
+        self.sgbdr = sgbdr
+
+    def prepare(self, query):
+        """Analyser une requête avec des paramètres ? (API Python)"""
+        return PreparedStatement(self.sgbdr, query)
+
+    def prepare_named(self, name, query):
+        """PREPARER nom COMME "requête" """
+        statement = self.prepare(query)
+        self.statements[name] = statement
+        print(f"╔════════════════════════════════════")
+        print(f"║ Requête {name} préparée ({statement.parameter_count} paramètres) !")
+        print(f"╚════════════════════════════════════")
+
+    def execute_named(self, name, rows):
+        """EXECUTER nom [VALEURS (...), (...)] : une exécution par tuple de valeurs"""
+        if name not in self.statements:
+            raise ValueError(f"Requête préparée {name} introuvable. Faut d'abord la PREPARER")
+        statement = self.statements[name]
+        if len(rows) <= 1:
+            return statement.execute(rows[0] if rows else ())
+        return statement.executemany(rows)
@@ -0,0 +1,498 @@
+# sgbdr/query_ast.py
+import re
+from dataclasses import dataclass, fields, is_dataclass, replace
+from typing import ClassVar
+
+# Littéral affiché sans apostrophes : même forme qu'un jeton nombre du parseur
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+# --- Expressions (conditions AVEC) ---
+
+@dataclass(frozen=True)
+class Column:
+    """Référence de colonne, éventuellement préfixée par sa table (table.colonne)"""
+    name: str
+
+    @property
+    def table(self):
+        return self.name.rpartition(".")[0] or None
+
+    @property
+    def column(self):
+        return self.name.rpartition(".")[2]
+
+    def __str__(self):
+        return self.name
+
+
+@dataclass(frozen=True)
+class Literal:
+    """Valeur littérale, gardée sous sa forme texte ('null' pour NULL), convertie selon le type de la colonne"""
+    value: str
+
+    def __str__(self):
+        # Relu à l'identique : un nombre, entre apostrophes ou non, donne le même Literal
+        if _NUMBER.fullmatch(self.value):
+            return self.value
+        return "'" + self.value.replace("'", "''") + "'"
+
+
+@dataclass(frozen=True)
+class Parameter:
+    """Paramètre ? d'une requête préparée (index à partir de 0, dans l'ordre du texte)"""
+    index: int
+
+    def __str__(self):
+        return "?"
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """colonne opérateur valeur, où la valeur est un Literal, un Parameter ou une autre Column"""
+    column: Column
+    op: str
+    value: object
+
+    def __str__(self):
+        return f"{self.column} {self.op} {self.value}"
+
+
+@dataclass(frozen=True)
+class Aggregate:
+    """Fonction d'agrégat (COMPTER, SOMME, MOYENNE, MIN, MAX) sur une colonne, ou COMPTER(*) (column None)"""
+    function: str
+    column: str = None
+
+    @property
+    def name(self):
+        """Nom de la colonne produite, aussi utilisé par AYANT et TRIER PAR"""
+        return f"{self.function}({self.column or '*'})"
+
+    def __str__(self):
+        return self.name
+
+
+@dataclass(frozen=True)
+class And:
+    items: tuple
+
+    def __str__(self):
+        return " ET ".join(f"({item})" if isinstance(item, Or) else str(item) for item in self.items)
+
+
+@dataclass(frozen=True)
+class Or:
+    items: tuple
+
+    def __str__(self):
+        return " OU ".join(str(item) for item in self.items)
+
+
+# --- Joueurs ---
+
+@dataclass(frozen=True)
+class Login:
+    type: ClassVar[str] = "login_user"
+    login: str
+    password: str
+
+
+@dataclass(frozen=True)
+class CreateUser:
+    type: ClassVar[str] = "create_user"
+    login: str
+    password: str
+    permissions: tuple
+
+
+@dataclass(frozen=True)
+class EditUserPermissions:
+    type: ClassVar[str] = "edit_user_permissions"
+    login: str
+    permissions: tuple
+
+
+@dataclass(frozen=True)
+class ListUsers:
+    type: ClassVar[str] = "list_users"
+
+
+@dataclass(frozen=True)
+class ListUserPermissions:
+    type: ClassVar[str] = "list_user_permissions"
+    login: str
+
+
+# --- Bases ---
+
+@dataclass(frozen=True)
+class CreateDatabase:
+    type: ClassVar[str] = "create_database"
+    db_name: str
+
+
+@dataclass(frozen=True)
+class DeleteDatabase:
+    type: ClassVar[str] = "delete_database"
+    db_name: str
+
+
+@dataclass(frozen=True)
+class UseDatabase:
+    type: ClassVar[str] = "use_database"
+    db_name: str
+
+
+@dataclass(frozen=True)
+class DeselectDatabase:
+    type: ClassVar[str] = "deselect_database"
+
+
+@dataclass(frozen=True)
+class ListDatabases:
+    type: ClassVar[str] = "list_databases"
+
+
+@dataclass(frozen=True)
+class ExportDatabase:
+    type: ClassVar[str] = "export_database"
+    db_name: str
+
+
+@dataclass(frozen=True)
+class MigrateDatabase:
+    type: ClassVar[str] = "migrate_database"
+    db_name: str
+
+
+@dataclass(frozen=True)
+class ImportDatabase:
+    type: ClassVar[str] = "import_database"
+    db_name: str
+    file_path: str
+
+
+# --- Tables et index ---
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    """Définition d'une colonne dans CRAFTER TABLEAU"""
+    name: str
+    type: str
+    size: int = None
+    primary_key: bool = False
+    not_null: bool = False
+    unique: bool = False
+    references: tuple = None  # (table, colonne)
+
+
+@dataclass(frozen=True)
+class CreateTable:
+    type: ClassVar[str] = "create_table"
+    table_name: str
+    columns: tuple
+    storage: str = None
+
+
+@dataclass(frozen=True)
+class DeleteTable:
+    type: ClassVar[str] = "delete_table"
+    table_name: str
+
+
+@dataclass(frozen=True)
+class ListTables:
+    type: ClassVar[str] = "list_tables"
+
+
+@dataclass(frozen=True)
+class CreateIndex:
+    type: ClassVar[str] = "create_index"
+    index_name: str
+    table_name: str
+    column: str
+
+
+@dataclass(frozen=True)
+class DeleteIndex:
+    type: ClassVar[str] = "delete_index"
+    index_name: str
+
+
+@dataclass(frozen=True)
+class ListIndexes:
+    type: ClassVar[str] = "list_indexes"
+
+
+# --- Données ---
+
+@dataclass(frozen=True)
+class Insert:
+    type: ClassVar[str] = "insert"
+    table_name: str
+    values: tuple
+
+
+@dataclass(frozen=True)
+class InsertMany:
+    type: ClassVar[str] = "insert_many"
+    table_name: str
+    rows: tuple
+
+
+@dataclass(frozen=True)
+class LoadFile:
+    type: ClassVar[str] = "load_file"
+    table_name: str
+    file_path: str
+
+
+@dataclass(frozen=True)
+class OrderItem:
+    """Élément de TRIER PAR (nom de colonne, ou Aggregate)"""
+    column: object
+    direction: str = "ASC"
+
+
+@dataclass(frozen=True)
+class Select:
+    type: ClassVar[str] = "select"
+    table_name: str
+    columns: object  # "*" ou tuple de noms de colonnes et d'Aggregate
+    condition: object = None
+    order_by: tuple = ()
+    limit: int = None
+    offset: int = 0
+    group_by: tuple = ()
+    having: object = None
+
+
+@dataclass(frozen=True)
+class Join:
+    type: ClassVar[str] = "join_tables"
+    table1: str
+    table2: str
+    columns: object
+    join_condition: object = None
+    order_by: tuple = ()
+    limit: int = None
+    offset: int = 0
+    group_by: tuple = ()
+    having: object = None
+
+
+@dataclass(frozen=True)
+class Explain:
+    type: ClassVar[str] = "explain"
+    statement: object  # Select ou Join
+    analyze: bool = False
+
+
+@dataclass(frozen=True)
+class Update:
+    type: ClassVar[str] = "update"
+    table_name: str
+    column: str
+    value: str
+    condition: object
+
+
+@dataclass(frozen=True)
+class Delete:
+    type: ClassVar[str] = "delete"
+    table_name: str
+    condition: object
+
+
+@dataclass(frozen=True)
+class TableStats:
+    type: ClassVar[str] = "table_stats"
+    table_name: str
+
+
+@dataclass(frozen=True)
+class AnalyzeTable:
+    type: ClassVar[str] = "analyze_table"
+    table_name: str
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    type: ClassVar[str] = "cache_stats"
+
+
+# --- Transactions ---
+
+@dataclass(frozen=True)
+class BeginTransaction:
+    type: ClassVar[str] = "begin_transaction"
+
+
+@dataclass(frozen=True)
+class CommitTransaction:
+    type: ClassVar[str] = "commit_transaction"
+
+
+@dataclass(frozen=True)
+class RollbackTransaction:
+    type: ClassVar[str] = "rollback_transaction"
+
+
+@dataclass(frozen=True)
+class TransactionStatus:
+    type: ClassVar[str] = "transaction_status"
+
+
+# --- Vues ---
+
+@dataclass(frozen=True)
+class CreateView:
+    type: ClassVar[str] = "create_view"
+    view_name: str
+    query: str
+
+
+@dataclass(frozen=True)
+class DeleteView:
+    type: ClassVar[str] = "delete_view"
+    view_name: str
+
+
+@dataclass(frozen=True)
+class ListViews:
+    type: ClassVar[str] = "list_views"
+
+
+# --- Snapshots ---
+
+@dataclass(frozen=True)
+class CreateSnapshot:
+    type: ClassVar[str] = "create_snapshot"
+    table_name: str
+    description: str
+
+
+@dataclass(frozen=True)
+class RestoreSnapshot:
+    type: ClassVar[str] = "restore_snapshot"
+    table_name: str
+    snapshot_id: str
+
+
+@dataclass(frozen=True)
+class ViewSnapshot:
+    type: ClassVar[str] = "view_snapshot"
+    table_name: str
+    snapshot_id: str
+
+
+@dataclass(frozen=True)
+class ListSnapshots:
+    type: ClassVar[str] = "list_snapshots"
+    table_name: str
+
+
+@dataclass(frozen=True)
+class DeleteSnapshot:
+    type: ClassVar[str] = "delete_snapshot"
+    table_name: str
+    snapshot_id: str
+
+
+# --- Quêtes ---
+
+@dataclass(frozen=True)
+class CreateQuest:
+    type: ClassVar[str] = "create_quest"
+    quest_name: str
+    query: str
+    interval: str
+
+
+@dataclass(frozen=True)
+class ExecuteQuest:
+    type: ClassVar[str] = "execute_quest"
+    quest_name: str
+
+
+@dataclass(frozen=True)
+class ListQuests:
+    type: ClassVar[str] = "list_quests"
+
+
+@dataclass(frozen=True)
+class DeleteQuest:
+    type: ClassVar[str] = "delete_quest"
+    quest_name: str
+
+
+@dataclass(frozen=True)
+class StartQuests:
+    type: ClassVar[str] = "start_quests"
+
+
+@dataclass(frozen=True)
+class QuestHistory:
+    type: ClassVar[str] = "quest_history"
+    quest_name: str
+
+
+@dataclass(frozen=True)
+class QuestResults:
+    type: ClassVar[str] = "quest_results"
+    quest_name: str
+    execution_id: str
+
+
+# --- Requêtes préparées ---
+
+@dataclass(frozen=True)
+class Prepare:
+    type: ClassVar[str] = "prepare"
+    name: str
+    query: str
+
+
+@dataclass(frozen=True)
+class ExecutePrepared:
+    type: ClassVar[str] = "execute_prepared"
+    name: str
+    rows: tuple = ()
+
+
+# --- Divers ---
+
+@dataclass(frozen=True)
+class ShowHelp:
+    type: ClassVar[str] = "show_help"
+    command: str = None
+
+
+@dataclass(frozen=True)
+class Quit:
+    type: ClassVar[str] = "quit"
+
+
+def count_parameters(node):
+    """Nombre de paramètres ? d'un arbre"""
+    if isinstance(node, Parameter):
+        return 1
+    if isinstance(node, tuple):
+        return sum(count_parameters(item) for item in node)
+    if is_dataclass(node):
+        return sum(count_parameters(getattr(node, f.name)) for f in fields(node))
+    return 0
+
+
+def bind_parameters(node, params, in_condition=False):
+    """Copie de l'arbre où chaque Parameter est remplacé par sa valeur (forme texte)"""
+    if isinstance(node, Parameter):
+        return Literal(params[node.index]) if in_condition else params[node.index]
+    if isinstance(node, tuple):
+        return tuple(bind_parameters(item, params, in_condition) for item in node)
+    if is_dataclass(node) and count_parameters(node):
+        in_condition = in_condition or isinstance(node, Comparison)
+        return replace(node, **{f.name: bind_parameters(getattr(node, f.name), params, in_condition)
+                                for f in fields(node)})
+    return node
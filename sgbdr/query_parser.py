@@ -1,5 +1,46 @@
 # sgbdr/query_parser.py
 import re
+from collections import namedtuple
+from functools import lru_cache
+from . import query_ast as ast
+
+# Nombre de requêtes analysées gardées en cache (clé : texte de la requête)
+PARSE_CACHE_SIZE = 1024
+
+COLUMN_TYPES = ("INT", "FLOAT", "TEXT", "DATE", "BOOLEAN", "VARCHAR")
+COMPARISON_OPERATORS = ("=", "!=", ">", "<")
+AGGREGATE_FUNCTIONS = ("COMPTER", "SOMME", "MOYENNE", "MIN", "MAX")
+VALID_INTERVALS = ["1 JOURS", "1 HEURES", "30 MINUTES", "1 SEMAINE"]
+
+Token = namedtuple("Token", "kind text start end")
+
+TOKEN_PATTERN = re.compile(r"""
+    (?P<string>'(?:[^']|'')*')          # 'texte' ('' pour une apostrophe)
+  | (?P<quoted>"[^"]*")                 # "requête" (vues, quêtes)
+  | (?P<number>-?\d+(?:\.\d+)?)(?!\w)
+  | (?P<word>\w+)                       # mot-clé ou identifiant
+  | (?P<op>!=|[=<>(),.*?])
+  | (?P<other>\S)                       # chemins, caractères libres (AIDE, FICHIER)
+""", re.VERBOSE)
+WHITESPACE = re.compile(r"\s*")
+
+
+def tokenize(query):
+    """Découper une requête en jetons (kind, text, start, end)"""
+    tokens = []
+    pos = WHITESPACE.match(query).end()
+    while pos < len(query):
+        match = TOKEN_PATTERN.match(query, pos)
+        tokens.append(Token(match.lastgroup, match.group(), match.start(), match.end()))
+        pos = WHITESPACE.match(query, match.end()).end()
+    return tokens
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse(query):
+    """Arbre syntaxique (query_ast) d'une requête, mis en cache par texte : ne pas le modifier"""
+    return _Parser(query).statement()
+
 
 class QueryParser:
     def __init__(self, sgbdr):
@@ -10,276 +51,512 @@ class QueryParser:
         self.sgbdr = sgbdr
 
     def parse_query(self, query):
-        """Parser une requête SQL-like et retourner un dictionnaire avec les composants"""
-        query = query.strip()
-
-        if re.match(r"LOGIN JOUEUR\s+\w+\s+MOTDEPASSE\s+'.*'", query, re.IGNORECASE):
-            match = re.match(r"LOGIN JOUEUR\s+(\w+)\s+MOTDEPASSE\s+'([^']*)'", query, re.IGNORECASE)
-            if not match:
-                raise ValueError("Tu cheat, il faut le format : LOGIN JOUEUR login MOTDEPASSE 'pass'")
-            login, password = match.groups()
-            return {"type": "login_user", "login": login, "password": password}
-        
-        elif re.match(r"CRAFTER JOUEUR\s+\w+\s+MOTDEPASSE\s+'.*'\s+PERMISSIONS\s+.+", query, re.IGNORECASE):
-            match = re.match(r"CRAFTER JOUEUR\s+(\w+)\s+MOTDEPASSE\s+'([^']*)'\s+PERMISSIONS\s+(.+)", query, re.IGNORECASE)
-            if not match:
-                raise ValueError("Tu cheat, il faut le format : CRAFTER JOUEUR login MOTDEPASSE 'pass' PERMISSIONS read,write,delete")
-            login, password, perms = match.groups()
-            permissions = [p.strip() for p in perms.split(",")]
-            return {"type": "create_user", "login": login, "password": password, "permissions": permissions}
-        
-        elif re.match(r"EDIT JOUEUR\s+\w+\s+PERMISSIONS\s+.+", query, re.IGNORECASE):
-            match = re.match(r"EDIT JOUEUR\s+(\w+)\s+PERMISSIONS\s+(.+)", query, re.IGNORECASE)
-            if not match:
-                raise ValueError("Tu cheat, il faut le format : EDIT JOUEUR login PERMISSIONS read,write,delete")
-            login, perms = match.groups()
-            permissions = [p.strip() for p in perms.split(",")]
-            return {"type": "edit_user_permissions", "login": login, "permissions": permissions}
-        
-        elif re.match(r"LISTE JOUEURS", query, re.IGNORECASE):
-            return {"type": "list_users"}
-        
-        elif re.match(r"LISTE PERMISSIONS JOUEUR\s+\w+", query, re.IGNORECASE):
-            match = re.match(r"LISTE PERMISSIONS JOUEUR\s+(\w+)", query, re.IGNORECASE)
-            if not match:
-                raise ValueError("Tu cheat, il faut le format : LISTE PERMISSIONS JOUEUR login")
-            login = match.groups()[0]
-            return {"type": "list_user_permissions", "login": login}
-        
-        elif re.match(r"CRAFTER BASE\s+\w+", query, re.IGNORECASE):
-            match = re.match(r"CRAFTER BASE\s+(\w+)", query, re.IGNORECASE)
-            return {"type": "create_database", "db_name": match.groups()[0]}
-        
-        elif re.match(r"DEPOP BASE\s+\w+", query, re.IGNORECASE):
-            match = re.match(r"DEPOP BASE\s+(\w+)", query, re.IGNORECASE)
-            return {"type": "delete_database", "db_name": match.groups()[0]}
-        
-        elif re.match(r"UTILISER\s+\w+", query, re.IGNORECASE):
-            match = re.match(r"UTILISER\s+(\w+)", query, re.IGNORECASE)
-            return {"type": "use_database", "db_name": match.groups()[0]}
-        
-        elif re.match(r"QUITTER BASE", query, re.IGNORECASE):
-            return {"type": "deselect_database"}
-        
-        elif re.match(r"LISTE BASES", query, re.IGNORECASE):
-            return {"type": "list_databases"}
-        
-        elif re.match(r"EXPORTER BASE\s+\w+", query, re.IGNORECASE):
-            match = re.match(r"EXPORTER BASE\s+(\w+)", query, re.IGNORECASE)
-            return {"type": "export_database", "db_name": match.groups()[0]}
-        
-        elif re.match(r"IMPORTER BASE\s+\w+\s+FICHIER\s+.+", query, re.IGNORECASE):
-            match = re.match(r"IMPORTER BASE\s+(\w+)\s+FICHIER\s+(.+)", query, re.IGNORECASE)
-            if not match:
-                raise ValueError("Tu cheat, il faut le format : IMPORTER BASE nom FICHIER chemin")
-            db_name, file_path = match.groups()
-            return {"type": "import_database", "db_name": db_name, "file_path": file_path}
-        
-        elif re.match(r"CRAFTER TABLEAU\s+\w+\s*\(.+\)", query, re.IGNORECASE):
-            match = re.match(r"CRAFTER TABLEAU\s+(\w+)\s*\((.+)\)", query, re.IGNORECASE)
-            if not match:
-                raise ValueError("Tu cheat, il faut le format : CRAFTER TABLEAU nom (col1 TYPE [constraints], ...)")
-            table_name, columns_str = match.groups()
-            columns = []
-            for col in [c.strip() for c in columns_str.split(",") if c.strip()]:
-                parts = col.split()
-                col_name = parts[0]
-                col_type = parts[1].upper()
-                constraints = parts[2:] if len(parts) > 2 else []
-
-                # Validation type
-                if col_type not in ("INT", "FLOAT", "TEXT", "DATE", "BOOLEAN"):
-                    if not col_type.startswith("VARCHAR("):
-                        raise ValueError(f"Type {col_type} non supporté")
-                    if not col_type.endswith(")"):
-                        raise ValueError("VARCHAR doit être VARCHAR(n)")
-                    try:
-                        size = int(col_type[8:-1])
-                        if size <= 0:
-                            raise ValueError()
-                    except:
-                        raise ValueError("VARCHAR(n) : n doit être un entier positif")
-
-                columns.append(col)
-            return {"type": "create_table", "table_name": table_name, "columns": columns}
-        
-        elif re.match(r"DEPOP TABLEAU\s+\w+", query, re.IGNORECASE):
-            match = re.match(r"DEPOP TABLEAU\s+(\w+)", query, re.IGNORECASE)
-            return {"type": "delete_table", "table_name": match.groups()[0]}
-        
-        elif re.match(r"LISTE TABLEAUX", query, re.IGNORECASE):
-            return {"type": "list_tables"}
-        
-        elif re.match(r"POP DANS\s+\w+\s+VALEURS\s*\(.+\)", query, re.IGNORECASE):
-            match = re.match(r"POP DANS\s+(\w+)\s+VALEURS\s*\((.+)\)", query, re.IGNORECASE)
-            if not match:
-                raise ValueError("Tu cheat, il faut le format : POP DANS table VALEURS (val1, val2, ...)")
-            table_name, values = match.groups()
-            values = [val.strip().strip("'") if val.strip().startswith("'") and val.strip().endswith("'") else val.strip() for val in values.split(",")]
-            return {"type": "insert", "table_name": table_name, "values": values}
-        
-        elif re.match(r"LOOT\s+.+\s+DANS\s+\w+(?:(?:\s*,\s*\w+)?\s*AVEC\s*.+)?(?:\s*TRIER\s+PAR\s*.+)?", query, re.IGNORECASE):
-            # Pattern qui supporte LOOT * et LOOT col1, col2
-            pattern = r"LOOT\s+(.+?)\s+DANS\s+(\w+)(?:\s*,\s*(\w+))?(?:\s*AVEC\s+(.+?))?(?:\s*TRIER\s+PAR\s+(.+))?$"
-            match = re.match(pattern, query, re.IGNORECASE)
-            if not match:
-                raise ValueError("Syntaxe LOOT invalide")
-            
-            columns_str, table1, table2, condition, order_by_str = match.groups()
-            
-            # Parser les colonnes
-            if columns_str.strip() == "*":
-                columns = "*"
+        """Parser une requête SQL-like et retourner son arbre syntaxique (nœud de query_ast)"""
+        return parse(query.strip())
+
+    @staticmethod
+    def cache_info():
+        """Statistiques du cache de parsing (hits, misses, maxsize, currsize)"""
+        return parse.cache_info()
+
+
+class _Parser:
+    """Parser descendant récursif : une méthode par règle de la grammaire"""
+
+    def __init__(self, query):
+        self.query = query
+        self.tokens = tokenize(query)
+        self.pos = 0
+        self.usage = None
+        self.parameters = 0
+        # Agrégats permis dans les conditions (AYANT)
+        self.in_having = False
+
+    # --- Jetons ---
+
+    def peek(self, offset=0):
+        i = self.pos + offset
+        return self.tokens[i] if i < len(self.tokens) else None
+
+    def error(self):
+        token = self.peek()
+        near = f" (près de « {token.text} »)" if token else " (requête incomplète)"
+        raise ValueError(f"Tu cheat, il faut le format : {self.usage}{near}")
+
+    def at_keyword(self, *words):
+        for offset, word in enumerate(words):
+            token = self.peek(offset)
+            if token is None or token.kind != "word" or token.text.upper() != word:
+                return False
+        return True
+
+    def accept_keyword(self, *words):
+        if self.at_keyword(*words):
+            self.pos += len(words)
+            return True
+        return False
+
+    def expect_keyword(self, *words):
+        if not self.accept_keyword(*words):
+            self.error()
+
+    def accept_op(self, op):
+        token = self.peek()
+        if token is not None and token.kind == "op" and token.text == op:
+            self.pos += 1
+            return True
+        return False
+
+    def expect_op(self, op):
+        if not self.accept_op(op):
+            self.error()
+
+    def take(self, *kinds):
+        token = self.peek()
+        if token is None or token.kind not in kinds:
+            self.error()
+        self.pos += 1
+        return token
+
+    def end(self):
+        if self.peek() is not None:
+            self.error()
+
+    # --- Éléments ---
+
+    def name(self):
+        """Identifiant (lettres, chiffres, _)"""
+        token = self.peek()
+        if token is None or not (token.kind == "word" or token.kind == "number" and token.text.isdigit()):
+            self.error()
+        self.pos += 1
+        return token.text
+
+    def integer(self):
+        """Entier positif ou nul"""
+        token = self.peek()
+        if token is None or token.kind != "number" or not token.text.isdigit():
+            self.error()
+        self.pos += 1
+        return int(token.text)
+
+    def string(self):
+        return self.take("string").text[1:-1].replace("''", "'")
+
+    def quoted(self):
+        return self.take("quoted").text[1:-1]
+
+    def rest(self):
+        """Texte brut jusqu'à la fin de la requête, ou None"""
+        token = self.peek()
+        if token is None:
+            return None
+        self.pos = len(self.tokens)
+        return self.query[token.start:].strip()
+
+    def path(self):
+        if self.peek() is not None and self.peek().kind == "string":
+            return self.string()
+        path = self.rest()
+        if path is None:
+            self.error()
+        return path
+
+    def name_list(self):
+        names = [self.name()]
+        while self.accept_op(","):
+            names.append(self.name())
+        return tuple(names)
+
+    def column_ref(self):
+        name = self.name()
+        if self.accept_op("."):
+            name = f"{name}.{self.name()}"
+        return name
+
+    def aggregate(self):
+        """COMPTER(*) ou FONCTION(colonne), ou None si le jeton courant n'en commence pas un"""
+        token, following = self.peek(), self.peek(1)
+        if token is None or token.kind != "word" or token.text.upper() not in AGGREGATE_FUNCTIONS \
+                or following is None or following.text != "(":
+            return None
+        function = token.text.upper()
+        self.pos += 2
+        column = None if function == "COMPTER" and self.accept_op("*") else self.column_ref()
+        self.expect_op(")")
+        return ast.Aggregate(function, column)
+
+    def select_item(self):
+        """Colonne ou agrégat de la liste d'un LOOT"""
+        return self.aggregate() or self.column_ref()
+
+    def parameter(self):
+        """Paramètre ? d'une requête préparée, ou None"""
+        if not self.accept_op("?"):
+            return None
+        self.parameters += 1
+        return ast.Parameter(self.parameters - 1)
+
+    def value(self):
+        """Valeur de POP DANS / DEFINIR : 'texte', ?, ou jetons accolés tels quels (42, -1.5, null, 2024-01-01)"""
+        token = self.peek()
+        if token is not None and token.kind == "string":
+            return self.string()
+        parameter = self.parameter()
+        if parameter is not None:
+            return parameter
+        if token is None or token.kind == "op":
+            self.error()
+        start = end = token.start
+        while token is not None and token.start == end and token.kind not in ("op", "string"):
+            end = token.end
+            self.pos += 1
+            token = self.peek()
+        return self.query[start:end]
+
+    # --- Conditions : cond := et (OU et)* ; et := terme (ET terme)* ; terme := ( cond ) | comparaison ---
+
+    def condition(self):
+        items = self._flatten(ast.Or, [self._and_condition()])
+        while self.accept_keyword("OU"):
+            items += self._flatten(ast.Or, [self._and_condition()])
+        return items[0] if len(items) == 1 else ast.Or(tuple(items))
+
+    def _and_condition(self):
+        items = self._flatten(ast.And, [self._term()])
+        while self.accept_keyword("ET"):
+            items += self._flatten(ast.And, [self._term()])
+        return items[0] if len(items) == 1 else ast.And(tuple(items))
+
+    @staticmethod
+    def _flatten(kind, items):
+        return [sub for item in items for sub in (item.items if isinstance(item, kind) else (item,))]
+
+    def _term(self):
+        if self.accept_op("("):
+            condition = self.condition()
+            self.expect_op(")")
+            return condition
+        column = (self.in_having and self.aggregate()) or ast.Column(self.column_ref())
+        token = self.take("op")
+        if token.text not in COMPARISON_OPERATORS:
+            self.pos -= 1
+            self.error()
+        return ast.Comparison(column, token.text, self._operand())
+
+    def _operand(self):
+        token = self.peek()
+        if token is None:
+            self.error()
+        if token.kind == "string":
+            return ast.Literal(self.string())
+        parameter = self.parameter()
+        if parameter is not None:
+            return parameter
+        if token.kind == "number":
+            self.pos += 1
+            return ast.Literal(token.text)
+        if token.kind == "word" and token.text.upper() in ("NULL", "TRUE", "FALSE"):
+            self.pos += 1
+            return ast.Literal(token.text.lower())
+        return ast.Column(self.column_ref())
+
+    # --- Requêtes ---
+
+    def statement(self):
+        for keywords, rule, usage in STATEMENTS:
+            if self.accept_keyword(*keywords):
+                self.usage = usage
+                node = rule(self)
+                self.end()
+                return node
+        raise ValueError("Sort inconnu ! Check ton grimoire SQL")
+
+    def _login(self):
+        login = self.name()
+        self.expect_keyword("MOTDEPASSE")
+        return ast.Login(login, self.string())
+
+    def _create_user(self):
+        login = self.name()
+        self.expect_keyword("MOTDEPASSE")
+        password = self.string()
+        self.expect_keyword("PERMISSIONS")
+        return ast.CreateUser(login, password, self.name_list())
+
+    def _edit_user_permissions(self):
+        login = self.name()
+        self.expect_keyword("PERMISSIONS")
+        return ast.EditUserPermissions(login, self.name_list())
+
+    def _import_database(self):
+        db_name = self.name()
+        self.expect_keyword("FICHIER")
+        return ast.ImportDatabase(db_name, self.path())
+
+    def _create_table(self):
+        table_name = self.name()
+        self.expect_op("(")
+        columns = [self._column_spec()]
+        while self.accept_op(","):
+            columns.append(self._column_spec())
+        self.expect_op(")")
+        storage = self.name() if self.accept_keyword("STOCKAGE") else None
+        return ast.CreateTable(table_name, tuple(columns), storage)
+
+    def _column_spec(self):
+        name = self.name()
+        col_type = self.name().upper()
+        size = None
+        if col_type == "VARCHAR":
+            if not self.accept_op("("):
+                raise ValueError("VARCHAR doit être VARCHAR(n)")
+            token = self.take("number")
+            if not token.text.isdigit() or int(token.text) <= 0:
+                raise ValueError("VARCHAR(n) : n doit être un entier positif")
+            size = int(token.text)
+            self.expect_op(")")
+        elif col_type not in COLUMN_TYPES:
+            raise ValueError(f"Type {col_type} non supporté")
+
+        primary_key = not_null = unique = False
+        references = None
+        while self.peek() is not None and self.peek().kind == "word":
+            if self.accept_keyword("PRIMARY", "KEY"):
+                primary_key = True
+            elif self.accept_keyword("NOT", "NULL"):
+                not_null = True
+            elif self.accept_keyword("UNIQUE"):
+                unique = True
+            elif self.accept_keyword("FOREIGN", "KEY"):
+                # col TYPE FOREIGN KEY REFERENCES table(col), aussi accepté par l'ancien parseur
+                self.expect_keyword("REFERENCES")
+                references = self._references()
+            elif self.accept_keyword("REFERENCES"):
+                references = self._references()
             else:
-                columns = [col.strip() for col in columns_str.split(",")]
-            
-            # Parser ORDER BY
-            order_by_cols = []
-            if order_by_str:
-                parts = re.split(r'\s*,\s*', order_by_str.strip())
-                for part in parts:
-                    match_order = re.match(r"((?:\w+\.)?\w+)\s*(ASC|DESC)?$", part.strip(), re.IGNORECASE)
-                    if not match_order:
-                        raise ValueError(f"TRIER PAR invalide : {part}")
-                    col, direction = match_order.groups()
-                    order_by_cols.append({
-                        "column": col.strip(),
-                        "direction": direction.upper() if direction else "ASC"
-                    })
-
-            if table2:
-                return {"type": "join_tables", "table1": table1, "table2": table2, "columns": columns, "join_condition": condition, "order_by": order_by_cols}
-            return {"type": "select", "table_name": table1, "columns": columns, "condition": condition, "order_by": order_by_cols}
-        
-        elif re.match(r"EDIT\s+\w+\s+DEFINIR\s+\w+\s*=\s*'.*'\s*AVEC\s*.+", query, re.IGNORECASE):
-            match = re.match(r"EDIT\s+(\w+)\s+DEFINIR\s+(\w+\s*=\s*'[^']*')\s*AVEC\s*(.+)", query, re.IGNORECASE)
-            if not match:
-                raise ValueError("Syntaxe cheatée ! Format : EDIT table DEFINIR col = 'val' AVEC condition")
-            table_name, set_clause, condition = match.groups()
-            return {"type": "update", "table_name": table_name, "set_clause": set_clause, "condition": condition}
-        
-        elif re.match(r"DEPOP DANS\s+\w+\s*AVEC\s*.+", query, re.IGNORECASE):
-            match = re.match(r"DEPOP DANS\s+(\w+)\s*AVEC\s*(.+)", query, re.IGNORECASE)
-            if not match:
-                raise ValueError("Tu cheat, il faut le format : DEPOP DANS table AVEC condition")
-            table_name, condition = match.groups()
-            return {"type": "delete", "table_name": table_name, "condition": condition}
-        
-        elif re.match(r"STATS TABLEAU\s+\w+", query, re.IGNORECASE):
-            match = re.match(r"STATS TABLEAU\s+(\w+)", query, re.IGNORECASE)
-            if not match:
-                raise ValueError("Tu cheat, il faut le format : STATS TABLEAU nom")
-            return {"type": "table_stats", "table_name": match.groups()[0]}
-        
-        elif re.match(r"AIDE(?:\s+.+)?", query, re.IGNORECASE):
-            match = re.match(r"AIDE\s*(.+)?", query, re.IGNORECASE)
-            command = match.groups()[0] if match.groups()[0] else None
-            return {"type": "show_help", "command": command}
-        
-        elif re.match(r"QUITTER", query, re.IGNORECASE):
-            return {"type": "quit"}
-        
-
-        elif re.match(r"DEBUT TRANSACTION", query, re.IGNORECASE):
-            return {"type": "begin_transaction"}
-        
-        elif re.match(r"VALIDER TRANSACTION", query, re.IGNORECASE):
-            return {"type": "commit_transaction"}
-        
-        elif re.match(r"ANNULER TRANSACTION", query, re.IGNORECASE):
-            return {"type": "rollback_transaction"}
-
-        elif re.match(r"STATUS TRANSACTION", query, re.IGNORECASE):
-            return {"type": "transaction_status"}
-
-        elif re.match(r"CRAFTER VUE\s+\w+\s+COMME\s+\".*\"", query, re.IGNORECASE):
-            match = re.match(r"CRAFTER VUE\s+(\w+)\s+COMME\s+\"(.+)\"", query, re.IGNORECASE)
-            if not match:
-                raise ValueError("Format : CRAFTER VUE nom COMME \"requête LOOT\"")
-            view_name, view_query = match.groups()
-            return {"type": "create_view", "view_name": view_name, "query": view_query}
-
-        elif re.match(r"DEPOP VUE\s+\w+", query, re.IGNORECASE):
-            match = re.match(r"DEPOP VUE\s+(\w+)", query, re.IGNORECASE)
-            return {"type": "delete_view", "view_name": match.groups()[0]}
-
-        elif re.match(r"LISTE VUES", query, re.IGNORECASE):
-            return {"type": "list_views"}
-        
-        elif re.match(r"SNAPSHOT TABLEAU\s+\w+\s+VERSION\s+'.*'", query, re.IGNORECASE):
-            match = re.match(r"SNAPSHOT TABLEAU\s+(\w+)\s+VERSION\s+'([^']*)'", query, re.IGNORECASE)
-            if not match:
-                raise ValueError("Format: SNAPSHOT TABLEAU nom VERSION 'description'")
-            table_name, description = match.groups()
-            return {"type": "create_snapshot", "table_name": table_name, "description": description}
-
-        elif re.match(r"VOYAGE TABLEAU\s+\w+\s+VERSION\s+\w+", query, re.IGNORECASE):
-            match = re.match(r"VOYAGE TABLEAU\s+(\w+)\s+VERSION\s+(\w+)", query, re.IGNORECASE)
-            if not match:
-                raise ValueError("Format: VOYAGE TABLEAU nom VERSION id_snapshot")
-            table_name, snapshot_id = match.groups()
-            return {"type": "restore_snapshot", "table_name": table_name, "snapshot_id": snapshot_id}
-
-        elif re.match(r"VOIR SNAPSHOT\s+\w+\s+VERSION\s+\w+", query, re.IGNORECASE):
-            match = re.match(r"VOIR SNAPSHOT\s+(\w+)\s+VERSION\s+(\w+)", query, re.IGNORECASE)
-            if not match:
-                raise ValueError("Format: VOIR SNAPSHOT nom VERSION id_snapshot")
-            table_name, snapshot_id = match.groups()
-            return {"type": "view_snapshot", "table_name": table_name, "snapshot_id": snapshot_id}
-
-        elif re.match(r"LISTE SNAPSHOTS TABLEAU\s+\w+", query, re.IGNORECASE):
-            match = re.match(r"LISTE SNAPSHOTS TABLEAU\s+(\w+)", query, re.IGNORECASE)
-            return {"type": "list_snapshots", "table_name": match.groups()[0]}
-
-        elif re.match(r"DEPOP SNAPSHOT TABLEAU\s+\w+\s+VERSION\s+\w+", query, re.IGNORECASE):
-            match = re.match(r"DEPOP SNAPSHOT TABLEAU\s+(\w+)\s+VERSION\s+(\w+)", query, re.IGNORECASE)
-            if not match:
-                raise ValueError("Format: DEPOP SNAPSHOT TABLEAU nom VERSION id_snapshot")
-            table_name, snapshot_id = match.groups()
-            return {"type": "delete_snapshot", "table_name": table_name, "snapshot_id": snapshot_id}
-
-        elif re.match(r"HISTORIQUE QUETE\s+\w+", query, re.IGNORECASE):
-            match = re.match(r"HISTORIQUE QUETE\s+(\w+)", query, re.IGNORECASE)
-            return {"type": "quest_history", "quest_name": match.groups()[0]}
-
-        elif re.match(r"RESULTATS QUETE\s+\w+\s+EXECUTION\s+\w+", query, re.IGNORECASE):
-            match = re.match(r"RESULTATS QUETE\s+(\w+)\s+EXECUTION\s+(\w+)", query, re.IGNORECASE)
-            return {"type": "quest_results", "quest_name": match.groups()[0], "execution_id": match.groups()[1]}
-
-        elif re.match(r"CRAFTER QUETE\s+(\w+)\s+\"([^\"]+)\"\s+CHAQUE\s+(.+)", query, re.IGNORECASE):
-            match = re.match(r"CRAFTER QUETE\s+(\w+)\s+\"([^\"]+)\"\s+CHAQUE\s+(.+)", query, re.IGNORECASE)
-            if not match:
-                raise ValueError("Format: CRAFTER QUETE nom \"requête LOOT\" CHAQUE nombre unité")
-            
-
-
-            quest_name, quest_query, interval = match.groups()
-            
-
-
-            # Valider l'intervalle
-            valid_intervals = ["1 JOURS", "1 HEURES", "30 MINUTES", "1 SEMAINE"]
-
-            if interval not in valid_intervals:
-                raise ValueError(f"Intervalle invalide. Options: {', '.join(valid_intervals)}")
-            
-
-            return {"type": "create_quest", "quest_name": quest_name, "query": quest_query, "interval": interval}
-        
-        elif re.match(r"EXECUTER QUETE\s+\w+", query, re.IGNORECASE):
-            match = re.match(r"EXECUTER QUETE\s+(\w+)", query, re.IGNORECASE)
-            return {"type": "execute_quest", "quest_name": match.groups()[0]}
-
-        elif re.match(r"LISTE QUETES", query, re.IGNORECASE):
-            return {"type": "list_quests"}
-
-        elif re.match(r"DEPOP QUETE\s+\w+", query, re.IGNORECASE):
-            match = re.match(r"DEPOP QUETE\s+(\w+)", query, re.IGNORECASE)
-            return {"type": "delete_quest", "quest_name": match.groups()[0]}
-
-        elif re.match(r"DEMARRER QUETES", query, re.IGNORECASE):
-            return {"type": "start_quests"}
+                raise ValueError(f"Contrainte {self.peek().text} non supportée sur {name}")
+        return ast.ColumnSpec(name, col_type, size, primary_key, not_null, unique, references)
 
+    def _references(self):
+        """table(colonne) après REFERENCES"""
+        ref_table = self.name()
+        self.expect_op("(")
+        references = (ref_table, self.name())
+        self.expect_op(")")
+        return references
+
+    def _create_index(self):
+        index_name = self.name()
+        self.expect_keyword("SUR")
+        table_name = self.name()
+        self.expect_op("(")
+        column = self.name()
+        self.expect_op(")")
+        return ast.CreateIndex(index_name, table_name, column)
+
+    def _insert(self):
+        table_name = self.name()
+        self.expect_keyword("VALEURS")
+        rows = [self._value_tuple()]
+        while self.accept_op(","):
+            rows.append(self._value_tuple())
+        if len(rows) == 1:
+            return ast.Insert(table_name, rows[0])
+        return ast.InsertMany(table_name, tuple(rows))
+
+    def _value_tuple(self):
+        self.expect_op("(")
+        values = [self.value()]
+        while self.accept_op(","):
+            values.append(self.value())
+        self.expect_op(")")
+        return tuple(values)
+
+    def _load_file(self):
+        table_name = self.name()
+        self.expect_keyword("FICHIER")
+        return ast.LoadFile(table_name, self.path())
+
+    def _select(self):
+        if self.accept_op("*"):
+            columns = "*"
         else:
+            columns = [self.select_item()]
+            while self.accept_op(","):
+                columns.append(self.select_item())
+            columns = tuple(columns)
+        self.expect_keyword("DANS")
+        table1 = self.name()
+        table2 = self.name() if self.accept_op(",") else None
+        condition = self.condition() if self.accept_keyword("AVEC") else None
+        group_by = self._group_by() if self.accept_keyword("GROUPER", "PAR") else ()
+        having = self._having() if self.accept_keyword("AYANT") else None
+        order_by = self._order_by() if self.accept_keyword("TRIER", "PAR") else ()
+        limit, offset = None, 0
+        if self.accept_keyword("LIMITE"):
+            limit = self.integer()
+            offset = self.integer() if self.accept_keyword("DECALAGE") else 0
+        if table2:
+            return ast.Join(table1, table2, columns, condition, order_by, limit, offset, group_by, having)
+        return ast.Select(table1, columns, condition, order_by, limit, offset, group_by, having)
+
+    def _group_by(self):
+        columns = [self.column_ref()]
+        while self.accept_op(","):
+            columns.append(self.column_ref())
+        return tuple(columns)
+
+    def _having(self):
+        self.in_having = True
+        condition = self.condition()
+        self.in_having = False
+        return condition
+
+    def _explain(self):
+        analyze = self.accept_keyword("ANALYSER")
+        self.expect_keyword("LOOT")
+        return ast.Explain(self._select(), analyze)
+
+    def _order_by(self):
+        items = []
+        while True:
+            column = self.select_item()
+            direction = "ASC"
+            if self.at_keyword("ASC") or self.at_keyword("DESC"):
+                direction = self.name().upper()
+            items.append(ast.OrderItem(column, direction))
+            if not self.accept_op(","):
+                return tuple(items)
+
+    def _update(self):
+        table_name = self.name()
+        self.expect_keyword("DEFINIR")
+        column = self.name()
+        self.expect_op("=")
+        value = self.value()
+        self.expect_keyword("AVEC")
+        return ast.Update(table_name, column, value, self.condition())
+
+    def _delete(self):
+        table_name = self.name()
+        self.expect_keyword("AVEC")
+        return ast.Delete(table_name, self.condition())
+
+    def _create_view(self):
+        view_name = self.name()
+        self.expect_keyword("COMME")
+        return ast.CreateView(view_name, self.quoted())
+
+    def _create_snapshot(self):
+        table_name = self.name()
+        self.expect_keyword("VERSION")
+        return ast.CreateSnapshot(table_name, self.string())
+
+    def _restore_snapshot(self):
+        table_name = self.name()
+        self.expect_keyword("VERSION")
+        return ast.RestoreSnapshot(table_name, self.name())
+
+    def _view_snapshot(self):
+        table_name = self.name()
+        self.expect_keyword("VERSION")
+        return ast.ViewSnapshot(table_name, self.name())
+
+    def _delete_snapshot(self):
+        table_name = self.name()
+        self.expect_keyword("VERSION")
+        return ast.DeleteSnapshot(table_name, self.name())
+
+    def _create_quest(self):
+        quest_name = self.name()
+        query = self.quoted()
+        self.expect_keyword("CHAQUE")
+        interval = f"{self.take('number').text} {self.name().upper()}"
+        if interval not in VALID_INTERVALS:
+            raise ValueError(f"Intervalle invalide. Options: {', '.join(VALID_INTERVALS)}")
+        return ast.CreateQuest(quest_name, query, interval)
+
+    def _prepare(self):
+        name = self.name()
+        self.expect_keyword("COMME")
+        return ast.Prepare(name, self.quoted())
+
+    def _execute_prepared(self):
+        name = self.name()
+        rows = []
+        if self.accept_keyword("VALEURS"):
+            rows.append(self._value_tuple())
+            while self.accept_op(","):
+                rows.append(self._value_tuple())
+        return ast.ExecutePrepared(name, tuple(rows))
+
+    def _quest_results(self):
+        quest_name = self.name()
+        self.expect_keyword("EXECUTION")
+        return ast.QuestResults(quest_name, self.name())
+
+
+# Mots-clés de tête -> (règle, format attendu), essayés dans l'ordre (le plus spécifique d'abord)
+STATEMENTS = [
+    (("LOGIN", "JOUEUR"), _Parser._login, "LOGIN JOUEUR login MOTDEPASSE 'pass'"),
+    (("CRAFTER", "JOUEUR"), _Parser._create_user, "CRAFTER JOUEUR login MOTDEPASSE 'pass' PERMISSIONS read,write,delete"),
+    (("EDIT", "JOUEUR"), _Parser._edit_user_permissions, "EDIT JOUEUR login PERMISSIONS read,write,delete"),
+    (("LISTE", "JOUEURS"), lambda p: ast.ListUsers(), "LISTE JOUEURS"),
+    (("LISTE", "PERMISSIONS", "JOUEUR"), lambda p: ast.ListUserPermissions(p.name()), "LISTE PERMISSIONS JOUEUR login"),
+
+    (("CRAFTER", "BASE"), lambda p: ast.CreateDatabase(p.name()), "CRAFTER BASE nom"),
+    (("DEPOP", "BASE"), lambda p: ast.DeleteDatabase(p.name()), "DEPOP BASE nom"),
+    (("UTILISER",), lambda p: ast.UseDatabase(p.name()), "UTILISER nom"),
+    (("QUITTER", "BASE"), lambda p: ast.DeselectDatabase(), "QUITTER BASE"),
+    (("LISTE", "BASES"), lambda p: ast.ListDatabases(), "LISTE BASES"),
+    (("EXPORTER", "BASE"), lambda p: ast.ExportDatabase(p.name()), "EXPORTER BASE nom"),
+    (("IMPORTER", "BASE"), _Parser._import_database, "IMPORTER BASE nom FICHIER chemin"),
+    (("MIGRER", "BASE"), lambda p: ast.MigrateDatabase(p.name()), "MIGRER BASE nom"),
+
+    (("CRAFTER", "TABLEAU"), _Parser._create_table, "CRAFTER TABLEAU nom (col1 TYPE [constraints], ...) [STOCKAGE PAGES|JSON|COLONNES]"),
+    (("DEPOP", "TABLEAU"), lambda p: ast.DeleteTable(p.name()), "DEPOP TABLEAU nom"),
+    (("LISTE", "TABLEAUX"), lambda p: ast.ListTables(), "LISTE TABLEAUX"),
+    (("CRAFTER", "INDEX"), _Parser._create_index, "CRAFTER INDEX nom SUR table(colonne)"),
+    (("DEPOP", "INDEX"), lambda p: ast.DeleteIndex(p.name()), "DEPOP INDEX nom"),
+    (("LISTE", "INDEX"), lambda p: ast.ListIndexes(), "LISTE INDEX"),
+
+    (("POP", "DANS"), _Parser._insert, "POP DANS table VALEURS (val1, val2, ...)"),
+    (("CHARGER", "DANS"), _Parser._load_file, "CHARGER DANS table FICHIER 'chemin.csv'"),
+    (("LOOT",), _Parser._select, "LOOT col1, COMPTER(*), SOMME(col2)... | * DANS table[, table2] [AVEC condition] [GROUPER PAR col, ...] [AYANT condition] [TRIER PAR col [ASC|DESC], ...] [LIMITE n [DECALAGE m]]"),
+    (("EXPLIQUER",), _Parser._explain, "EXPLIQUER [ANALYSER] LOOT ..."),
+    (("EDIT",), _Parser._update, "EDIT table DEFINIR col = 'val' AVEC condition"),
+    (("DEPOP", "DANS"), _Parser._delete, "DEPOP DANS table AVEC condition"),
+    (("STATS", "CACHE"), lambda p: ast.CacheStats(), "STATS CACHE"),
+    (("STATS", "TABLEAU"), lambda p: ast.TableStats(p.name()), "STATS TABLEAU nom"),
+    (("ANALYSER", "TABLEAU"), lambda p: ast.AnalyzeTable(p.name()), "ANALYSER TABLEAU nom"),
+
+    (("DEBUT", "TRANSACTION"), lambda p: ast.BeginTransaction(), "DEBUT TRANSACTION"),
+    (("VALIDER", "TRANSACTION"), lambda p: ast.CommitTransaction(), "VALIDER TRANSACTION"),
+    (("ANNULER", "TRANSACTION"), lambda p: ast.RollbackTransaction(), "ANNULER TRANSACTION"),
+    (("STATUS", "TRANSACTION"), lambda p: ast.TransactionStatus(), "STATUS TRANSACTION"),
+
+    (("CRAFTER", "VUE"), _Parser._create_view, "CRAFTER VUE nom COMME \"requête LOOT\""),
+    (("DEPOP", "VUE"), lambda p: ast.DeleteView(p.name()), "DEPOP VUE nom"),
+    (("LISTE", "VUES"), lambda p: ast.ListViews(), "LISTE VUES"),
+
+    (("SNAPSHOT", "TABLEAU"), _Parser._create_snapshot, "SNAPSHOT TABLEAU nom VERSION 'description'"),
+    (("VOYAGE", "TABLEAU"), _Parser._restore_snapshot, "VOYAGE TABLEAU nom VERSION id_snapshot"),
+    (("VOIR", "SNAPSHOT"), _Parser._view_snapshot, "VOIR SNAPSHOT nom VERSION id_snapshot"),
+    (("LISTE", "SNAPSHOTS", "TABLEAU"), lambda p: ast.ListSnapshots(p.name()), "LISTE SNAPSHOTS TABLEAU nom"),
+    (("DEPOP", "SNAPSHOT", "TABLEAU"), _Parser._delete_snapshot, "DEPOP SNAPSHOT TABLEAU nom VERSION id_snapshot"),
+
+    (("HISTORIQUE", "QUETE"), lambda p: ast.QuestHistory(p.name()), "HISTORIQUE QUETE nom"),
+    (("RESULTATS", "QUETE"), _Parser._quest_results, "RESULTATS QUETE nom EXECUTION id"),
+    (("CRAFTER", "QUETE"), _Parser._create_quest, "CRAFTER QUETE nom \"requête LOOT\" CHAQUE nombre unité"),
+    (("EXECUTER", "QUETE"), lambda p: ast.ExecuteQuest(p.name()), "EXECUTER QUETE nom"),
+    (("LISTE", "QUETES"), lambda p: ast.ListQuests(), "LISTE QUETES"),
+    (("DEPOP", "QUETE"), lambda p: ast.DeleteQuest(p.name()), "DEPOP QUETE nom"),
+    (("DEMARRER", "QUETES"), lambda p: ast.StartQuests(), "DEMARRER QUETES"),
+
+    (("PREPARER",), _Parser._prepare, "PREPARER nom COMME \"requête avec ?\""),
+    (("EXECUTER",), _Parser._execute_prepared, "EXECUTER nom [VALEURS (val1, ...), (...)]"),
 
-            raise ValueError("Sort inconnu ! Check ton grimoire SQL")
\ No newline at end of file
+    (("AIDE",), lambda p: ast.ShowHelp(p.rest()), "AIDE [commande]"),
+    (("QUITTER",), lambda p: ast.Quit(), "QUITTER"),
+]
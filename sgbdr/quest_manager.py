@@ -29,8 +29,8 @@ class QuestManager:
         if interval not in valid_intervals:
             raise ValueError(f"Intervalle invalide. Options: {', '.join(valid_intervals)}")
         
-        # Valider que la requête est un LOOT
-        if not query.upper().startswith("LOOT"):
+        # Valider que la requête est un LOOT (l'analyse reste en cache pour les exécutions)
+        if self.sgbdr.query_parser.parse_query(query).type not in ("select", "join_tables"):
             raise ValueError("Une quête doit être basée sur une requête LOOT.")
         
         db_dir = self.db_path / self.sgbdr.current_db
@@ -0,0 +1,124 @@
+# sgbdr/rows.py
+# Représentation compacte des lignes en mémoire : un tuple de valeurs et une disposition (noms des
+# colonnes -> positions) partagée par toutes les lignes de même forme, au lieu d'un dict par ligne
+# répétant chaque nom de colonne. Les lignes ne redeviennent des dicts qu'à la sortie (projection).
+import threading
+from collections.abc import Mapping
+
+# Dispositions déjà créées, par tuple de noms : une seule instance par forme de ligne
+_LAYOUTS = {}
+_LAYOUTS_LOCK = threading.Lock()
+
+
+class Layout:
+    """Noms des colonnes d'une ligne et position de chacun dans son tuple de valeurs"""
+    __slots__ = ("names", "positions", "_joined")
+
+    def __init__(self, names):
+        self.names = names
+        # Nom répété (auto-jointure) : la dernière position l'emporte, comme dict.update
+        self.positions = {name: position for position, name in enumerate(names)}
+        # Disposition -> disposition des lignes jointes à droite, préfixées par les noms de table
+        self._joined = {}
+
+    def join(self, table1, other, table2):
+        """Disposition des lignes jointes (table1.colonne..., table2.colonne...)"""
+        key = (table1, other, table2)
+        joined = self._joined.get(key)
+        if joined is None:
+            joined = self._joined[key] = layout_of(tuple(f"{table1}.{name}" for name in self.names)
+                                                   + tuple(f"{table2}.{name}" for name in other.names))
+        return joined
+
+    def __reduce__(self):
+        # Relue depuis un run de tri sur disque : même instance que les lignes encore en mémoire
+        return layout_of, (self.names,)
+
+    def __repr__(self):
+        return f"Layout({', '.join(self.names)})"
+
+
+def layout_of(names):
+    """Disposition partagée d'un tuple de noms de colonnes"""
+    layout = _LAYOUTS.get(names)
+    if layout is None:
+        with _LAYOUTS_LOCK:
+            layout = _LAYOUTS.setdefault(names, Layout(names))
+    return layout
+
+
+class Row:
+    """Ligne en lecture seule : disposition partagée + tuple de valeurs.
+
+    S'utilise comme un dict (get, [], in, keys, items) ; to_dict() en fait une copie modifiable.
+    """
+    __slots__ = ("layout", "data")
+
+    def __init__(self, layout, data):
+        self.layout = layout
+        self.data = data
+
+    def get(self, name, default=None):
+        position = self.layout.positions.get(name)
+        return default if position is None else self.data[position]
+
+    def __getitem__(self, name):
+        return self.data[self.layout.positions[name]]
+
+    def __contains__(self, name):
+        return name in self.layout.positions
+
+    def __iter__(self):
+        return iter(self.layout.names)
+
+    def __len__(self):
+        return len(self.data)
+
+    def keys(self):
+        return self.layout.names
+
+    def values(self):
+        return self.data
+
+    def items(self):
+        return zip(self.layout.names, self.data)
+
+    def to_dict(self):
+        return dict(zip(self.layout.names, self.data))
+
+    def __eq__(self, other):
+        if isinstance(other, Row):
+            return self.layout.names == other.layout.names and self.data == other.data
+        return isinstance(other, Mapping) and self.to_dict() == dict(other)
+
+    __hash__ = None
+
+    def __sizeof__(self):
+        # Le tuple de valeurs appartient à la ligne (la disposition, elle, est partagée)
+        return object.__sizeof__(self) + self.data.__sizeof__()
+
+    def __reduce__(self):
+        return Row, (self.layout, self.data)
+
+    def __repr__(self):
+        return f"Row({self.to_dict()!r})"
+
+
+Mapping.register(Row)
+
+
+def compact(row):
+    """dict -> Row (une Row est rendue telle quelle)"""
+    if isinstance(row, Row):
+        return row
+    return Row(layout_of(tuple(row)), tuple(row.values()))
+
+
+def compact_rows(rows):
+    """Itérateur de lignes compactes ; les dicts sont convertis un à un, au fil du parcours"""
+    return map(compact, rows)
+
+
+def join_rows(table1, r1, table2, r2):
+    """Ligne jointe : les deux tuples de valeurs bout à bout, sans recopier les noms de colonnes"""
+    return Row(r1.layout.join(table1, r2.layout, table2), r1.data + r2.data)
@@ -17,14 +17,13 @@ class SnapshotManager:
             raise ValueError("Aucune base sélectionnée.")
         
         db_dir = self.db_path / self.sgbdr.current_db
-        table_path = db_dir / f"{table_name}.json"
+        storage = self.sgbdr.storage_manager.get_storage(table_name)
         
-        if not table_path.exists():
+        if not storage.exists():
             raise ValueError(f"Table {table_name} introuvable.")
         
         # Charger les données actuelles
-        with open(table_path, "r") as f:
-            current_data = json.load(f)
+        current_data = storage.read_all()
         
         # Créer le répertoire des snapshots
         snapshots_dir = db_dir / "_snapshots" / table_name
@@ -130,11 +129,11 @@ class SnapshotManager:
         
         db_dir = self.db_path / self.sgbdr.current_db
         snapshot_file = db_dir / "_snapshots" / table_name / f"{snapshot_id}.json"
-        table_path = db_dir / f"{table_name}.json"
+        storage = self.sgbdr.storage_manager.get_storage(table_name)
         
         if not snapshot_file.exists():
             raise ValueError(f"Snapshot {snapshot_id} introuvable.")
-        if not table_path.exists():
+        if not storage.exists():
             raise ValueError(f"Table {table_name} introuvable.")
         
         # Charger le snapshot
@@ -142,8 +141,7 @@ class SnapshotManager:
             snapshot_data = json.load(f)
         
         # Restaurer les données
-        with open(table_path, "w") as f:
-            json.dump(snapshot_data["data"], f,indent=2)
+        storage.write_all(snapshot_data["data"])
         
         print(f"╔════════════════════════════════════")
         print(f"║ Table {table_name} restaurée !")
@@ -0,0 +1,139 @@
+# sgbdr/sorting.py
+import heapq
+import pickle
+import tempfile
+from itertools import islice
+from operator import itemgetter
+from .buffer_cache import SIZE_SAMPLE, estimate_rows_size
+
+# Budget mémoire par défaut d'un tri (octets) : au-delà, runs triés écrits sur disque puis fusionnés
+DEFAULT_SORT_MEMORY_BUDGET = 64 * 1024 * 1024
+# Nombre maximal de runs fusionnés en une passe (un fichier ouvert par run)
+MERGE_FAN_IN = 64
+# Lignes par enregistrement pickle dans un run sur disque
+SPILL_BATCH_SIZE = 1024
+
+# Valeur stockée -> clé de tri, selon le type de la colonne (TEXT insensible à la casse) ; les nombres,
+# booléens et dates ISO stockés se comparent tels quels
+SORT_CONVERTERS = {
+    "TEXT": str.lower,
+    "VARCHAR": str.lower,
+}
+
+
+class Descending:
+    """Enveloppe inversant l'ordre d'une valeur : DESC pour n'importe quel type, sans négation"""
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __reduce__(self):
+        return Descending, (self.value,)
+
+
+def _column_key(field, col_type, direction):
+    convert = SORT_CONVERTERS.get(col_type)
+    descending = direction == "DESC"
+
+    def key(row):
+        value = row.get(field)
+        # NULL en premier en ASC, donc en dernier en DESC
+        if value is None:
+            sort_val = (0, None)
+        else:
+            sort_val = (1, convert(value) if convert is not None else value)
+        return Descending(sort_val) if descending else sort_val
+
+    return key
+
+
+def sort_key(fields):
+    """Clé de tri composite, construite une fois pour toutes les lignes.
+
+    fields : [(clé de la colonne dans la ligne, type, "ASC" | "DESC")], déjà résolus.
+    """
+    parts = [_column_key(field, col_type, direction) for field, col_type, direction in fields]
+    if len(parts) == 1:
+        return parts[0]
+    return lambda row: tuple([part(row) for part in parts])
+
+
+def top_k(rows, k, key):
+    """Les k premières lignes de sorted(rows, key=key), avec un tas borné (O(n log k))"""
+    return heapq.nsmallest(k, rows, key=key)
+
+
+def _spill(pairs):
+    """Écrire un run trié de paires (clé, ligne) dans un fichier temporaire"""
+    run = tempfile.TemporaryFile(prefix="sgbdr_sort_")
+    pairs = iter(pairs)
+    while True:
+        batch = list(islice(pairs, SPILL_BATCH_SIZE))
+        if not batch:
+            break
+        pickle.dump(batch, run, pickle.HIGHEST_PROTOCOL)
+    run.seek(0)
+    return run
+
+
+def _read_run(run):
+    try:
+        while True:
+            try:
+                batch = pickle.load(run)
+            except EOFError:
+                return
+            yield from batch
+    finally:
+        run.close()
+
+
+def _merge(runs):
+    """Fusion k-way de runs (fichiers ou listes de paires), stable : à clé égale, l'ordre des runs"""
+    sources = [_read_run(run) if not isinstance(run, list) else run for run in runs]
+    return heapq.merge(*sources, key=itemgetter(0))
+
+
+def external_sort(rows, key, memory_budget=DEFAULT_SORT_MEMORY_BUDGET, stats=None):
+    """Tri stable d'un itérateur de lignes.
+
+    Tant que les lignes tiennent dans memory_budget, simple tri en mémoire ; au-delà, chaque run
+    trié est écrit sur disque et les runs sont fusionnés (k-way, MERGE_FAN_IN runs par passe).
+    stats (dict, optionnel) reçoit le nombre de runs écrits sur disque.
+    """
+    rows = iter(rows)
+    run = list(islice(rows, SIZE_SAMPLE))
+    # Lignes par run, d'après la taille moyenne des premières lignes
+    run_rows = max(SIZE_SAMPLE, memory_budget * len(run) // estimate_rows_size(run)) if run else SIZE_SAMPLE
+    runs = []
+    spilled = 0
+    while True:
+        run.extend(islice(rows, run_rows - len(run)))
+        if len(run) < run_rows and not runs:
+            # Tout tient en mémoire
+            yield from sorted(run, key=key)
+            return
+        keys = [key(row) for row in run]
+        order = sorted(range(len(run)), key=keys.__getitem__)
+        pairs = [(keys[i], run[i]) for i in order]
+        if len(run) < run_rows:
+            runs.append(pairs)
+            break
+        runs.append(_spill(pairs))
+        spilled += 1
+        run = []
+        if len(runs) == MERGE_FAN_IN:
+            runs = [_spill(_merge(runs))]
+            spilled += 1
+
+    if stats is not None:
+        stats["runs"] = spilled
+    for _, row in _merge(runs):
+        yield row
@@ -0,0 +1,254 @@
+# sgbdr/statistics.py
+import json
+import os
+import threading
+from dataclasses import dataclass
+from .index import index_key
+
+# Statistiques recalculées par le checkpointer quand les lignes écrites depuis leur calcul
+# dépassent ce nombre et cette proportion de la table
+STATS_REFRESH_WRITES = 50
+STATS_REFRESH_RATIO = 0.2
+# Table jamais analysée : lignes supposées (si aucune n'est en cache) et valeurs distinctes
+# supposées d'une colonne non unique (sélectivité d'un = de 1/10)
+UNKNOWN_ROW_COUNT = 1000
+UNKNOWN_DISTINCT = 10
+# Valeurs d'une colonne non unique gardées tant qu'il y en a au plus autant (nombre de valeurs
+# distinctes exact entre deux calculs) ; au-delà, estimé au prorata des lignes
+DISTINCT_TRACKED = 1000
+
+
+@dataclass(frozen=True)
+class ColumnStatistics:
+    """Statistiques d'une colonne : valeurs distinctes, NULL et bornes typées (clés d'index)"""
+    distinct: int
+    nulls: int
+    min: object = None
+    max: object = None
+
+
+@dataclass(frozen=True)
+class TableStatistics:
+    """Statistiques d'une table utilisées par le planificateur"""
+    row_count: int
+    columns: dict
+
+    @classmethod
+    def summarize(cls, table_def, row_count, present, nulls):
+        """Statistiques depuis le nombre de lignes, les valeurs non NULL et les NULL de chaque colonne"""
+        columns = {}
+        for name, column in table_def.columns.items():
+            keys = [key for key in (index_key(column.type, value) for value in present[name]) if key is not None]
+            columns[name] = ColumnStatistics(
+                distinct=len(present[name]),
+                nulls=nulls[name],
+                min=min(keys) if keys else None,
+                max=max(keys) if keys else None,
+            )
+        return cls(row_count, columns)
+
+    @classmethod
+    def unknown(cls, table_def, row_count=UNKNOWN_ROW_COUNT):
+        """Statistiques supposées d'une table pas encore analysée (sélectivités par défaut)"""
+        columns = {name: ColumnStatistics(distinct=row_count if name in table_def.unique
+                                          else min(row_count, UNKNOWN_DISTINCT), nulls=0)
+                   for name in table_def.columns}
+        return cls(row_count, columns)
+
+    def dump(self):
+        return {"row_count": self.row_count,
+                "columns": {name: [col.distinct, col.nulls, col.min, col.max] for name, col in self.columns.items()}}
+
+    @classmethod
+    def load(cls, saved):
+        return cls(saved["row_count"], {name: ColumnStatistics(*values) for name, values in saved["columns"].items()})
+
+
+def _scan(rows, table_def):
+    """(lignes, {colonne: valeurs non NULL distinctes}, {colonne: NULL}) en un seul parcours"""
+    names = list(table_def.columns)
+    present = {name: set() for name in names}
+    nulls = dict.fromkeys(names, 0)
+    row_count = 0
+    for row in rows:
+        row_count += 1
+        for name in names:
+            value = row.get(name)
+            if value is None:
+                nulls[name] += 1
+            else:
+                present[name].add(value)
+    return row_count, present, nulls
+
+
+class StatisticsTracker:
+    """Statistiques d'une table, tenues à jour par chaque écriture (appelé par LoggedTableStorage).
+
+    Seuls ANALYSER TABLEAU et le checkpointer, quand elles ont trop dérivé, les recalculent par un
+    parcours : planifier une requête ne lit jamais la table. Les mises à jour incrémentales sont
+    approchées (une suppression ne relit pas les lignes supprimées), ce qui ne change que les
+    estimations, jamais les résultats. Elles sont persistées dans _index/ avec les index.
+    """
+
+    def __init__(self, storage, table_def=None):
+        self.storage = storage
+        self.path = storage.db_dir / "_index" / f"{storage.table_name}.stats"
+        self._lock = threading.RLock()
+        self.define(table_def)
+
+    def define(self, table_def):
+        """(Re)définir la table suivie : les statistiques persistées sont rechargées au prochain usage"""
+        with self._lock:
+            self.table_def = table_def
+            self._stats = None
+            self._loaded = False
+            # Lignes écrites depuis le dernier calcul ; None : à recalculer quoi qu'il arrive
+            self._changed = 0
+            self._unsaved = False
+            # Colonne non unique -> ses valeurs, tant qu'elles sont au plus DISTINCT_TRACKED (absente au-delà)
+            self._values = {}
+
+    def get(self):
+        """Statistiques courantes, ou None si la table n'a jamais été analysée"""
+        with self._lock:
+            if not self._loaded:
+                self._loaded = True
+                if self.table_def is not None and self.path.exists():
+                    with open(self.path, "r") as f:
+                        saved = json.load(f)
+                    if set(saved["columns"]) == set(self.table_def.columns):
+                        self._stats = TableStatistics.load(saved)
+                        self._values = {name: set(values) for name, values in saved.get("values", {}).items()}
+            return self._stats
+
+    def stale(self):
+        """À recalculer : jamais analysée, rejeu du WAL, ou trop de lignes écrites depuis"""
+        with self._lock:
+            if self.table_def is None:
+                return False
+            stats = self.get()
+            if stats is None or self._changed is None:
+                return True
+            return self._changed >= max(STATS_REFRESH_WRITES, STATS_REFRESH_RATIO * stats.row_count)
+
+    def analyze(self, rows):
+        """Recalculer les statistiques depuis toutes les lignes de la table"""
+        with self._lock:
+            if self.table_def is None:
+                return None
+            row_count, present, nulls = _scan(rows, self.table_def)
+            self._stats = TableStatistics.summarize(self.table_def, row_count, present, nulls)
+            self._values = {name: values for name, values in present.items()
+                            if name not in self.table_def.unique and len(values) <= DISTINCT_TRACKED}
+            self._loaded = True
+            self._changed = 0
+            self._unsaved = True
+            return self._stats
+
+    def mark_stale(self):
+        """Écritures appliquées hors du suivi (rejeu du WAL) : recalcul au prochain passage du checkpointer"""
+        with self._lock:
+            self._changed = None
+
+    def reset(self):
+        """Table supprimée : oublier ses statistiques"""
+        with self._lock:
+            self._stats = None
+            self._values = {}
+            self._loaded = True
+            self._changed = 0
+            self._unsaved = False
+            if self.path.exists():
+                self.path.unlink()
+
+    def save(self):
+        """Persister les statistiques, une fois les écritures de la table sur disque"""
+        with self._lock:
+            if not self._unsaved or self._stats is None or self.storage.dirty:
+                return
+            self.path.parent.mkdir(exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            saved = self._stats.dump()
+            saved["values"] = {name: list(values) for name, values in self._values.items()}
+            with open(tmp_path, "w") as f:
+                json.dump(saved, f)
+            os.replace(tmp_path, self.path)
+            self._unsaved = False
+
+    # --- Maintenance (appelée par LoggedTableStorage sous le verrou du WAL) ---
+
+    def _count(self, written):
+        if self._changed is not None:
+            self._changed += written
+        self._unsaved = True
+
+    def on_insert(self, rows):
+        with self._lock:
+            stats = self.get()
+            self._count(len(rows))
+            if stats is None:
+                return
+            columns = {}
+            for name, column in self.table_def.columns.items():
+                col = stats.columns[name]
+                values = [value for value in (row.get(name) for row in rows) if value is not None]
+                low, high = self._bounds(col, column.type, values)
+                if name in self.table_def.unique:
+                    # Une valeur distincte de plus par ligne
+                    distinct = col.distinct + len(values)
+                else:
+                    distinct = self._track(name, values)
+                    if distinct is None:
+                        distinct = col.distinct + round(len(values) * col.distinct / max(stats.row_count, 1))
+                columns[name] = ColumnStatistics(distinct, col.nulls + len(rows) - len(values), low, high)
+            self._stats = TableStatistics(stats.row_count + len(rows), columns)
+
+    def on_update(self, rows):
+        with self._lock:
+            stats = self.get()
+            self._count(len(rows))
+            if stats is None:
+                return
+            columns = dict(stats.columns)
+            for name, column in self.table_def.columns.items():
+                col = columns[name]
+                values = [value for value in (row.get(name) for row in rows) if value is not None]
+                low, high = self._bounds(col, column.type, values)
+                distinct = None if name in self.table_def.unique else self._track(name, values)
+                columns[name] = ColumnStatistics(col.distinct if distinct is None else distinct, col.nulls, low, high)
+            self._stats = TableStatistics(stats.row_count, columns)
+
+    def on_delete(self, count):
+        with self._lock:
+            stats = self.get()
+            self._count(count)
+            if stats is None:
+                return
+            row_count = max(0, stats.row_count - count)
+            # Lignes supprimées supposées représentatives : NULL et valeurs distinctes au prorata
+            kept = row_count / stats.row_count if stats.row_count else 0
+            columns = {}
+            for name, col in stats.columns.items():
+                nulls = round(col.nulls * kept)
+                distinct = round(col.distinct * kept) if name in self.table_def.unique else min(col.distinct, row_count - nulls)
+                columns[name] = ColumnStatistics(distinct, nulls, col.min, col.max)
+            self._stats = TableStatistics(row_count, columns)
+
+    def _track(self, name, values):
+        """Ajouter des valeurs à celles gardées d'une colonne : leur nombre, ou None si elles ne sont
+        pas (ou plus) gardées. Les valeurs des lignes supprimées restent : une surestimation."""
+        tracked = self._values.get(name)
+        if tracked is None:
+            return None
+        tracked.update(values)
+        if len(tracked) > DISTINCT_TRACKED:
+            del self._values[name]
+        return len(tracked)
+
+    @staticmethod
+    def _bounds(col, col_type, values):
+        """Bornes élargies aux nouvelles valeurs (jamais resserrées avant le prochain calcul)"""
+        keys = [key for key in (index_key(col_type, value) for value in values) if key is not None]
+        if col.min is not None:
+            keys += [col.min, col.max]
+        return (min(keys), max(keys)) if keys else (None, None)
@@ -0,0 +1,820 @@
+# sgbdr/storage.py
+import json
+import os
+import struct
+from array import array
+from datetime import date
+from itertools import groupby
+from .file_map import map_file
+from .json_stream import iter_array, write_array
+
+# Taille fixe d'une page du heap file
+PAGE_SIZE = 8192
+# En-tête de page : nombre de slots, début de la zone des enregistrements
+PAGE_HEADER = struct.Struct("<HH")
+# Entrée du répertoire de slots : offset, longueur (longueur 0 = slot libre)
+SLOT = struct.Struct("<HH")
+# Plus gros enregistrement stockable dans une page vide
+MAX_RECORD_SIZE = PAGE_SIZE - PAGE_HEADER.size - SLOT.size
+
+
+def make_rid(page_no, slot):
+    """Construire un identifiant de ligne (row ID) à partir d'une page et d'un slot"""
+    return (page_no << 16) | slot
+
+
+def split_rid(rid):
+    """Décomposer un row ID en (page, slot)"""
+    return rid >> 16, rid & 0xFFFF
+
+
+def encode_row(row):
+    return json.dumps(row, separators=(",", ":")).encode("utf-8")
+
+
+def decode_row(record):
+    return json.loads(record)
+
+
+class SlottedPage:
+    """Page slottée : en-tête, répertoire de slots, enregistrements empilés depuis la fin"""
+
+    def __init__(self, data=None):
+        if data is None or len(data) < PAGE_SIZE:
+            self.data = bytearray(PAGE_SIZE)
+            PAGE_HEADER.pack_into(self.data, 0, 0, PAGE_SIZE)
+        else:
+            self.data = bytearray(data)
+
+    @classmethod
+    def view(cls, data):
+        """Page en lecture seule sur data (tranche memoryview d'un fichier projeté), sans copie"""
+        page = cls.__new__(cls)
+        page.data = data
+        return page
+
+    def _header(self):
+        return PAGE_HEADER.unpack_from(self.data, 0)
+
+    def _slot(self, slot):
+        return SLOT.unpack_from(self.data, PAGE_HEADER.size + slot * SLOT.size)
+
+    def _set_slot(self, slot, offset, length):
+        SLOT.pack_into(self.data, PAGE_HEADER.size + slot * SLOT.size, offset, length)
+
+    def slot_count(self):
+        return self._header()[0]
+
+    def _used_bytes(self):
+        return sum(self._slot(i)[1] for i in range(self.slot_count()))
+
+    def free_space(self):
+        """Octets libres après compaction (répertoire de slots déduit)"""
+        slot_count = self.slot_count()
+        return PAGE_SIZE - PAGE_HEADER.size - slot_count * SLOT.size - self._used_bytes()
+
+    def get(self, slot):
+        if slot >= self.slot_count():
+            return None
+        offset, length = self._slot(slot)
+        if length == 0:
+            return None
+        return bytes(self.data[offset:offset + length])
+
+    def records(self):
+        """Itérer sur les (slot, enregistrement) vivants de la page"""
+        for slot in range(self.slot_count()):
+            offset, length = self._slot(slot)
+            if length:
+                yield slot, bytes(self.data[offset:offset + length])
+
+    def delete(self, slot):
+        if slot < self.slot_count():
+            self._set_slot(slot, 0, 0)
+
+    def _compact(self, slot_count):
+        """Réécrire les enregistrements vivants de façon contiguë en fin de page"""
+        live = list(self.records())
+        self.data[:] = bytes(PAGE_SIZE)
+        free_end = PAGE_SIZE
+        for slot, record in live:
+            free_end -= len(record)
+            self.data[free_end:free_end + len(record)] = record
+            self._set_slot(slot, free_end, len(record))
+        PAGE_HEADER.pack_into(self.data, 0, slot_count, free_end)
+
+    def put(self, slot, record):
+        """Écrire un enregistrement dans un slot donné. Retourne False si la page est pleine"""
+        slot_count, free_end = self._header()
+        new_count = max(slot_count, slot + 1)
+        old_length = self._slot(slot)[1] if slot < slot_count else 0
+        needed = PAGE_HEADER.size + new_count * SLOT.size + self._used_bytes() - old_length + len(record)
+        if needed > PAGE_SIZE:
+            return False
+
+        if slot < slot_count:
+            self._set_slot(slot, 0, 0)
+        directory_end = PAGE_HEADER.size + new_count * SLOT.size
+        if free_end - len(record) < directory_end:
+            self._compact(new_count)
+            free_end = self._header()[1]
+        for i in range(slot_count, new_count):
+            self._set_slot(i, 0, 0)
+
+        offset = free_end - len(record)
+        self.data[offset:free_end] = record
+        self._set_slot(slot, offset, len(record))
+        PAGE_HEADER.pack_into(self.data, 0, new_count, offset)
+        return True
+
+    def insert(self, record):
+        """Insérer dans le premier slot libre. Retourne le slot ou None si la page est pleine"""
+        slot_count = self.slot_count()
+        slot = next((i for i in range(slot_count) if self._slot(i)[1] == 0), slot_count)
+        if slot > 0xFFFF:
+            return None
+        return slot if self.put(slot, record) else None
+
+
+class TableStorage:
+    """Interface commune des moteurs de stockage d'une table"""
+    engine = None
+    # Faux si une suppression décale les row IDs des lignes suivantes
+    stable_rids = True
+
+    def __init__(self, db_dir, table_name):
+        self.db_dir = db_dir
+        self.table_name = table_name
+        # En mode différé, les écritures restent en mémoire jusqu'au prochain flush (checkpoint du WAL)
+        self.deferred = False
+
+    def files(self):
+        """Fichiers physiques de la table (export, sauvegardes)"""
+        return [self.path]
+
+    def exists(self):
+        return self.path.exists()
+
+    def drop(self):
+        for path in self.files():
+            if path.exists():
+                path.unlink()
+
+    def read_all(self):
+        return [row for _, row in self.scan()]
+
+    def fetch(self, rid):
+        for current_rid, row in self.scan():
+            if current_rid == rid:
+                return row
+        return None
+
+    def fetch_many(self, rids):
+        """Lignes de plusieurs row IDs, dans l'ordre des row IDs"""
+        wanted = set(rids)
+        return [row for rid, row in self.scan() if rid in wanted]
+
+    def fetch_map(self, rids):
+        """{row ID: ligne} pour plusieurs row IDs (les row IDs absents sont ignorés)"""
+        wanted = set(rids)
+        return {rid: row for rid, row in self.scan() if rid in wanted}
+
+    def update(self, rid, row):
+        """Mettre à jour une ligne. Retourne son row ID (il peut changer)"""
+        return self.update_many({rid: row})[rid]
+
+    def delete(self, rid):
+        self.delete_many([rid])
+
+    @property
+    def dirty(self):
+        """Vrai si des écritures différées n'ont pas encore été écrites sur disque"""
+        return False
+
+    def flush(self, doublewrite=None):
+        """Écrire sur disque les écritures différées"""
+
+    def create(self):
+        raise NotImplementedError
+
+    def put(self, rid, row):
+        """Écrire une ligne à un row ID précis (rejeu du WAL)"""
+        raise NotImplementedError
+
+    def put_many(self, items):
+        """Écrire des (row ID, ligne) dans l'ordre (rejeu du WAL)"""
+        for rid, row in items:
+            self.put(rid, row)
+
+    def restore(self, items):
+        """Remettre des lignes supprimées à leurs row IDs, (row ID, ligne) triés (annulation d'une transaction)"""
+        self.put_many(items)
+
+    def scan(self):
+        """Itérer sur les (row ID, ligne) de la table"""
+        raise NotImplementedError
+
+    def insert(self, row):
+        raise NotImplementedError
+
+    def insert_many(self, rows):
+        """Insérer un lot de lignes. Retourne leurs row IDs"""
+        return [self.insert(row) for row in rows]
+
+    def update_many(self, changes):
+        """Appliquer {row ID: nouvelle ligne}. Retourne {ancien row ID: nouveau row ID}"""
+        raise NotImplementedError
+
+    def delete_many(self, rids):
+        raise NotImplementedError
+
+    def write_all(self, rows):
+        """Remplacer tout le contenu de la table"""
+        raise NotImplementedError
+
+
+class JsonTableStorage(TableStorage):
+    """Moteur historique : la table entière est un tableau JSON (row ID = position).
+
+    Les lectures décodent le fichier en flux, ligne par ligne ; une suppression sur une table qui
+    n'est pas chargée en mémoire est seulement notée (positions dans le fichier) et appliquée au
+    fil des lectures, puis à la réécriture en flux du prochain flush.
+    """
+    engine = "json"
+    stable_rids = False
+
+    def __init__(self, db_dir, table_name):
+        super().__init__(db_dir, table_name)
+        self.path = db_dir / f"{table_name}.json"
+        self._rows = None
+        # Positions (triées) des lignes du fichier supprimées, pas encore réécrites
+        self._deleted = []
+
+    def _stored_rows(self):
+        """Lignes du fichier, décodées au fil de l'itération"""
+        return iter_array(self.path)
+
+    def _live_rows(self):
+        """Lignes de la table sans les suppressions en attente, au fil de l'itération"""
+        return self._without_deleted(self._stored_rows())
+
+    def _without_deleted(self, rows):
+        if not self._deleted:
+            return rows
+        deleted = set(self._deleted)
+        return (row for position, row in enumerate(rows) if position not in deleted)
+
+    def _file_positions(self, rids):
+        """Row IDs (positions parmi les lignes restantes) -> positions dans le fichier"""
+        positions = []
+        skipped = 0
+        for rid in sorted(rids):
+            while skipped < len(self._deleted) and self._deleted[skipped] <= rid + skipped:
+                skipped += 1
+            positions.append(rid + skipped)
+        return positions
+
+    def _load(self):
+        if self._rows is not None:
+            # Copie : les appelants modifient les lignes avant de valider les contraintes
+            return [dict(row) for row in self._rows]
+        return list(self._live_rows())
+
+    def _dump(self, rows):
+        # rows est la table entière : les suppressions en attente y sont déjà appliquées
+        self._deleted = []
+        if self.deferred:
+            self._rows = rows
+        else:
+            self._write(rows)
+
+    def _write(self, rows):
+        """Réécrire le fichier de façon atomique, en flux (fichier temporaire puis os.replace)"""
+        write_array(self.path, rows)
+
+    @property
+    def dirty(self):
+        return self._rows is not None or bool(self._deleted)
+
+    def flush(self, doublewrite=None):
+        if self._rows is not None:
+            self._write(self._rows)
+            self._rows = None
+        elif self._deleted:
+            self._write(self._live_rows())
+            self._deleted = []
+
+    def create(self):
+        self._deleted = []
+        self._write([])
+
+    def scan(self):
+        if self._rows is not None:
+            return enumerate(self._load())
+        return enumerate(self._live_rows())
+
+    def read_all(self):
+        return self._load()
+
+    def fetch(self, rid):
+        return next((row for current_rid, row in self.scan() if current_rid == rid), None) if rid >= 0 else None
+
+    def fetch_many(self, rids):
+        if self._rows is not None:
+            rows = self._load()
+            return [rows[rid] for rid in sorted(rids) if 0 <= rid < len(rows)]
+        wanted = set(rids)
+        last = max(wanted, default=-1)
+        # Parcours arrêté après le dernier row ID demandé
+        return [row for rid, row in zip(range(last + 1), self._live_rows()) if rid in wanted]
+
+    def insert(self, row):
+        rows = self._load()
+        rows.append(row)
+        self._dump(rows)
+        return len(rows) - 1
+
+    def insert_many(self, rows):
+        existing = self._load()
+        start = len(existing)
+        existing.extend(rows)
+        self._dump(existing)
+        return list(range(start, len(existing)))
+
+    def put(self, rid, row):
+        self.put_many([(rid, row)])
+
+    def put_many(self, items):
+        rows = self._load()
+        for rid, row in items:
+            if rid == len(rows):
+                rows.append(row)
+            elif rid < len(rows):
+                rows[rid] = row
+            else:
+                raise ValueError(f"Row ID {rid} hors de la table {self.table_name}")
+        self._dump(rows)
+
+    def update_many(self, changes):
+        if not changes:
+            return {}
+        rows = self._load()
+        for rid, row in changes.items():
+            rows[rid] = row
+        self._dump(rows)
+        return {rid: rid for rid in changes}
+
+    def restore(self, items):
+        # Row ID = position : réinsérées dans l'ordre croissant, les lignes retrouvent leur place
+        rows = self._load()
+        for rid, row in items:
+            rows.insert(rid, row)
+        self._dump(rows)
+
+    def delete_many(self, rids):
+        rids = set(rids)
+        if not rids:
+            return
+        if self._rows is not None:
+            self._rows = [row for rid, row in enumerate(self._rows) if rid not in rids]
+            return
+        # Table non chargée : rien n'est lu ici, le fichier est réécrit en flux au flush
+        self._deleted = sorted(set(self._deleted).union(self._file_positions(rids)))
+        if not self.deferred:
+            self.flush()
+
+    def write_all(self, rows):
+        self._rows = None
+        self._deleted = []
+        self._write(rows)
+
+
+class HeapTableStorage(TableStorage):
+    """Heap file de pages slottées avec free-space map : une écriture ne touche que sa page"""
+    engine = "heap"
+
+    def __init__(self, db_dir, table_name):
+        super().__init__(db_dir, table_name)
+        self.path = db_dir / f"{table_name}.heap"
+        self.fsm_path = db_dir / f"{table_name}.fsm"
+        self._fsm = None
+        self._dirty_pages = {}
+
+    def files(self):
+        return [self.path, self.fsm_path]
+
+    def create(self):
+        self.path.write_bytes(b"")
+        self.fsm_path.write_bytes(b"")
+        self._fsm = array("H")
+        self._dirty_pages = {}
+
+    def page_count(self):
+        page_count = self.path.stat().st_size // PAGE_SIZE
+        if self._dirty_pages:
+            page_count = max(page_count, max(self._dirty_pages) + 1)
+        return page_count
+
+    # --- Free-space map ---
+
+    def _load_fsm(self):
+        """Charger la free-space map, ou la reconstruire si elle est absente ou périmée"""
+        if self._fsm is not None:
+            return self._fsm
+        page_count = self.page_count()
+        fsm = array("H")
+        if self.fsm_path.exists():
+            fsm.frombytes(self.fsm_path.read_bytes())
+        if len(fsm) != page_count:
+            fsm = array("H", (self.read_page(n).free_space() for n in range(page_count)))
+            self.fsm_path.write_bytes(fsm.tobytes())
+        self._fsm = fsm
+        return fsm
+
+    def _set_free(self, page_no, free):
+        fsm = self._load_fsm()
+        if page_no > len(fsm):
+            # Page écrite au-delà de la fin (rejeu, table recréée) : les pages intermédiaires sont vides
+            fsm.extend([SlottedPage().free_space()] * (page_no - len(fsm)))
+            if not self.deferred:
+                self.fsm_path.write_bytes(fsm.tobytes())
+        if self.deferred:
+            # Persistée avec les pages au prochain flush
+            if page_no == len(fsm):
+                fsm.append(free)
+            else:
+                fsm[page_no] = free
+        elif page_no == len(fsm):
+            fsm.append(free)
+            with open(self.fsm_path, "ab") as f:
+                f.write(array("H", [free]).tobytes())
+        else:
+            fsm[page_no] = free
+            with open(self.fsm_path, "r+b") as f:
+                f.seek(page_no * fsm.itemsize)
+                f.write(array("H", [free]).tobytes())
+
+    def _find_page(self, needed):
+        """Trouver une page avec assez de place (dernière page d'abord), ou None"""
+        fsm = self._load_fsm()
+        if fsm and fsm[-1] >= needed:
+            return len(fsm) - 1
+        for page_no, free in enumerate(fsm):
+            if free >= needed:
+                return page_no
+        return None
+
+    # --- Pages ---
+
+    def read_page(self, page_no):
+        if page_no in self._dirty_pages:
+            return SlottedPage(self._dirty_pages[page_no].data)
+        with open(self.path, "rb") as f:
+            f.seek(page_no * PAGE_SIZE)
+            return SlottedPage(f.read(PAGE_SIZE))
+
+    def _page_view(self, data, page_no):
+        """Page à lire seulement : sale en mémoire, sinon tranche de la projection du fichier"""
+        page = self._dirty_pages.get(page_no)
+        if page is not None:
+            return page
+        view = data[page_no * PAGE_SIZE:(page_no + 1) * PAGE_SIZE]
+        # Page ajoutée au fichier après sa projection (checkpoint pendant le parcours) : lue normalement
+        return SlottedPage.view(view) if len(view) == PAGE_SIZE else self.read_page(page_no)
+
+    def write_page(self, page_no, page):
+        if self.deferred:
+            self._dirty_pages[page_no] = page
+        else:
+            with open(self.path, "r+b") as f:
+                f.seek(page_no * PAGE_SIZE)
+                f.write(page.data)
+        self._set_free(page_no, page.free_space())
+
+    @property
+    def dirty(self):
+        return bool(self._dirty_pages)
+
+    def flush(self, doublewrite=None):
+        """Écrire les pages sales en place. doublewrite(pages) les sauvegarde d'abord ailleurs"""
+        if not self._dirty_pages:
+            return
+        pages = sorted(self._dirty_pages.items())
+        if doublewrite:
+            doublewrite(pages)
+        with open(self.path, "r+b") as f:
+            for page_no, page in pages:
+                f.seek(page_no * PAGE_SIZE)
+                f.write(page.data)
+            f.flush()
+            os.fsync(f.fileno())
+        self.fsm_path.write_bytes(self._load_fsm().tobytes())
+        self._dirty_pages = {}
+
+    def _encode(self, row):
+        record = encode_row(row)
+        if len(record) > MAX_RECORD_SIZE:
+            raise ValueError(f"Ligne trop grande pour une page ({len(record)} > {MAX_RECORD_SIZE} octets)")
+        return record
+
+    # --- Opérations sur les lignes ---
+
+    def scan(self):
+        data = map_file(self.path)
+        for page_no in range(self.page_count()):
+            for slot, record in self._page_view(data, page_no).records():
+                yield make_rid(page_no, slot), decode_row(record)
+
+    def fetch(self, rid):
+        page_no, slot = split_rid(rid)
+        if page_no >= self.page_count():
+            return None
+        record = self._page_view(map_file(self.path), page_no).get(slot)
+        return decode_row(record) if record is not None else None
+
+    def fetch_many(self, rids):
+        """Lire chaque page concernée une seule fois"""
+        rows = []
+        page_count = self.page_count()
+        data = map_file(self.path)
+        for page_no, items in sorted(self._group_by_page(rids).items()):
+            if page_no >= page_count:
+                continue
+            page = self._page_view(data, page_no)
+            for slot, _ in sorted(items):
+                record = page.get(slot)
+                if record is not None:
+                    rows.append(decode_row(record))
+        return rows
+
+    def fetch_map(self, rids):
+        """Lire chaque page concernée une seule fois"""
+        rows = {}
+        page_count = self.page_count()
+        data = map_file(self.path)
+        for page_no, items in self._group_by_page(rids).items():
+            if page_no >= page_count:
+                continue
+            page = self._page_view(data, page_no)
+            for slot, rid in items:
+                record = page.get(slot)
+                if record is not None:
+                    rows[rid] = decode_row(record)
+        return rows
+
+    def _insert_record(self, record):
+        page_no = self._find_page(len(record) + SLOT.size)
+        if page_no is None:
+            page_no = len(self._load_fsm())
+            page = SlottedPage()
+        else:
+            page = self.read_page(page_no)
+        slot = page.insert(record)
+        if slot is None:
+            # FSM trop optimiste (répertoire de slots saturé) : nouvelle page
+            page_no = len(self._load_fsm())
+            page = SlottedPage()
+            slot = page.insert(record)
+        self.write_page(page_no, page)
+        return make_rid(page_no, slot)
+
+    def insert(self, row):
+        return self._insert_record(self._encode(row))
+
+    def put(self, rid, row):
+        page_no, slot = split_rid(rid)
+        page = self.read_page(page_no) if page_no < self.page_count() else SlottedPage()
+        if not page.put(slot, self._encode(row)):
+            raise ValueError(f"Page {page_no} pleine pour le row ID {rid} de {self.table_name}")
+        self.write_page(page_no, page)
+
+    def update_many(self, changes):
+        moved = {}
+        relocated = []
+        for page_no, items in self._group_by_page(changes).items():
+            page = self.read_page(page_no)
+            for slot, rid in items:
+                record = self._encode(changes[rid])
+                if page.put(slot, record):
+                    moved[rid] = rid
+                else:
+                    # Plus de place dans la page : la ligne déménage
+                    page.delete(slot)
+                    relocated.append((rid, record))
+            self.write_page(page_no, page)
+        for rid, record in relocated:
+            moved[rid] = self._insert_record(record)
+        return moved
+
+    def delete_many(self, rids):
+        for page_no, items in self._group_by_page(rids).items():
+            page = self.read_page(page_no)
+            for slot, _ in items:
+                page.delete(slot)
+            self.write_page(page_no, page)
+
+    def write_all(self, rows):
+        tmp_path = self.path.with_suffix(".heap.tmp")
+        fsm = array("H")
+        page = SlottedPage()
+        with open(tmp_path, "wb") as f:
+            for row in rows:
+                record = self._encode(row)
+                if page.insert(record) is None:
+                    f.write(page.data)
+                    fsm.append(page.free_space())
+                    page = SlottedPage()
+                    page.insert(record)
+            if page.slot_count():
+                f.write(page.data)
+                fsm.append(page.free_space())
+        os.replace(tmp_path, self.path)
+        self.fsm_path.write_bytes(fsm.tobytes())
+        self._fsm = fsm
+        self._dirty_pages = {}
+
+    @staticmethod
+    def _group_by_page(rids):
+        """Regrouper des row IDs par page pour ne lire/écrire chaque page qu'une fois"""
+        pages = {}
+        for rid in rids:
+            page_no, slot = split_rid(rid)
+            pages.setdefault(page_no, []).append((slot, rid))
+        return pages
+
+
+# --- Stockage en colonnes ---
+
+def _exactly(kind):
+    """Valeur stockée -> élément de tableau, seulement si elle est exactement de ce type (pas de bool pour int)"""
+    def parse(value):
+        if type(value) is not kind:
+            raise TypeError(value)
+        return value
+    return parse
+
+
+# Encodages typés essayés dans l'ordre : (nom, typecode, valeur stockée -> élément, élément -> valeur stockée)
+TYPED_ENCODINGS = (
+    ("int", "q", _exactly(int), int),
+    ("date", "i", lambda value: date.fromisoformat(value).toordinal(), lambda day: date.fromordinal(day).isoformat()),
+    ("float", "d", _exactly(float), float),
+)
+
+
+def _codes_array(count):
+    """Tableau d'entiers non signés assez large pour count codes distincts"""
+    for typecode in ("B", "H", "I"):
+        if count <= 256 ** array(typecode).itemsize:
+            return array(typecode)
+    return array("Q")
+
+
+def _encode_column(values):
+    """En-tête et tableaux d'une colonne, avec le premier encodage sans perte :
+    RLE (booléens), entiers, dates (numéro de jour), flottants, sinon dictionnaire"""
+    if all(value is None or type(value) is bool for value in values):
+        dictionary = list(dict.fromkeys(values))
+        codes, lengths = _codes_array(len(dictionary)), array("I")
+        for value, run in groupby(values):
+            codes.append(dictionary.index(value))
+            lengths.append(sum(1 for _ in run))
+        return {"encoding": "rle", "dictionary": dictionary}, [codes, lengths]
+
+    nulls = array("I", (i for i, value in enumerate(values) if value is None))
+    for name, typecode, parse, render in TYPED_ENCODINGS:
+        try:
+            # NULL : 1 dans le tableau (valeur valide pour chaque encodage), remis à null à la lecture
+            data = array(typecode, (1 if value is None else parse(value) for value in values))
+        except (ValueError, TypeError, OverflowError):
+            continue
+        # Sans perte seulement si chaque valeur revient à l'identique (date non ISO, entier hors 64 bits...)
+        if all(value is None or render(item) == value for item, value in zip(data, values)):
+            return {"encoding": name}, [data, nulls]
+
+    dictionary = list(dict.fromkeys(values))
+    positions = {value: code for code, value in enumerate(dictionary)}
+    codes = _codes_array(len(dictionary))
+    codes.extend(positions[value] for value in values)
+    return {"encoding": "dict", "dictionary": dictionary}, [codes]
+
+
+def _decode_column(header, arrays):
+    """Valeurs stockées d'une colonne (tableaux typés ou memoryview, lus d'un bloc par tolist)"""
+    encoding = header["encoding"]
+    if encoding == "rle":
+        dictionary = header["dictionary"]
+        values = []
+        for code, length in zip(*(data.tolist() for data in arrays)):
+            values.extend([dictionary[code]] * length)
+        return values
+    if encoding == "dict":
+        dictionary = header["dictionary"]
+        return [dictionary[code] for code in arrays[0].tolist()]
+    render = next(render for name, _, _, render in TYPED_ENCODINGS if name == encoding)
+    if encoding == "date":
+        # Peu de jours distincts : chaque numéro de jour n'est converti qu'une fois
+        days = {}
+        values = [days[day] if day in days else days.setdefault(day, render(day)) for day in arrays[0].tolist()]
+    else:
+        # tolist() rend déjà des int (q) ou des float (d)
+        values = arrays[0].tolist()
+    for i in arrays[1].tolist():
+        values[i] = None
+    return values
+
+
+class ColumnarTableStorage(JsonTableStorage):
+    """Une table en colonnes : un fichier de tableau typé par colonne, décrit par un manifeste.
+
+    Même modèle de lignes que le moteur JSON (row ID = position, réécriture complète à chaque
+    flush) ; en échange, une lecture peut ne décoder que les colonnes dont elle a besoin.
+    """
+    engine = "columnar"
+
+    def __init__(self, db_dir, table_name):
+        super().__init__(db_dir, table_name)
+        self.path = db_dir / f"{table_name}.cols"
+
+    def _column_path(self, version, position):
+        return self.db_dir / f"{self.table_name}.{version}.{position}.col"
+
+    def _manifest(self):
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def files(self):
+        if not self.path.exists():
+            return [self.path]
+        manifest = self._manifest()
+        return [self.path] + [self._column_path(manifest["version"], i) for i in range(len(manifest["columns"]))]
+
+    def drop(self):
+        super().drop()
+        for path in self.db_dir.glob(f"{self.table_name}.*.col"):
+            path.unlink()
+
+    def _read_column(self, manifest, position):
+        data = map_file(self._column_path(manifest["version"], position))
+        header_end = data.obj.find(b"\n") + 1
+        header = json.loads(data[:header_end].tobytes())
+        # Tableaux lus en place dans la projection (memoryview typé), sans copie avant le décodage
+        arrays = []
+        offset = header_end
+        for typecode, length in header["arrays"]:
+            size = length * array(typecode).itemsize
+            arrays.append(data[offset:offset + size].cast(typecode))
+            offset += size
+        return _decode_column(header, arrays)
+
+    def _write(self, rows):
+        """Écrire les fichiers de colonnes d'une nouvelle version, puis basculer le manifeste (os.replace)"""
+        rows = list(rows)
+        previous = self._manifest()["version"] if self.path.exists() else 0
+        version = previous + 1
+        columns = list(rows[0]) if rows else []
+        for position, column in enumerate(columns):
+            header, arrays = _encode_column([row.get(column) for row in rows])
+            header["arrays"] = [[data.typecode, len(data)] for data in arrays]
+            with open(self._column_path(version, position), "wb") as f:
+                f.write(json.dumps(header).encode("utf-8") + b"\n")
+                for data in arrays:
+                    f.write(data.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        tmp_path = self.path.with_suffix(".cols.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"version": version, "rows": len(rows), "columns": columns}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        # Fichiers des versions précédentes (et restes d'une écriture interrompue)
+        current = {self._column_path(version, i) for i in range(len(columns))}
+        for path in self.db_dir.glob(f"{self.table_name}.*.col"):
+            if path not in current:
+                path.unlink()
+
+    def _stored_rows(self):
+        manifest = self._manifest()
+        columns = manifest["columns"]
+        data = [self._read_column(manifest, i) for i in range(len(columns))]
+        return (dict(zip(columns, values)) for values in zip(*data))
+
+    def scan_columns(self, columns):
+        """Lignes réduites aux colonnes demandées (projection) : seuls leurs fichiers sont lus"""
+        if self._rows is not None:
+            return [{column: row[column] for column in columns if column in row} for row in self._rows]
+        manifest = self._manifest()
+        wanted = [(i, column) for i, column in enumerate(manifest["columns"]) if column in columns]
+        if not wanted:
+            return list(self._without_deleted({} for _ in range(manifest["rows"])))
+        names = [column for _, column in wanted]
+        data = [self._read_column(manifest, i) for i, _ in wanted]
+        return list(self._without_deleted(dict(zip(names, values)) for values in zip(*data)))
+
+
+STORAGE_ENGINES = {
+    JsonTableStorage.engine: JsonTableStorage,
+    HeapTableStorage.engine: HeapTableStorage,
+    ColumnarTableStorage.engine: ColumnarTableStorage,
+}
@@ -0,0 +1,123 @@
+# sgbdr/storage_manager.py
+from .buffer_cache import BUFFER_CACHE
+from .index import TableIndexes
+from .statistics import StatisticsTracker
+from .storage import STORAGE_ENGINES, JsonTableStorage
+from .wal_manager import LoggedTableStorage
+
+# Moteur utilisé pour les nouvelles tables
+DEFAULT_ENGINE = "heap"
+# Les tables sans clé "storage" dans metadata.json datent du format JSON historique
+LEGACY_ENGINE = JsonTableStorage.engine
+# Noms acceptés après STOCKAGE dans CRAFTER TABLEAU
+ENGINE_ALIASES = {"PAGES": "heap", "HEAP": "heap", "JSON": "json", "COLONNES": "columnar"}
+
+
+class StorageManager:
+    def __init__(self, db_path, sgbdr):
+        self.db_path = db_path
+        self.sgbdr = sgbdr
+        self._storages = {}
+
+    def set_sgbdr(self, sgbdr):
+        """Définir la référence à l'instance SGBDR"""
+        self.sgbdr = sgbdr
+
+    def resolve_engine(self, name):
+        """Traduire le nom donné après STOCKAGE en moteur interne"""
+        if name is None:
+            return DEFAULT_ENGINE
+        engine = ENGINE_ALIASES.get(name.upper())
+        if engine is None:
+            raise ValueError(f"Stockage {name} inconnu. Options : {', '.join(ENGINE_ALIASES)}")
+        return engine
+
+    def get_storage(self, table_name, db_name=None):
+        """Retourner le moteur de stockage d'une table de la base active (ou de db_name)"""
+        db_name = db_name or self.sgbdr.current_db
+        key = (db_name, table_name)
+        if key in self._storages:
+            return self._storages[key]
+
+        catalog = self.sgbdr.catalog_manager.get(db_name)
+        table_def = catalog.tables.get(table_name)
+        engine = table_def.storage if table_def else LEGACY_ENGINE
+        storage = self._open(db_name, table_name, engine, table_def, catalog.indexes_for(table_name))
+        if table_def:
+            self._storages[key] = storage
+        return storage
+
+    def _open(self, db_name, table_name, engine, table_def, index_defs=()):
+        """Ouvrir un moteur en écriture différée, journalisé dans le WAL de la base et indexé"""
+        storage = STORAGE_ENGINES[engine](self.db_path / db_name, table_name)
+        storage.deferred = True
+        indexes = TableIndexes(storage, table_def, index_defs)
+        return LoggedTableStorage(storage, self.sgbdr.wal_manager.wal_for(db_name), indexes,
+                                  StatisticsTracker(storage, table_def), self.sgbdr.transaction_manager)
+
+    def create_storage(self, table_name, engine):
+        """Créer les fichiers vides d'une nouvelle table"""
+        table_def = self.sgbdr.catalog_manager.get().table(table_name)
+        storage = self._open(self.sgbdr.current_db, table_name, engine, table_def)
+        storage.create()
+        self._storages[(self.sgbdr.current_db, table_name)] = storage
+        return storage
+
+    def drop_storage(self, table_name, db_name=None):
+        """Supprimer les fichiers d'une table"""
+        db_name = db_name or self.sgbdr.current_db
+        self.get_storage(table_name, db_name).drop()
+        self._storages.pop((db_name, table_name), None)
+
+    def open_storages(self, db_name):
+        """Moteurs (non journalisés) actuellement ouverts pour une base"""
+        return [storage.storage for (db, _), storage in list(self._storages.items()) if db == db_name]
+
+    def define_indexes(self, table_name):
+        """Recharger la définition des index d'une table après CRAFTER/DEPOP INDEX"""
+        catalog = self.sgbdr.catalog_manager.get()
+        storage = self.get_storage(table_name)
+        storage.indexes.define(catalog.table(table_name), catalog.indexes_for(table_name))
+        return storage
+
+    def redefine(self, db_name, table_names):
+        """Reprendre du catalogue les définitions d'index de tables ouvertes (DDL annulée) : les index
+        sont reconstruits au prochain usage, les écritures en mémoire des tables sont gardées"""
+        catalog = self.sgbdr.catalog_manager.get(db_name)
+        for table_name in table_names:
+            storage = self._storages.get((db_name, table_name))
+            if storage is None:
+                continue
+            if table_name not in catalog.tables:
+                del self._storages[(db_name, table_name)]
+                continue
+            # Fichiers des index d'avant (dont ceux créés par la DDL annulée) supprimés
+            storage.indexes.reset()
+            storage.indexes.define(catalog.table(table_name), catalog.indexes_for(table_name))
+
+    def save_indexes(self, db_name):
+        """Persister les index et les statistiques des tables ouvertes d'une base (après un checkpoint)"""
+        for (db, _), storage in list(self._storages.items()):
+            if db == db_name:
+                storage.indexes.save()
+                storage.statistics.save()
+
+    def analyze(self, db_name, table_names=None):
+        """Recalculer par un parcours les statistiques de tables ouvertes d'une base : celles données
+        (ANALYSER TABLEAU), sinon celles qui ont trop dérivé (checkpointer)"""
+        for (db, table_name), storage in list(self._storages.items()):
+            if db != db_name or not storage.exists():
+                continue
+            if table_names is None and not storage.statistics.stale() or \
+                    table_names is not None and table_name not in table_names:
+                continue
+            storage.statistics.analyze(BUFFER_CACHE.scan(storage))
+            storage.statistics.save()
+
+    def invalidate(self, db_name=None):
+        """Oublier les moteurs ouverts (fichiers restaurés ou remplacés hors du moteur)"""
+        db_names = {db_name} if db_name is not None else {db for db, _ in self._storages}
+        for name in db_names:
+            BUFFER_CACHE.invalidate_database(self.db_path / name)
+        for key in [k for k in self._storages if k[0] in db_names]:
+            del self._storages[key]
@@ -1,5 +1,3 @@
-import json
-import re
 from pathlib import Path
 from datetime import datetime
 
@@ -12,14 +10,14 @@ class TableManager:
         """Définir la référence à l’instance SGBDR"""
         self.sgbdr = sgbdr
 
-    def create_table(self, table_name, columns):
+    def create_table(self, table_name, columns, storage=None):
+        """Créer une table à partir des définitions de colonnes (query_ast.ColumnSpec)"""
         self.sgbdr.user_manager.check_permission("write")
         if not self.sgbdr.current_db:
             raise ValueError("Aucune base sélectionnée.")
-        db_dir = self.db_path / self.sgbdr.current_db
+        engine = self.sgbdr.storage_manager.resolve_engine(storage)
 
-        with open(db_dir / "metadata.json", "r") as f:
-            metadata = json.load(f)
+        metadata = self.sgbdr.catalog_manager.get().metadata()
 
         if table_name in metadata["tables"]:
             raise ValueError(f"Table {table_name} existe déjà.")
@@ -30,48 +28,28 @@ class TableManager:
         unique_cols = set()
         not_null_cols = set()
 
-        for col in columns:
-            parts = col.split()
-            col_name = parts[0]
-            col_type = parts[1].upper()
-            constraints =  parts[2:]
-            constraints_upper = [c.upper() for c in constraints]
-
-            # Type + taille pour VARCHAR
-            if col_type.startswith("VARCHAR("):
-                try:
-                    size = int(col_type.split("(")[1].split(")")[0])
-                    col_type = "VARCHAR"
-                except:
-                    raise ValueError("VARCHAR(n) invalide")
-            else:
-                size = None
-
-            if col_type not in ("INT", "FLOAT", "TEXT", "DATE", "BOOLEAN", "VARCHAR"):
-                raise ValueError(f"Type {col_type} non supporté")
-
-            # Contrainte
-            if "PRIMARY" in constraints_upper and "KEY" in constraints_upper:
+        for column in columns:
+            col_name = column.name
+
+            # Contraintes
+            if column.primary_key:
                 if primary_key:
                     raise ValueError("Une seule PRIMARY KEY")
                 primary_key = col_name
                 unique_cols.add(col_name)
                 not_null_cols.add(col_name)
-            if "NOT" in constraints_upper and "NULL" in constraints_upper:
+            if column.not_null:
                 not_null_cols.add(col_name)
-            if "REFERENCES" in constraints_upper:
-                ref_index = constraints.index("REFERENCES")
-                ref = " ".join(constraints[ref_index:])
-                match = re.match(r"REFERENCES\s+(\w+)\((\w+)\)", ref)
-                if not match:
-                    raise ValueError("REFERENCES table(col)")
-                ref_table, ref_col = match.groups()
+            if column.unique:
+                unique_cols.add(col_name)
+            if column.references:
+                ref_table, ref_col = column.references
                 foreign_keys[col_name] = {"table": ref_table, "column": ref_col}
 
             parsed_columns[col_name] = {
-                "type": col_type,
-                "nullable": "NOT" not in constraints or "NULL" not in constraints,
-                "size": size if col_type == "VARCHAR" else None
+                "type": column.type,
+                "nullable": not column.not_null,
+                "size": column.size
             }
 
         if primary_key:
@@ -84,20 +62,20 @@ class TableManager:
                 "foreign_keys": foreign_keys,
                 "unique": list(unique_cols),
                 "not_null": list(not_null_cols)
-            }
+            },
+            "storage": engine
         }
 
-        with open(db_dir / "metadata.json", "w") as f:
-            json.dump(metadata, f, indent=2)
+        self.sgbdr.catalog_manager.save_metadata(metadata)
 
-        # Créer fichier vide
-        with open(db_dir / f"{table_name}.json", "w") as f:
-            json.dump([], f, indent=2)
+        # Créer les fichiers vides du moteur de stockage
+        self.sgbdr.storage_manager.create_storage(table_name, engine)
 
         print(f"╔════════════════════════════════════")
         print(f"║ Table {table_name} craftée !")
         print(f"║ Colonnes : {parsed_columns}")
         print(f"║ Contraintes : {metadata['tables'][table_name]['constraints']}")
+        print(f"║ Stockage : {engine}")
         print(f"╚════════════════════════════════════")
 
     def delete_table(self, table_name):
@@ -105,30 +83,29 @@ class TableManager:
         self.sgbdr.user_manager.check_permission("delete")
         if not self.sgbdr.current_db:
             raise ValueError("Aucune base sélectionnée. Faut d'abord switcher vers la base")
-        db_dir = self.db_path / self.sgbdr.current_db
-        
-        with open(db_dir / "metadata.json", "r+") as f:
-            metadata = json.load(f)
+        catalog = self.sgbdr.catalog_manager.get()
+        catalog.table(table_name)
             
-            if table_name not in metadata["tables"]:
-                raise ValueError(f"Table {table_name} introuvable. T’as raté la map ?")
-                
-            # Vérifier les références étrangères
-            for other_table, table_data in metadata["tables"].items():
-                if other_table != table_name:
-                    for col, fk in table_data.get("constraints", {}).get("foreign_keys", {}).items():
-                        if fk["table"] == table_name:
-                            raise ValueError(f"Table {table_name} est référencée par {other_table} ! Supprime les clés étrangères d'abord.")
+        # Vérifier les références étrangères
+        for other_table, table_def in catalog.tables.items():
+            if other_table != table_name:
+                for fk in table_def.foreign_keys.values():
+                    if fk.ref_table == table_name:
+                        raise ValueError(f"Table {table_name} est référencée par {other_table} ! Supprime les clés étrangères d'abord.")
+        
+        # Vider le WAL avant de supprimer les fichiers du moteur de stockage de la table. Dans une
+        # transaction, les autres tables gardent leurs écritures non validées en mémoire : seule la
+        # table supprimée est oubliée du journal
+        if not self.sgbdr.transaction_manager.in_progress(self.sgbdr.current_db):
+            self.sgbdr.wal_manager.checkpoint(self.sgbdr.current_db)
+        self.sgbdr.storage_manager.drop_storage(table_name)
             
-            # CORRECTION : Le fichier est toujours table_name.json
-            data_file = db_dir / f"{table_name}.json"
-            if data_file.exists():
-                data_file.unlink()
-                
-            del metadata["tables"][table_name]
-            f.seek(0)
-            json.dump(metadata, f, indent=2)
-            f.truncate()
+        metadata = catalog.metadata()
+        del metadata["tables"][table_name]
+        # Les index secondaires de la table disparaissent avec elle
+        for index in catalog.indexes_for(table_name):
+            del metadata["indexes"][index.name]
+        self.sgbdr.catalog_manager.save_metadata(metadata)
             
         print(f"╔════════════════════════════════════")
         print(f"║ Tableau {table_name} détruit")
@@ -139,10 +116,9 @@ class TableManager:
         self.sgbdr.user_manager.check_permission("read")
         if not self.sgbdr.current_db:
             raise ValueError("Aucune base sélectionnée. Faut d'abord switcher vers la base")
-        db_dir = self.db_path / self.sgbdr.current_db
-        with open(db_dir / "metadata.json", "r") as f:
-            metadata = json.load(f)
-            tables = [{"name": name, "columns": data["columns"], "constraints": data.get("constraints", {})} for name, data in metadata["tables"].items()]
+        catalog = self.sgbdr.catalog_manager.get()
+        tables = [{"name": name, "columns": table_def.column_info, "constraints": table_def.to_dict()["constraints"]}
+                  for name, table_def in catalog.tables.items()]
         print(f"╔════════════════════════════════════")
         print(f"║ Tables craftées dans {self.sgbdr.current_db} : {len(tables)} trouvées !")
         print(f"╚════════════════════════════════════")
@@ -154,31 +130,26 @@ class TableManager:
         if not self.sgbdr.current_db:
             raise ValueError("Aucune base sélectionnée.")
         
-        db_dir = self.db_path / self.sgbdr.current_db
+        metadata = self.sgbdr.catalog_manager.get().metadata()
         
-        with open(db_dir / "metadata.json", "r+") as f:
-            metadata = json.load(f)
-            
-            if view_name in metadata["tables"]:
-                raise ValueError(f"Une table ou vue nommée {view_name} existe déjà.")
-            
-            # Valider que la requête est un SELECT valide
-            if not query.upper().startswith("LOOT"):
-                raise ValueError("Une vue doit être basée sur une requête LOOT valide.")
-            
-            # Stocker la vue dans les métadonnées
-            if "views" not in metadata:
-                metadata["views"] = {}
-                
-            metadata["views"][view_name] = {
-                "query": query,
-                "created_by": self.sgbdr.current_user,
-                "created_at": datetime.now().isoformat()
-            }
+        if view_name in metadata["tables"]:
+            raise ValueError(f"Une table ou vue nommée {view_name} existe déjà.")
+        
+        # Valider que la requête est un SELECT valide (l'analyse reste en cache pour les exécutions)
+        if self.sgbdr.query_parser.parse_query(query).type not in ("select", "join_tables"):
+            raise ValueError("Une vue doit être basée sur une requête LOOT valide.")
+        
+        # Stocker la vue dans les métadonnées
+        if "views" not in metadata:
+            metadata["views"] = {}
             
-            f.seek(0)
-            json.dump(metadata, f, indent=2)
-            f.truncate()
+        metadata["views"][view_name] = {
+            "query": query,
+            "created_by": self.sgbdr.current_user,
+            "created_at": datetime.now().isoformat()
+        }
+        
+        self.sgbdr.catalog_manager.save_metadata(metadata)
         
         print(f"╔════════════════════════════════════")
         print(f"║ Vue {view_name} craftée !")
@@ -191,18 +162,12 @@ class TableManager:
         if not self.sgbdr.current_db:
             raise ValueError("Aucune base sélectionnée.")
         
-        db_dir = self.db_path / self.sgbdr.current_db
+        catalog = self.sgbdr.catalog_manager.get()
+        catalog.view(view_name)
         
-        with open(db_dir / "metadata.json", "r+") as f:
-            metadata = json.load(f)
-            
-            if "views" not in metadata or view_name not in metadata["views"]:
-                raise ValueError(f"Vue {view_name} introuvable.")
-            
-            del metadata["views"][view_name]
-            f.seek(0)
-            json.dump(metadata, f, indent=2)
-            f.truncate()
+        metadata = catalog.metadata()
+        del metadata["views"][view_name]
+        self.sgbdr.catalog_manager.save_metadata(metadata)
         
         print(f"╔════════════════════════════════════")
         print(f"║ Vue {view_name} supprimée !")
@@ -214,16 +179,75 @@ class TableManager:
         if not self.sgbdr.current_db:
             raise ValueError("Aucune base sélectionnée.")
         
-        db_dir = self.db_path / self.sgbdr.current_db
-        
-        with open(db_dir / "metadata.json", "r") as f:
-            metadata = json.load(f)
-            
-            views = metadata.get("views", {})
-            result = [{"name": name, "query": data["query"], "created_by": data.get("created_by", "inconnu")} 
-                    for name, data in views.items()]
+        views = self.sgbdr.catalog_manager.get().views
+        result = [{"name": name, "query": view.query, "created_by": view.created_by or "inconnu"}
+                  for name, view in views.items()]
         
         print(f"╔════════════════════════════════════")
         print(f"║ Vues craftées dans {self.sgbdr.current_db} : {len(result)} trouvées !")
         print(f"╚════════════════════════════════════")
-        return result
\ No newline at end of file
+        return result
+
+    def create_index(self, index_name, table_name, column):
+        """Créer un index secondaire B+tree sur une colonne"""
+        self.sgbdr.user_manager.check_permission("write")
+        if not self.sgbdr.current_db:
+            raise ValueError("Aucune base sélectionnée.")
+        
+        catalog = self.sgbdr.catalog_manager.get()
+        if catalog.has_index(index_name):
+            raise ValueError(f"Index {index_name} existe déjà.")
+        catalog.table(table_name).column(column)
+        
+        metadata = catalog.metadata()
+        metadata.setdefault("indexes", {})[index_name] = {
+            "table": table_name,
+            "column": column,
+            "created_by": self.sgbdr.current_user,
+            "created_at": datetime.now().isoformat()
+        }
+        self.sgbdr.catalog_manager.save_metadata(metadata)
+        
+        # Construire l'index tout de suite plutôt qu'au premier LOOT
+        storage = self.sgbdr.storage_manager.define_indexes(table_name)
+        entries = sum(len(index.tree) for index in storage.indexes.btrees() if index.name == index_name)
+        
+        print(f"╔════════════════════════════════════")
+        print(f"║ Index {index_name} crafté sur {table_name}({column}) !")
+        print(f"║ Entrées : {entries}")
+        print(f"╚════════════════════════════════════")
+
+    def delete_index(self, index_name):
+        """Supprimer un index secondaire"""
+        self.sgbdr.user_manager.check_permission("write")
+        if not self.sgbdr.current_db:
+            raise ValueError("Aucune base sélectionnée.")
+        
+        catalog = self.sgbdr.catalog_manager.get()
+        index = catalog.index(index_name)
+        
+        metadata = catalog.metadata()
+        del metadata["indexes"][index_name]
+        self.sgbdr.catalog_manager.save_metadata(metadata)
+        
+        storage = self.sgbdr.storage_manager.define_indexes(index.table)
+        storage.indexes.drop_btree(index_name)
+        
+        print(f"╔════════════════════════════════════")
+        print(f"║ Index {index_name} supprimé !")
+        print(f"╚════════════════════════════════════")
+
+    def list_indexes(self):
+        """Lister les index secondaires de la base"""
+        self.sgbdr.user_manager.check_permission("read")
+        if not self.sgbdr.current_db:
+            raise ValueError("Aucune base sélectionnée.")
+        
+        indexes = self.sgbdr.catalog_manager.get().indexes
+        result = [{"name": name, "table": index.table, "column": index.column}
+                  for name, index in indexes.items()]
+        
+        print(f"╔════════════════════════════════════")
+        print(f"║ Index craftés dans {self.sgbdr.current_db} : {len(result)} trouvés !")
+        print(f"╚════════════════════════════════════")
+        return result
@@ -1,17 +1,19 @@
-import json
-from pathlib import Path
-import shutil
-import tempfile
-
 class TransactionManager:
+    """Transactions par journal d'annulation : DEBUT ne copie rien ; chaque écriture d'une transaction
+    note au passage comment la défaire (lignes d'avant, catalogue d'avant) et ANNULER rejoue ces
+    notes à l'envers, pour un coût proportionnel au travail de la transaction.
+
+    Les écritures d'une transaction restent dans les moteurs en écriture différée (lues avec le
+    disque) et hors du journal durable : VALIDER écrit chaque table modifiée une seule fois."""
+
     def __init__(self, db_path, sgbdr):
         self.db_path = db_path
         self.sgbdr = sgbdr
         self.transaction_stack = []
         self.in_transaction = False
-        self.backup_base = Path(tempfile.gettempdir()) / "sgbdr_transactions"
-        self.backup_base.mkdir(exist_ok=True)
-        
+        # Vrai pendant une annulation : ses propres écritures ne sont pas notées
+        self._undoing = False
+
     def set_sgbdr(self, sgbdr):
         """Définir la référence à l'instance SGBDR"""
         self.sgbdr = sgbdr
@@ -24,14 +26,11 @@ class TransactionManager:
             raise ValueError("Aucune base sélectionnée pour la transaction !")
         
         transaction_id = f"tx_{len(self.transaction_stack)}_{id(self)}"
-        backup_dir = self.backup_base / transaction_id
-        
-        # Sauvegarder l'état actuel de la base
-        self._backup_current_state(backup_dir)
         
+        # Rien n'est sauvegardé ici : les écritures rempliront le journal d'annulation
         self.transaction_stack.append({
             "id": transaction_id,
-            "backup_dir": backup_dir,
+            "undo": [],
             "database": self.sgbdr.current_db
         })
         
@@ -46,12 +45,22 @@ class TransactionManager:
             raise ValueError("Aucune transaction en cours !")
         
         transaction = self.transaction_stack.pop()
-        # Nettoyer la sauvegarde
-        shutil.rmtree(transaction["backup_dir"], ignore_errors=True)
+        # Transaction imbriquée : ses écritures restent à annuler si la transaction englobante l'est
+        outer = self._innermost(transaction["database"])
+        written = None
+        if outer is not None:
+            outer["undo"].extend(transaction["undo"])
+        else:
+            # Transaction la plus externe : journal rendu durable en un lot, puis chaque table modifiée
+            # écrite une seule fois (remplacement atomique ou pages protégées par le doublewrite)
+            written = {table_name for _, table_name, _ in transaction["undo"] if table_name}
+            self.sgbdr.wal_manager.checkpoint(transaction["database"])
         
         self.in_transaction = len(self.transaction_stack) > 0
         print(f"╔════════════════════════════════════")
         print(f"║ Transaction {transaction['id']} validée !")
+        if written is not None:
+            print(f"║ {len(written)} table(s) écrite(s) sur disque.")
         print(f"╚════════════════════════════════════")
 
     def rollback(self):
@@ -60,50 +69,79 @@ class TransactionManager:
             raise ValueError("Aucune transaction en cours !")
         
         transaction = self.transaction_stack.pop()
-        
-        # Restaurer l'état précédent seulement si c'est la bonne base
-        if self.sgbdr.current_db == transaction["database"]:
-            self._restore_backup_state(transaction["backup_dir"])
-            print(f"╔════════════════════════════════════")
-            print(f"║ Transaction {transaction['id']} annulée !")
-            print(f"║ Base {self.sgbdr.current_db} restaurée.")
-            print(f"╚════════════════════════════════════")
-        else:
-            # Nettoyer seulement la sauvegarde
-            shutil.rmtree(transaction["backup_dir"], ignore_errors=True)
-            print(f"╔════════════════════════════════════")
-            print(f"║ Transaction {transaction['id']} annulée !")
-            print(f"║ Note : Base différente, restauration ignorée.")
-            print(f"╚════════════════════════════════════")
-        
         self.in_transaction = len(self.transaction_stack) > 0
-
-    def _backup_current_state(self, backup_dir):
-        """Sauvegarder l'état actuel de la base"""
-        if backup_dir.exists():
-            shutil.rmtree(backup_dir)
-        backup_dir.mkdir(parents=True)
         
-        current_db_dir = self.db_path / self.sgbdr.current_db
-        if not current_db_dir.exists():
-            return
-            
-        # Copier tous les fichiers JSON de la base
-        for json_file in current_db_dir.glob("*.json"):
-            shutil.copy2(json_file, backup_dir / json_file.name)
+        # Défaire les écritures dans la base de la transaction, même si une autre est sélectionnée
+        undone = self._undo(transaction)
+        print(f"╔════════════════════════════════════")
+        print(f"║ Transaction {transaction['id']} annulée !")
+        print(f"║ Base {transaction['database']} restaurée ({undone} écritures défaites).")
+        print(f"╚════════════════════════════════════")
 
-    def _restore_backup_state(self, backup_dir):
-        """Restaurer l'état depuis la sauvegarde"""
-        if not backup_dir.exists():
-            raise ValueError("Sauvegarde de transaction introuvable !")
-        
-        current_db_dir = self.db_path / self.sgbdr.current_db
-        if not current_db_dir.exists():
-            current_db_dir.mkdir(parents=True)
-        
-        # Restaurer tous les fichiers de sauvegarde
-        for backup_file in backup_dir.glob("*.json"):
-            shutil.copy2(backup_file, current_db_dir / backup_file.name)
+    # --- Journal d'annulation ---
+
+    def _innermost(self, db_name):
+        """Transaction en cours la plus interne sur db_name, ou None"""
+        return next((tx for tx in reversed(self.transaction_stack) if tx["database"] == db_name), None)
+
+    def in_progress(self, db_name):
+        """Une transaction est-elle ouverte sur db_name ?"""
+        return self._innermost(db_name) is not None
+
+    def undo_log(self, db_name):
+        """Journal d'annulation où noter une écriture sur db_name, ou None hors transaction"""
+        if self._undoing or not self.transaction_stack:
+            return None
+        transaction = self._innermost(db_name)
+        return transaction["undo"] if transaction is not None else None
+
+    def record_metadata(self, db_name):
+        """Noter le catalogue actuel avant qu'une commande DDL le remplace"""
+        undo = self.undo_log(db_name)
+        if undo is not None:
+            undo.append(("metadata", None, self.sgbdr.catalog_manager.get(db_name).metadata()))
+
+    def _undo(self, transaction):
+        """Rejouer le journal d'annulation à l'envers. Retourne le nombre d'écritures défaites"""
+        db_name = transaction["database"]
+        storage_manager = self.sgbdr.storage_manager
+        self._undoing = True
+        try:
+            for op, table_name, payload in reversed(transaction["undo"]):
+                if op == "metadata":
+                    # Seules les tables dont la définition change sont reprises du catalogue restauré :
+                    # aucune table n'est écrite, les écritures encore en mémoire restent non validées
+                    current = self.sgbdr.catalog_manager.get(db_name).metadata()
+                    self.sgbdr.catalog_manager.save_metadata(payload, db_name)
+                    storage_manager.redefine(db_name, self._changed_tables(current, payload))
+                    continue
+                storage = storage_manager.get_storage(table_name, db_name)
+                if op == "create":
+                    storage_manager.drop_storage(table_name, db_name)
+                elif op == "drop":
+                    storage.create()
+                    storage.restore_rows(payload)
+                elif op == "insert":
+                    storage.delete_many(payload)
+                elif op == "update":
+                    storage.revert_updates(payload)
+                elif op == "delete":
+                    storage.restore_rows(payload)
+        finally:
+            self._undoing = False
+        return len(transaction["undo"])
+
+    @staticmethod
+    def _changed_tables(before, after):
+        """Tables dont la définition ou les index diffèrent entre deux versions de metadata.json"""
+        def index_defs(metadata, table_name):
+            return {name: index for name, index in metadata.get("indexes", {}).items()
+                    if index["table"] == table_name}
+
+        names = set(before["tables"]) | set(after["tables"])
+        return [name for name in names
+                if before["tables"].get(name) != after["tables"].get(name)
+                or index_defs(before, name) != index_defs(after, name)]
 
     def get_transaction_status(self):
         """Obtenir le statut des transactions"""
@@ -1,110 +1,262 @@
-import re
+from datetime import datetime
+from functools import lru_cache
+from .query_ast import And, Column, Or, Parameter
+
+
+@lru_cache(maxsize=4096)
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+def _to_float(value):
+    return float(value)
+
+
+def _to_int(value):
+    """Entier exact (un passage par float perdrait les entiers au-delà de 2**53).
+    Un littéral non entier ("3.5") reste un float : Python compare int et float exactement."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+# Écritures acceptées pour un booléen (toute autre est inconvertible, comme un nombre mal formé)
+_BOOLEANS = {"true": True, "1": True, "false": False, "0": False}
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    try:
+        return _BOOLEANS[value.lower()]
+    except KeyError:
+        raise ValueError(f"Booléen invalide : {value}")
+
+
+def _to_date(value):
+    """Date vers sa forme stockée : texte ISO AAAA-MM-JJ (l'ordre du texte est celui des dates)"""
+    return parse_date(value).date().isoformat()
+
+
+# Conversion d'un littéral texte (ou d'une valeur stockée) vers la valeur comparable aux valeurs stockées
+CONVERTERS = {"INT": _to_int, "FLOAT": _to_float, "DATE": _to_date, "BOOLEAN": _to_bool}
+
+# Conversion d'un texte déjà validé vers la valeur native stockée (une seule fois, à l'écriture)
+NATIVE_CONVERTERS = {"INT": int, "FLOAT": float, "DATE": _to_date, "BOOLEAN": _to_bool}
+
+
+def to_native(value, col_type):
+    """Texte validé (saisie, ancien format de stockage) vers sa valeur stockée : nombre, booléen,
+    date ISO, texte, ou None pour NULL"""
+    if value is None or value == "null":
+        return None
+    convert = NATIVE_CONVERTERS.get(col_type)
+    return convert(value) if convert is not None else value
+
+
+class ParameterValues:
+    """Valeurs (texte) des paramètres ? d'un plan préparé, liées avant chaque exécution : les
+    conditions compilées une fois les lisent au lieu d'être recompilées"""
+
+    def __init__(self):
+        self.values = ()
+        # Incrémentée à chaque liaison : ce qui dépend des valeurs est recalculé une fois par exécution
+        self.generation = 0
+
+    def bind(self, values):
+        self.values = tuple(values)
+        self.generation += 1
+
+    def value(self, value):
+        """Texte d'un littéral, ou valeur liée d'un Parameter"""
+        return self.values[value.index] if isinstance(value, Parameter) else value
+
+
+def literal_value(node):
+    """Texte d'un Literal de condition, ou le Parameter lui-même (valeur liée à l'exécution)"""
+    return node if isinstance(node, Parameter) else node.value
+
+
+def to_text(value):
+    """Valeur Python (paramètre, JSON, valeur stockée) vers son texte : "null", "true" / "false", sinon str()"""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+OPERATORS = {
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    ">": lambda a, b: a > b,
+    "<": lambda a, b: a < b,
+}
+
+
+def _resolve_column(full_col, row):
+    """Retrouver la clé d'une colonne dans une ligne (avec ou sans préfixe de table)"""
+    if full_col in row:
+        return full_col
+    col_name = full_col.split('.')[-1] if '.' in full_col else full_col
+    for key in row.keys():
+        if key.endswith('.' + col_name) or key == col_name:
+            return key
+    raise ValueError(f"Colonne {full_col} introuvable")
+
+
+def column_type(full_col, columns):
+    """Déterminer le type d'une colonne (TEXT par défaut)"""
+    if full_col in columns:
+        return columns[full_col]["type"]
+    # Deviner le type basé sur le nom de la colonne
+    col_name = full_col.split('.')[-1] if '.' in full_col else full_col
+    for col_key, col_info in columns.items():
+        if col_key.endswith('.' + col_name) or col_key == col_name:
+            return col_info["type"]
+    return "TEXT"
+
+
+# Littéral inconvertible pour le type de la colonne : aucune ligne ne lui est égale ni comparable
+_INVALID = object()
+
+
+def _compile_comparison(full_col, op, value, columns, params=None):
+    if isinstance(value, Parameter):
+        # Comparaison recompilée une fois par exécution, avec la valeur liée
+        compiled = [None, None]
+
+        def bound(row):
+            if compiled[0] != params.generation:
+                compiled[0] = params.generation
+                compiled[1] = _compile_comparison(full_col, op, params.value(value), columns)
+            return compiled[1](row)
+
+        return bound
+
+    compare = OPERATORS[op]
+    literal_null = value == "null"
+
+    # Par clé de ligne résolue : littéral converti une fois vers la forme des valeurs stockées
+    typed = {}
+
+    def literal_for(key):
+        if key not in typed:
+            convert = CONVERTERS.get(column_type(key, columns))
+            literal = value
+            if convert is not None:
+                try:
+                    literal = convert(value)
+                except (ValueError, TypeError):
+                    literal = _INVALID
+            typed[key] = literal
+        return typed[key]
+
+    resolved = [full_col]
+
+    def predicate(row):
+        key = resolved[0]
+        if key not in row:
+            key = _resolve_column(full_col, row)
+            resolved[0] = key
+        row_value = row.get(key)
 
-def evaluate_condition(row, condition, columns):
-    """Évaluer une condition WHERE avec priorité AND > OR - Version corrigée"""
-    
-    def evaluate_single_condition(cond, row, columns):
-        """Évaluer une condition simple : colonne opérateur valeur"""
-        cond = cond.strip()
-        
-        # Pattern pour les conditions - maintenant avec support table.colonne
-        match = re.match(r"((?:\w+\.)?\w+)\s*(=|!=|>|<)\s*'([^']*)'", cond)
-        if not match:
-            raise ValueError(f"Condition mal formée : {cond}")
-        
-        full_col, op, value = match.groups()
-        
-        # Vérifier si la colonne existe dans les données
-        if full_col not in row:
-            # Essayer de trouver la colonne sans préfixe
-            col_name = full_col.split('.')[-1] if '.' in full_col else full_col
-            found = False
-            for key in row.keys():
-                if key.endswith('.' + col_name) or key == col_name:
-                    full_col = key
-                    found = True
-                    break
-            if not found:
-                raise ValueError(f"Colonne {full_col} introuvable")
-        
-        row_value = row.get(full_col)
-        
         # Gestion des valeurs NULL
-        if row_value == "null" or value == "null":
-            return op == "=" and row_value == value or op == "!=" and row_value != value
-        
-        # Déterminer le type de la colonne
-        col_type = "TEXT"  # Par défaut
-        if full_col in columns:
-            col_type = columns[full_col]["type"]
-        else:
-            # Deviner le type basé sur le nom de la colonne
-            col_name = full_col.split('.')[-1] if '.' in full_col else full_col
-            for col_key, col_info in columns.items():
-                if col_key.endswith('.' + col_name) or col_key == col_name:
-                    col_type = col_info["type"]
-                    break
-        
-        # Conversion des types
-        if col_type in ("INT", "FLOAT"):
-            try:
-                row_value = float(row_value)
-                value = float(value)
-            except (ValueError, TypeError):
-                return False
-        elif col_type == "DATE":
-            try:
-                from datetime import datetime
-                row_value = datetime.strptime(row_value, "%Y-%m-%d")
-                value = datetime.strptime(value, "%Y-%m-%d")
-            except (ValueError, TypeError):
-                return False
-        elif col_type == "BOOLEAN":
-            row_value = row_value.lower() == "true"
-            value = value.lower() == "true"
-        
-        # Application de l'opérateur
-        if op == "=":
-            return row_value == value
-        elif op == "!=":
-            return row_value != value
-        elif op == ">":
-            return row_value > value
-        elif op == "<":
-            return row_value < value
-
-    def parse_condition(condition_str):
-        """Parser les conditions avec priorité ET > OR"""
-        condition_str = condition_str.strip()
-        
-        # D'abord, séparer par OU (le moins prioritaire)
-        or_parts = re.split(r"\s+OU\s+", condition_str, flags=re.IGNORECASE)
-        
-        if len(or_parts) > 1:
-            # Au moins un des OU doit être vrai
-            for or_part in or_parts:
-                if parse_and_conditions(or_part.strip()):
-                    return True
+        if row_value is None or literal_null:
+            row_null = row_value is None
+            return op == "=" and row_null == literal_null or op == "!=" and row_null != literal_null
+
+        literal = literal_for(key)
+        if literal is _INVALID:
             return False
-        else:
-            # Pas de OU, traiter les ET
-            return parse_and_conditions(condition_str)
-    
-    def parse_and_conditions(condition_str):
-        """Parser les conditions ET"""
-        and_parts = re.split(r"\s+ET\s+", condition_str, flags=re.IGNORECASE)
-        
-        if len(and_parts) > 1:
-            # Tous les ET doivent être vrais
-            for and_part in and_parts:
-                if not evaluate_single_condition(and_part.strip(), row, columns):
-                    return False
-            return True
-        else:
-            # Condition simple
-            return evaluate_single_condition(condition_str.strip(), row, columns)
-    
+        try:
+            return compare(row_value, literal)
+        except TypeError:
+            return False
+
+    return predicate
+
+
+def _compile_column_comparison(left_col, op, right_col, columns):
+    """Comparer deux colonnes d'une même ligne (t1.a = t2.b) ; valeurs de types différents
+    converties selon le type de la colonne de gauche"""
+    compare = OPERATORS[op]
+    resolved = {}
+
+    def key_for(full_col, row):
+        key = resolved.get(full_col)
+        if key not in row:
+            key = resolved[full_col] = _resolve_column(full_col, row)
+        return key
+
+    def predicate(row):
+        left, right = row.get(key_for(left_col, row)), row.get(key_for(right_col, row))
+        if left is None or right is None:
+            return op == "=" and left is right or op == "!=" and left is not right
+        try:
+            if type(left) is type(right):
+                return compare(left, right)
+            convert = CONVERTERS.get(column_type(left_col, columns))
+            if convert is None:
+                return compare(left, right)
+            return compare(convert(left), convert(right))
+        except (ValueError, TypeError, AttributeError):
+            return False
+
+    return predicate
+
+
+def _compile_expression(expr, columns, params=None):
+    if isinstance(expr, (And, Or)):
+        tests = [_compile_expression(item, columns, params) for item in expr.items]
+        if isinstance(expr, And):
+            return lambda row: all(test(row) for test in tests)
+        return lambda row: any(test(row) for test in tests)
+    if isinstance(expr.value, Column):
+        return _compile_column_comparison(expr.column.name, expr.op, expr.value.name, columns)
+    return _compile_comparison(expr.column.name, expr.op, literal_value(expr.value), columns, params)
+
+
+def compile_condition(condition, columns, params=None):
+    """Compiler une condition WHERE (arbre de query_ast) une seule fois, pour l'appliquer à toutes les lignes.
+
+    Retourne une fonction row -> bool ; l'évaluation s'arrête dès que le résultat est connu. Les
+    paramètres ? sont lus dans params (ParameterValues) à chaque exécution.
+    """
     try:
-        return parse_condition(condition)
+        test = _compile_expression(condition, columns, params)
     except Exception as e:
-        raise ValueError(f"Erreur dans la condition '{condition}': {e}")
\ No newline at end of file
+        raise ValueError(f"Erreur dans la condition '{condition}': {e}")
+
+    def predicate(row):
+        try:
+            return test(row)
+        except Exception as e:
+            raise ValueError(f"Erreur dans la condition '{condition}': {e}")
+
+    return predicate
+
+
+def conjunctive_atoms(condition):
+    """Conditions simples (colonne, opérateur, valeur) reliées par ET au premier niveau de la condition.
+
+    Chacune est nécessaire pour qu'une ligne passe : elles peuvent servir à réduire les lignes
+    candidates (index), la condition complète restant appliquée ensuite.
+    """
+    items = condition.items if isinstance(condition, And) else (condition,)
+    return [(item.column.name, item.op, literal_value(item.value)) for item in items
+            if not isinstance(item, (And, Or)) and not isinstance(item.value, Column)]
+
+
+def compile_atoms(atoms, columns, params=None):
+    """Compiler une conjonction de conditions simples (colonne, opérateur, valeur) déjà analysées"""
+    tests = [_compile_comparison(full_col, op, value, columns, params) for full_col, op, value in atoms]
+    return lambda row: all(test(row) for test in tests)
+
+
+def evaluate_condition(row, condition, columns):
+    """Évaluer une condition WHERE avec priorité AND > OR sur une seule ligne"""
+    return compile_condition(condition, columns)(row)
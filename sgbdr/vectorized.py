@@ -0,0 +1,189 @@
+# sgbdr/vectorized.py
+# Exécution par lots avec NumPy (optionnel) pour les colonnes INT, FLOAT et DATE. Sans NumPy, ou pour
+# une condition sur une colonne d'un autre type, le moteur ligne à ligne de utils reste utilisé :
+# mêmes résultats, seul le coût change.
+from datetime import date
+from itertools import compress
+from .query_ast import And, Column, Or, Parameter
+from .utils import CONVERTERS, column_type, literal_value, parse_date
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Lignes converties en tableaux à la fois
+BATCH_SIZE = 4096
+# Types de colonnes évalués par masques
+VECTOR_TYPES = ("INT", "FLOAT", "DATE")
+# date.toordinal() du 1970-01-01, jour 0 de datetime64[D]
+_EPOCH_ORDINAL = 719163
+# Au-delà, un entier n'a plus de représentation exacte en float64 : la colonne INT reste au moteur ligne à ligne
+_FLOAT_EXACT = 2 ** 53
+
+
+def available():
+    return np is not None
+
+
+def column_array(values, col_type):
+    """(tableau, masque NULL) des valeurs stockées d'une colonne : float64, ou numéro de jour (int64) pour DATE.
+
+    Lève ValueError si une valeur ne se convertit pas, ou si un entier INT ne tient pas exactement en float64.
+    """
+    values = list(values)
+    nulls = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+    if col_type == "DATE":
+        data = np.array(["NaT" if value is None else value for value in values], dtype="datetime64[D]")
+        return data.astype(np.int64), nulls
+    if col_type == "INT" and not _exact_ints(values):
+        raise ValueError("Entier hors de la précision de float64")
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64), nulls
+
+
+def _exact_ints(values):
+    return all(value is None or -_FLOAT_EXACT <= value <= _FLOAT_EXACT for value in values)
+
+
+def day_number(value):
+    """Date ISO -> numéro de jour depuis le 1970-01-01 (valeur des tableaux DATE)"""
+    return parse_date(value).toordinal() - _EPOCH_ORDINAL
+
+
+def day_date(day):
+    """Numéro de jour -> date ISO AAAA-MM-JJ"""
+    return date.fromordinal(int(day) + _EPOCH_ORDINAL).isoformat()
+
+
+def _literal(value, col_type):
+    if col_type == "DATE":
+        return day_number(value)
+    if col_type == "INT":
+        literal = CONVERTERS["INT"](value)
+        if not _exact_ints((literal,)):
+            raise ValueError("Entier hors de la précision de float64")
+        return literal
+    return float(value)
+
+
+def _resolve_key(full_col, columns):
+    """Nom de la colonne dans les lignes (celui des métadonnées)"""
+    if full_col in columns:
+        return full_col
+    col_name = full_col.split(".")[-1]
+    for key in columns:
+        if key == col_name or key.endswith("." + col_name):
+            return key
+    return None
+
+
+def compile_vector_condition(condition, columns, params=None):
+    """Compiler une condition AVEC en fonction lots -> masque booléen, ou None si elle doit rester
+    au moteur ligne à ligne (NumPy absent, colonne non numérique, comparaison entre colonnes).
+
+    Un paramètre ? est lu dans params (ParameterValues) : si sa valeur liée ne se compare pas par
+    masque, le lot est évalué ligne à ligne.
+    """
+    if np is None:
+        return None
+    try:
+        return _compile(condition, columns, params)
+    except (ValueError, TypeError):
+        return None
+
+
+def _compile(expr, columns, params=None):
+    if isinstance(expr, (And, Or)):
+        tests = [_compile(item, columns, params) for item in expr.items]
+        if any(test is None for test in tests):
+            return None
+        combine = np.logical_and if isinstance(expr, And) else np.logical_or
+
+        def combined(arrays):
+            mask = tests[0](arrays)
+            for test in tests[1:]:
+                mask = combine(mask, test(arrays))
+            return mask
+
+        combined.columns = {column for test in tests for column in test.columns}
+        return combined
+
+    if isinstance(expr.value, Column) or not isinstance(expr.column, Column):
+        return None
+    key = _resolve_key(expr.column.name, columns)
+    col_type = column_type(expr.column.name, columns)
+    if key is None or col_type not in VECTOR_TYPES:
+        return None
+    value = literal_value(expr.value)
+
+    if isinstance(value, Parameter):
+        # Test refait une fois par exécution, avec la valeur liée (ValueError : lot ligne à ligne)
+        compiled = [None, None]
+
+        def test(arrays):
+            if compiled[0] != params.generation:
+                compiled[1] = _comparison(key, expr.op, params.value(value), col_type)
+                compiled[0] = params.generation
+            return compiled[1](arrays)
+    else:
+        test = _comparison(key, expr.op, value, col_type)
+
+    test.columns = {(key, col_type)}
+    return test
+
+
+def _comparison(key, op, value, col_type):
+    if value == "null":
+        # Comme le moteur ligne à ligne : = null / != null testent NULL, < et > sont toujours faux
+        def test(arrays):
+            nulls = arrays[key][1]
+            return nulls if op == "=" else ~nulls if op == "!=" else np.zeros_like(nulls)
+        return test
+
+    literal = _literal(value, col_type)
+
+    def test(arrays):
+        data, nulls = arrays[key]
+        if op == "=":
+            return (data == literal) & ~nulls
+        if op == "!=":
+            # NULL != valeur est vrai dans le moteur ligne à ligne
+            return (data != literal) | nulls
+        return ((data > literal) if op == ">" else (data < literal)) & ~nulls
+
+    return test
+
+
+def filter_batches(rows, vector_test, predicate):
+    """Lignes passant la condition, évaluée par masques sur des lots de BATCH_SIZE lignes.
+
+    Un lot dont une valeur ne se convertit pas est évalué par le prédicat ligne à ligne.
+    """
+    rows = iter(rows)
+    columns = sorted(vector_test.columns)
+    while True:
+        batch = [row for _, row in zip(range(BATCH_SIZE), rows)]
+        if not batch:
+            return
+        try:
+            arrays = {key: column_array((row.get(key) for row in batch), col_type)
+                      for key, col_type in columns}
+            mask = vector_test(arrays)
+        except (ValueError, TypeError):
+            yield from filter(predicate, batch)
+            continue
+        yield from compress(batch, mask.tolist())
+
+
+def numeric_summary(values, col_type="FLOAT"):
+    """(min, max, somme) de valeurs stockées INT/FLOAT/DATE non NULL, par réductions NumPy (numéros
+    de jour en int64 pour DATE, comme pour les masques ; INT reste en entiers Python exacts)"""
+    if col_type == "DATE":
+        data, _ = column_array(values, col_type)
+        return int(data.min()), int(data.max()), int(data.sum())
+    if col_type == "INT":
+        # Entiers Python : exacts quelle que soit leur taille (float64 arrondit au-delà de 2**53)
+        return min(values), max(values), sum(values)
+    data = np.array(values, dtype=np.float64)
+    return float(data.min()), float(data.max()), float(data.sum())
+
@@ -0,0 +1,513 @@
+# sgbdr/wal_manager.py
+import atexit
+import json
+import os
+import threading
+import zlib
+from .buffer_cache import BUFFER_CACHE
+from .storage import PAGE_SIZE
+
+# Intervalle du checkpoint en arrière-plan (secondes)
+CHECKPOINT_INTERVAL = 5
+# Taille du WAL au-delà de laquelle un checkpoint est déclenché sans attendre
+CHECKPOINT_WAL_SIZE = 4 * 1024 * 1024
+
+
+class LoggedTableStorage:
+    """Enveloppe d'un moteur de stockage : chaque écriture est journalisée dans le WAL et, dans une
+    transaction, de quoi l'annuler est noté dans son journal d'annulation (lignes d'avant l'écriture).
+    Index et statistiques de la table sont maintenus à chaque écriture."""
+
+    def __init__(self, storage, wal, indexes, statistics, transactions=None):
+        self.storage = storage
+        self.wal = wal
+        self.indexes = indexes
+        self.statistics = statistics
+        self.transactions = transactions
+
+    def __getattr__(self, name):
+        # Lectures, fichiers, DDL : délégués au moteur
+        return getattr(self.storage, name)
+
+    def _undo_log(self):
+        """Journal d'annulation de la transaction en cours sur cette base, ou None"""
+        if self.transactions is None:
+            return None
+        return self.transactions.undo_log(self.wal.db_name)
+
+    def _record_undo(self, undo, op, payload=None):
+        undo.append((op, self.storage.table_name, payload))
+
+    def _in_transaction(self):
+        """Une transaction est-elle ouverte sur cette base (annulation imbriquée comprise) ?"""
+        return self.transactions is not None and self.transactions.in_progress(self.wal.db_name)
+
+    def _commit(self, lsn):
+        # Dans une transaction, le journal n'est rendu durable qu'une fois, à VALIDER TRANSACTION :
+        # ses écritures non validées ne peuvent pas être rejouées après un crash
+        if not self._in_transaction():
+            self.wal.commit(lsn)
+
+    def create(self):
+        self.storage.create()
+        self.indexes.reset()
+        self.statistics.analyze([])
+        BUFFER_CACHE.bump(self.storage)
+        undo = self._undo_log()
+        if undo is not None:
+            self._record_undo(undo, "create")
+
+    def drop(self):
+        undo = self._undo_log()
+        if undo is not None:
+            # Table recréée à l'identique (mêmes row IDs) si la transaction est annulée
+            self._record_undo(undo, "drop", list(self.storage.scan()))
+        self.storage.drop()
+        # Les enregistrements de la table encore dans le journal ne doivent plus être rejoués
+        self.wal.forget_table(self.storage.table_name)
+        self.indexes.reset()
+        self.statistics.reset()
+        BUFFER_CACHE.bump(self.storage)
+
+    def insert(self, row):
+        undo = self._undo_log()
+        with self.wal.lock:
+            rid = self.storage.insert(row)
+            if undo is not None:
+                self._record_undo(undo, "insert", [rid])
+            lsn = self.wal.append(self.storage.table_name, "insert", rid=rid, row=row)
+            self.indexes.on_insert(rid, row)
+            self.statistics.on_insert([row])
+            BUFFER_CACHE.bump(self.storage)
+        self._commit(lsn)
+        return rid
+
+    def insert_many(self, rows):
+        """Insérer un lot : un seul enregistrement WAL et un seul fsync"""
+        if not rows:
+            return []
+        undo = self._undo_log()
+        with self.wal.lock:
+            rids = self.storage.insert_many(rows)
+            if undo is not None:
+                self._record_undo(undo, "insert", list(rids))
+            lsn = self.wal.append(self.storage.table_name, "insert_many", rids=rids, rows=rows)
+            for rid, row in zip(rids, rows):
+                self.indexes.on_insert(rid, row)
+            self.statistics.on_insert(rows)
+            BUFFER_CACHE.bump(self.storage)
+        self._commit(lsn)
+        return rids
+
+    def update(self, rid, row):
+        return self.update_many({rid: row})[rid]
+
+    def update_many(self, changes):
+        if not changes:
+            return {}
+        undo = self._undo_log()
+        with self.wal.lock:
+            previous = self.storage.fetch_map(list(changes)) if undo is not None else None
+            moved = self.storage.update_many(changes)
+            if undo is not None:
+                self._record_undo(undo, "update", [(moved[rid], rid, row) for rid, row in previous.items()])
+            lsn = self.wal.append(self.storage.table_name, "update",
+                                  changes=[[rid, moved[rid], row] for rid, row in changes.items()])
+            self.indexes.on_update(moved, changes)
+            self.statistics.on_update(list(changes.values()))
+            BUFFER_CACHE.bump(self.storage)
+        self._commit(lsn)
+        return moved
+
+    def delete(self, rid):
+        self.delete_many([rid])
+
+    def delete_many(self, rids):
+        rids = list(rids)
+        if not rids:
+            return
+        undo = self._undo_log()
+        with self.wal.lock:
+            if undo is not None:
+                self._record_undo(undo, "delete", sorted(self.storage.fetch_map(rids).items()))
+            self.storage.delete_many(rids)
+            lsn = self.wal.append(self.storage.table_name, "delete", rids=rids)
+            self.indexes.on_delete(rids)
+            self.statistics.on_delete(len(set(rids)))
+            BUFFER_CACHE.bump(self.storage)
+        self._commit(lsn)
+
+    def write_all(self, rows):
+        rows = list(rows)
+        if self._in_transaction():
+            # Dans une transaction, le remplacement reste en mémoire comme les autres écritures (le
+            # fichier n'est réécrit qu'à VALIDER) : suppression puis insertion, journalisées ligne à ligne
+            with self.wal.lock:
+                self.delete_many([rid for rid, _ in self.storage.scan()])
+                self.insert_many(rows)
+            return
+        with self.wal.lock:
+            # Journalisé avant l'écriture directe : un crash entre les deux est rejoué
+            lsn = self.wal.append(self.storage.table_name, "replace", rows=rows)
+            self.wal.commit(lsn)
+            self.storage.write_all(rows)
+            self.indexes.reset()
+            self.statistics.analyze(rows)
+            BUFFER_CACHE.bump(self.storage)
+            self.wal.mark_checkpointed(self.storage.table_name, lsn)
+
+    # --- Annulation d'une transaction (jamais notée dans un journal d'annulation) ---
+
+    def restore_rows(self, items):
+        """Remettre des lignes supprimées à leurs row IDs"""
+        items = sorted(items)
+        if not items:
+            return
+        with self.wal.lock:
+            self.storage.restore(items)
+            lsn = self.wal.append(self.storage.table_name, "restore", rows=items)
+            self.indexes.on_restore(items)
+            self.statistics.on_insert([row for _, row in items])
+            BUFFER_CACHE.bump(self.storage)
+        self._commit(lsn)
+
+    def revert_updates(self, changes):
+        """Rendre aux lignes modifiées leur ancienne valeur et leur ancien row ID.
+
+        changes : [(row ID actuel, row ID d'avant, ligne d'avant)] ; même enregistrement WAL qu'une mise à jour.
+        """
+        if not changes:
+            return
+        with self.wal.lock:
+            for current, rid, row in changes:
+                if current != rid:
+                    self.storage.delete_many([current])
+                self.storage.put(rid, row)
+            lsn = self.wal.append(self.storage.table_name, "update",
+                                  changes=[[current, rid, row] for current, rid, row in changes])
+            self.indexes.on_update({current: rid for current, rid, _ in changes},
+                                   {current: row for current, _, row in changes})
+            self.statistics.on_update([row for _, _, row in changes])
+            BUFFER_CACHE.bump(self.storage)
+        self._commit(lsn)
+
+
+class DatabaseWal:
+    """WAL d'une base : journal append-only des écritures ligne à ligne, checkpoint et rejeu"""
+
+    def __init__(self, db_dir, storage_manager, db_name, wakeup=None):
+        self.db_dir = db_dir
+        self.db_name = db_name
+        self.storage_manager = storage_manager
+        self.wal_dir = db_dir / "_wal"
+        self.log_path = self.wal_dir / "wal.log"
+        self.checkpoint_path = self.wal_dir / "checkpoint.json"
+        self.doublewrite_path = self.wal_dir / "doublewrite"
+        # lock : protège les écritures de tables contre un checkpoint concurrent
+        self.lock = threading.RLock()
+        self._append_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = []
+        self._log_file = None
+        self._checkpoint = {"lsn": 0, "tables": {}}
+        self._last_lsn = 0
+        self._flushed_lsn = 0
+        self._wakeup = wakeup
+        self.recovered = False
+
+    # --- Journal ---
+
+    def append(self, table_name, op, **payload):
+        """Ajouter un enregistrement au journal (en mémoire jusqu'au commit). Retourne son LSN"""
+        with self._append_lock:
+            self._last_lsn += 1
+            record = {"lsn": self._last_lsn, "table": table_name, "op": op, **payload}
+            self._pending.append(record)
+            return self._last_lsn
+
+    def commit(self, lsn=None):
+        """Rendre le journal durable jusqu'à lsn (group commit : un seul fsync par lot)"""
+        target = lsn or self._last_lsn
+        with self._flush_lock:
+            if self._flushed_lsn >= target:
+                # Un autre thread a déjà écrit ce lot
+                return
+            with self._append_lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            log_file = self._open_log()
+            lines = []
+            for record in batch:
+                payload = json.dumps(record, separators=(",", ":"))
+                lines.append(f"{zlib.crc32(payload.encode('utf-8')):08x} {payload}\n")
+            log_file.write("".join(lines))
+            log_file.flush()
+            os.fsync(log_file.fileno())
+            self._flushed_lsn = batch[-1]["lsn"]
+            if self._wakeup is not None and log_file.tell() > CHECKPOINT_WAL_SIZE:
+                # Journal trop gros : réveiller le checkpointer sans attendre
+                self._wakeup.set()
+
+    def size(self):
+        return self.log_path.stat().st_size if self.log_path.exists() else 0
+
+    def _open_log(self):
+        if self._log_file is None:
+            self.wal_dir.mkdir(exist_ok=True)
+            self._log_file = open(self.log_path, "a", encoding="utf-8")
+        return self._log_file
+
+    def _read_log(self):
+        """Lire les enregistrements valides (s'arrête au premier enregistrement tronqué)"""
+        records = []
+        if not self.log_path.exists():
+            return records
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                crc, _, payload = line.rstrip("\n").partition(" ")
+                try:
+                    if int(crc, 16) != zlib.crc32(payload.encode("utf-8")):
+                        break
+                    records.append(json.loads(payload))
+                except ValueError:
+                    break
+        return records
+
+    def _truncate_log(self):
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+        if self.log_path.exists():
+            with open(self.log_path, "w"):
+                pass
+
+    # --- Checkpoint ---
+
+    def _load_checkpoint(self):
+        if self.checkpoint_path.exists():
+            with open(self.checkpoint_path, "r") as f:
+                self._checkpoint = json.load(f)
+
+    def _save_checkpoint(self):
+        self.wal_dir.mkdir(exist_ok=True)
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._checkpoint, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def forget_table(self, table_name):
+        """Table supprimée : ses enregistrements déjà journalisés ne sont plus rejoués, sans checkpoint
+        des autres tables (une table recréée sous ce nom ne reçoit que ses propres écritures)"""
+        with self._append_lock:
+            lsn = self._last_lsn
+        self.mark_checkpointed(table_name, lsn)
+
+    def mark_checkpointed(self, table_name, lsn):
+        """La table est à jour sur disque jusqu'à lsn : ses enregistrements antérieurs sont ignorés au rejeu"""
+        self._checkpoint["tables"][table_name] = lsn
+        self._save_checkpoint()
+
+    def _write_doublewrite(self, table_name, lsn, pages):
+        """Sauvegarder les pages avant leur écriture en place (protection contre les pages déchirées)"""
+        header = json.dumps({"table": table_name, "lsn": lsn, "pages": [page_no for page_no, _ in pages]})
+        with open(self.doublewrite_path, "wb") as f:
+            f.write(header.encode("utf-8") + b"\n")
+            for _, page in pages:
+                f.write(page.data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def checkpoint(self):
+        """Écrire les tables modifiées sur disque puis vider le journal"""
+        with self.lock:
+            self.commit()
+            lsn = self._last_lsn
+            for storage in self.storage_manager.open_storages(self.db_name):
+                if not storage.dirty:
+                    continue
+                storage.flush(doublewrite=lambda pages, name=storage.table_name: self._write_doublewrite(name, lsn, pages))
+                self.mark_checkpointed(storage.table_name, lsn)
+                if self.doublewrite_path.exists():
+                    self.doublewrite_path.unlink()
+            self.storage_manager.save_indexes(self.db_name)
+            if self._checkpoint["tables"] or self.size():
+                self._checkpoint = {"lsn": lsn, "tables": {}}
+                self._save_checkpoint()
+                self._truncate_log()
+
+    # --- Rejeu ---
+
+    def _apply_doublewrite(self):
+        """Terminer un checkpoint interrompu : réappliquer les pages sauvegardées si elles sont complètes"""
+        if not self.doublewrite_path.exists():
+            return
+        data = self.doublewrite_path.read_bytes()
+        header, _, pages = data.partition(b"\n")
+        try:
+            info = json.loads(header)
+        except ValueError:
+            info = None
+        storage = self.storage_manager.get_storage(info["table"], self.db_name).storage if info else None
+        if storage is not None and storage.exists() and len(pages) == len(info["pages"]) * PAGE_SIZE:
+            with open(storage.path, "r+b") as f:
+                for i, page_no in enumerate(info["pages"]):
+                    f.seek(page_no * PAGE_SIZE)
+                    f.write(pages[i * PAGE_SIZE:(i + 1) * PAGE_SIZE])
+                f.flush()
+                os.fsync(f.fileno())
+            # La free-space map sera reconstruite depuis les pages
+            if storage.fsm_path.exists():
+                storage.fsm_path.unlink()
+            self.storage_manager.invalidate(self.db_name)
+            self.mark_checkpointed(info["table"], info["lsn"])
+        self.doublewrite_path.unlink()
+
+    def _redo(self, storage, record):
+        op = record["op"]
+        if op == "insert":
+            storage.put(record["rid"], record["row"])
+        elif op == "insert_many":
+            storage.put_many(zip(record["rids"], record["rows"]))
+        elif op == "update":
+            for rid, new_rid, row in record["changes"]:
+                if new_rid != rid:
+                    storage.delete_many([rid])
+                storage.put(new_rid, row)
+        elif op == "delete":
+            storage.delete_many(record["rids"])
+        elif op == "restore":
+            storage.restore(record["rows"])
+        elif op == "replace":
+            storage.write_all(record["rows"])
+
+    def recover(self):
+        """Rejouer le journal sur les tables puis checkpointer"""
+        with self.lock:
+            self.recovered = True
+            self._load_checkpoint()
+            self._apply_doublewrite()
+            records = self._read_log()
+            replayed = 0
+            for record in records:
+                applied = max(self._checkpoint["lsn"], self._checkpoint["tables"].get(record["table"], 0))
+                if record["lsn"] <= applied:
+                    continue
+                storage = self.storage_manager.get_storage(record["table"], self.db_name)
+                if not storage.exists():
+                    # Table supprimée depuis : rien à rejouer
+                    continue
+                self._redo(storage.storage, record)
+                storage.indexes.reset()
+                storage.statistics.mark_stale()
+                BUFFER_CACHE.bump(storage.storage)
+                replayed += 1
+            self._last_lsn = max([self._checkpoint["lsn"]] + [r["lsn"] for r in records])
+            self._flushed_lsn = self._last_lsn
+            self.checkpoint()
+            return replayed
+
+    def close(self):
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+
+class WalManager:
+    def __init__(self, db_path, sgbdr):
+        self.db_path = db_path
+        self.sgbdr = sgbdr
+        self._wals = {}
+        self._wals_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self.checkpointer_thread = None
+
+    def set_sgbdr(self, sgbdr):
+        """Définir la référence à l'instance SGBDR"""
+        self.sgbdr = sgbdr
+
+    def wal_for(self, db_name):
+        """Retourner le WAL d'une base, rejoué à sa première ouverture dans ce processus"""
+        with self._wals_lock:
+            wal = self._wals.get(db_name)
+            if wal is None:
+                wal = DatabaseWal(self.db_path / db_name, self.sgbdr.storage_manager, db_name, self._wakeup)
+                self._wals[db_name] = wal
+        if not wal.recovered:
+            self._recover(wal)
+        return wal
+
+    def _recover(self, wal):
+        replayed = wal.recover()
+        if replayed:
+            print(f"╔════════════════════════════════════")
+            print(f"║ Base {wal.db_name} : {replayed} écritures rejouées depuis le WAL")
+            print(f"╚════════════════════════════════════")
+
+    def recover(self, db_name):
+        """Rejouer le WAL d'une base si ce n'est pas déjà fait dans ce processus"""
+        self.wal_for(db_name)
+
+    def recover_all(self):
+        """Rejouer les WAL de toutes les bases au démarrage"""
+        for db_dir in self.db_path.iterdir():
+            if (db_dir / "_wal").is_dir() and (db_dir / "metadata.json").exists():
+                self.recover(db_dir.name)
+
+    def checkpoint(self, db_name=None):
+        """Checkpointer une base (ou toutes les bases ouvertes sans transaction en cours)"""
+        if db_name is not None:
+            self.wal_for(db_name).checkpoint()
+            return
+        transactions = self.sgbdr.transaction_manager
+        for wal in list(self._wals.values()):
+            # Écritures d'une transaction ouverte : gardées en mémoire jusqu'à VALIDER TRANSACTION
+            if wal.db_dir.exists() and not transactions.in_progress(wal.db_name):
+                wal.checkpoint()
+
+    def analyze(self):
+        """Recalculer les statistiques des tables ouvertes qui ont trop dérivé (bases sans transaction
+        en cours) : le parcours se fait ici, en arrière-plan, jamais en planifiant une requête"""
+        transactions = self.sgbdr.transaction_manager
+        for wal in list(self._wals.values()):
+            if wal.db_dir.exists() and not transactions.in_progress(wal.db_name):
+                with wal.lock:
+                    self.sgbdr.storage_manager.analyze(wal.db_name)
+
+    def forget(self, db_name):
+        """Fermer le WAL d'une base supprimée"""
+        with self._wals_lock:
+            wal = self._wals.pop(db_name, None)
+        if wal is not None:
+            wal.close()
+
+    def start_checkpointer(self):
+        """Démarrer le checkpoint périodique en arrière-plan"""
+        if self.checkpointer_thread is not None:
+            return
+        self.checkpointer_thread = threading.Thread(target=self._run_checkpointer, daemon=True)
+        self.checkpointer_thread.start()
+        atexit.register(self.stop_checkpointer)
+
+    def stop_checkpointer(self):
+        """Arrêter le checkpointer et écrire les dernières modifications"""
+        self._stopped.set()
+        self._wakeup.set()
+        self.checkpoint()
+
+    def _run_checkpointer(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(CHECKPOINT_INTERVAL)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.checkpoint()
+                self.analyze()
+            except Exception as e:
+                print(f"╔════════════════════════════════════")
+                print(f"║ Erreur du checkpoint WAL : {e}")
+                print(f"╚════════════════════════════════════")
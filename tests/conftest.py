@@ -0,0 +1,63 @@
+# tests/conftest.py
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from sgbdr.sgbdr import SGBDR  # noqa: E402
+
+# Noms acceptés après STOCKAGE : chaque test paramétré par moteur passe par les trois
+ENGINES = ("PAGES", "JSON", "COLONNES")
+LOGIN = "LOGIN JOUEUR admin MOTDEPASSE 'admin123'"
+
+
+def open_database(db_path, db_name="t"):
+    """Ouvrir (ou rouvrir, WAL rejoué) une base existante, connecté en admin"""
+    sgbdr = SGBDR(db_path)
+    sgbdr.execute_query(LOGIN)
+    sgbdr.execute_query(f"UTILISER {db_name}")
+    return sgbdr
+
+
+def rows(sgbdr, table_name, condition=None):
+    """Lignes d'une table triées par id"""
+    query = f"LOOT * DANS {table_name}" + (f" AVEC {condition}" if condition else "")
+    return sorted(sgbdr.execute_query(query) or [], key=lambda row: row["id"])
+
+
+def run_then_crash(db_path, queries):
+    """Exécuter des requêtes dans un autre processus puis l'arrêter net (os._exit) : ni checkpoint
+    de sortie ni fermeture, comme après une coupure"""
+    script = textwrap.dedent(f"""
+        import os, sys
+        sys.path.insert(0, {str(ROOT)!r})
+        from sgbdr.sgbdr import SGBDR
+        sgbdr = SGBDR({str(db_path)!r})
+        for query in {list(queries)!r}:
+            sgbdr.execute_query(query)
+        sys.stdout.flush()
+        os._exit(0)
+    """)
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "bases"
+
+
+@pytest.fixture
+def sgbdr(db_path):
+    """Instance connectée en admin, base t créée et sélectionnée"""
+    instance = SGBDR(db_path)
+    instance.execute_query(LOGIN)
+    instance.execute_query("CRAFTER BASE t")
+    instance.execute_query("UTILISER t")
+    yield instance
+    instance.wal_manager.stop_checkpointer()
@@ -0,0 +1,52 @@
+# tests/test_conditions.py
+import pytest
+
+from conftest import ENGINES, rows
+from sgbdr import vectorized
+from sgbdr.query_parser import parse
+from sgbdr.utils import _to_bool
+from sgbdr.vectorized import compile_vector_condition
+
+
+@pytest.mark.parametrize("text, expected", [("true", True), ("TRUE", True), ("1", True),
+                                            ("false", False), ("False", False), ("0", False)])
+def test_to_bool(text, expected):
+    assert _to_bool(text) is expected
+
+
+def test_to_bool_refuse_le_reste():
+    with pytest.raises(ValueError):
+        _to_bool("maybe")
+
+
+def test_booleen_inconvertible_ne_trouve_rien(sgbdr):
+    sgbdr.execute_query("CRAFTER TABLEAU b (id INT PRIMARY KEY, actif BOOLEAN)")
+    sgbdr.execute_query("POP DANS b VALEURS (1, true), (2, false)")
+    assert rows(sgbdr, "b", "actif = 'maybe'") == []
+    assert rows(sgbdr, "b", "actif != 'maybe'") == []
+    assert [row["id"] for row in rows(sgbdr, "b", "actif = '0'")] == [2]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_entiers_au_dela_de_float64(sgbdr, engine):
+    # 2**53 + 1 n'a pas de float64 exact : comparée en float, id = 2**53 trouvait aussi cette ligne
+    sgbdr.execute_query(f"CRAFTER TABLEAU g (id INT PRIMARY KEY, n INT) STOCKAGE {engine}")
+    sgbdr.execute_query("POP DANS g VALEURS (9007199254740993, 1), (3, 2)")
+    assert rows(sgbdr, "g", "id = 9007199254740992") == []
+    assert [row["id"] for row in rows(sgbdr, "g", "id = 9007199254740993")] == [9007199254740993]
+    assert [row["id"] for row in rows(sgbdr, "g", "id > 9007199254740992")] == [9007199254740993]
+    assert [row["id"] for row in rows(sgbdr, "g", "id < 9007199254740993")] == [3]
+    assert rows(sgbdr, "g", "id = 3.5") == []
+    assert [row["id"] for row in rows(sgbdr, "g", "id < 3.5")] == [3]
+    assert [row["id"] for row in rows(sgbdr, "g", "id = 3.0")] == [3]
+
+
+def test_masques_evitent_les_entiers_inexacts():
+    if not vectorized.available():
+        pytest.skip("NumPy absent")
+    columns = {"id": {"type": "INT"}}
+    assert compile_vector_condition(parse("LOOT * DANS g AVEC id = 9007199254740993").condition, columns) is None
+    with pytest.raises(ValueError):
+        vectorized.column_array([9007199254740993, 1], "INT")
+    test = compile_vector_condition(parse("LOOT * DANS g AVEC id < 3.5").condition, columns)
+    assert test(dict(id=vectorized.column_array([3, 4, None], "INT"))).tolist() == [True, False, False]
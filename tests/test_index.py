@@ -0,0 +1,145 @@
+# tests/test_index.py
+import random
+
+import pytest
+
+from conftest import ENGINES, open_database, rows
+from sgbdr.btree import BPlusTree
+from sgbdr.buffer_cache import BUFFER_CACHE
+from sgbdr.index import hash_key
+
+
+def _indexed(sgbdr, engine, count=40):
+    sgbdr.execute_query(f"CRAFTER TABLEAU i (id INT PRIMARY KEY, n INT) STOCKAGE {engine}")
+    sgbdr.execute_query("CRAFTER INDEX i_n SUR i(n)")
+    sgbdr.execute_query("POP DANS i VALEURS " + ", ".join(f"({k}, {k % 7})" for k in range(count)))
+    return sgbdr.storage_manager.get_storage("i")
+
+
+def _assert_consistent(logged):
+    """Chaque ligne de la table est retrouvée à son row ID par chaque index, sans reconstruction"""
+    indexes = logged.indexes
+    assert indexes._indexes is not None
+    stored = dict(logged.storage.scan())
+    assert {indexes.unique("id").get(row["id"]) for row in stored.values()} == set(stored)
+    assert sorted(indexes.btrees()[0].range()) == sorted(stored)
+    for rid in indexes.btrees()[0].range(lower=3, upper=3):
+        assert stored[rid]["n"] == 3
+
+
+def test_hash_key_entiers():
+    assert hash_key("INT", "9007199254740993") == 9007199254740993
+    assert hash_key("INT", "3.0") == 3
+    assert hash_key("INT", "3.5") is None
+    assert hash_key("INT", "abc") is None
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_suppression_renumerote_les_index(sgbdr, engine):
+    logged = _indexed(sgbdr, engine)
+    _assert_consistent(logged)
+    sgbdr.execute_query("DEPOP DANS i AVEC n = 2")
+    sgbdr.execute_query("DEPOP DANS i AVEC id = 0")
+    _assert_consistent(logged)
+    assert [row["id"] for row in rows(sgbdr, "i", "n = 3")] == [3, 10, 17, 24, 31, 38]
+    assert [row["id"] for row in rows(sgbdr, "i", "id = 39")] == [39]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_annulation_renumerote_les_index(sgbdr, engine):
+    logged = _indexed(sgbdr, engine)
+    before = rows(sgbdr, "i")
+    _assert_consistent(logged)
+    sgbdr.execute_query("DEBUT TRANSACTION")
+    sgbdr.execute_query("DEPOP DANS i AVEC n = 2")
+    sgbdr.execute_query("DEPOP DANS i AVEC id = 0")
+    sgbdr.execute_query("ANNULER TRANSACTION")
+    _assert_consistent(logged)
+    assert rows(sgbdr, "i") == before
+    assert [row["id"] for row in rows(sgbdr, "i", "n = 2")] == [2, 9, 16, 23, 30, 37]
+
+
+def test_b_plus_tree_insertion_suppression():
+    # Petit ordre : plusieurs niveaux d'éclatement avec quelques centaines de clés
+    tree = BPlusTree(order=4)
+    keys = list(range(300))
+    random.Random(7).shuffle(keys)
+    for key in keys:
+        tree.insert(key)
+    for key in keys[:100]:
+        tree.delete(key)
+    kept = sorted(keys[100:])
+    assert len(tree) == 200
+    assert list(tree) == kept
+    assert list(tree.iter_from(150)) == [key for key in kept if key >= 150]
+    assert list(BPlusTree.bulk_load(kept, order=4).iter_from(150)) == [key for key in kept if key >= 150]
+
+
+def _ranged(sgbdr, engine, count=500):
+    """Table r : n = 3k mod 500 (valeurs distinctes, dans un autre ordre que les row IDs) indexée par r_n"""
+    sgbdr.execute_query(f"CRAFTER TABLEAU r (id INT PRIMARY KEY, n INT) STOCKAGE {engine}")
+    sgbdr.execute_query("CRAFTER INDEX r_n SUR r(n)")
+    sgbdr.execute_query("POP DANS r VALEURS " + ", ".join(f"({k}, {k * 3 % count})" for k in range(count)))
+    return {k: k * 3 % count for k in range(count)}
+
+
+RANGES = [
+    ("n > 490", lambda n: n > 490),
+    ("n < 5", lambda n: n < 5),
+    ("n > 100 ET n < 110", lambda n: 100 < n < 110),
+    ("n = 250", lambda n: n == 250),
+    ("n = 1000", lambda n: False),
+]
+
+
+def _uses_btree(sgbdr, capsys, condition):
+    capsys.readouterr()
+    sgbdr.execute_query(f"EXPLIQUER LOOT * DANS r AVEC {condition}")
+    return "Parcours d'index B+tree r_n" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_intervalles_b_tree(sgbdr, engine, capsys):
+    values = _ranged(sgbdr, engine)
+    for condition, test in RANGES:
+        assert [row["id"] for row in rows(sgbdr, "r", condition)] == [k for k, n in values.items() if test(n)]
+        assert _uses_btree(sgbdr, capsys, condition), condition
+    # Peu sélective : le parcours séquentiel reste moins cher
+    assert not _uses_btree(sgbdr, capsys, "n > 3")
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_index_persiste_a_la_reouverture(sgbdr, engine, db_path, capsys, monkeypatch):
+    values = _ranged(sgbdr, engine)
+    sgbdr.execute_query("DEPOP DANS r AVEC id < 10")
+    sgbdr.wal_manager.checkpoint()
+    path = db_path / "t" / "_index" / "r.r_n.btree"
+    assert path.exists()
+    BUFFER_CACHE.invalidate_database(db_path / "t")
+    reopened = open_database(db_path)
+    storage = reopened.storage_manager.get_storage("r")
+    # Signature du fichier de la table inchangée : l'index est relu, pas reconstruit par un parcours
+    monkeypatch.setattr(storage.storage, "scan", lambda: pytest.fail("index reconstruit"))
+    assert len(list(storage.indexes.btrees()[0].range())) == 490
+    monkeypatch.undo()
+    assert [row["id"] for row in rows(reopened, "r", "n < 30")] == [k for k, n in values.items() if n < 30 and k >= 10]
+    assert _uses_btree(reopened, capsys, "n < 30")
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_depop_index(sgbdr, engine, db_path, capsys):
+    values = _ranged(sgbdr, engine)
+    sgbdr.wal_manager.checkpoint()
+    path = db_path / "t" / "_index" / "r.r_n.btree"
+    assert path.exists()
+    sgbdr.execute_query("DEPOP INDEX r_n")
+    assert not path.exists()
+    assert sgbdr.storage_manager.get_storage("r").indexes.btrees() == []
+    assert not _uses_btree(sgbdr, capsys, "n = 250")
+    assert [row["id"] for row in rows(sgbdr, "r", "n = 250")] == [k for k, n in values.items() if n == 250]
+    with pytest.raises(ValueError):
+        sgbdr.execute_query("DEPOP INDEX r_n")
+    # Toujours absent après réouverture
+    sgbdr.wal_manager.checkpoint()
+    assert not _uses_btree(open_database(db_path), capsys, "n = 250")
+    assert not path.exists()
@@ -0,0 +1,96 @@
+# tests/test_planner.py
+import itertools
+
+import pytest
+
+from conftest import ENGINES, open_database
+from sgbdr.buffer_cache import BUFFER_CACHE
+
+
+@pytest.fixture
+def employes(sgbdr, request):
+    engine = getattr(request, "param", "PAGES")
+    sgbdr.execute_query(f"CRAFTER TABLEAU dep (id INT PRIMARY KEY, nom TEXT) STOCKAGE {engine}")
+    sgbdr.execute_query(f"CRAFTER TABLEAU emp (id INT PRIMARY KEY, dep INT, sal INT) STOCKAGE {engine}")
+    sgbdr.execute_query("POP DANS dep VALEURS (1, 'info'), (2, 'compta'), (3, 'x')")
+    sgbdr.execute_query("POP DANS emp VALEURS " + ", ".join(f"({i}, {i % 3 + 1}, {i * 10})" for i in range(10)))
+    deps = [{"id": 1, "nom": "info"}, {"id": 2, "nom": "compta"}, {"id": 3, "nom": "x"}]
+    emps = [{"id": i, "dep": i % 3 + 1, "sal": i * 10} for i in range(10)]
+    return sgbdr, emps, deps
+
+
+def _pairs(result):
+    return sorted((row["emp.id"], row["dep.id"]) for row in result)
+
+
+@pytest.mark.parametrize("employes", ENGINES, indirect=True)
+def test_jointure_et_prioritaire_sur_ou(employes):
+    sgbdr, emps, deps = employes
+    result = sgbdr.execute_query("LOOT * DANS emp, dep AVEC emp.dep = dep.id ET emp.sal > '50' OU dep.nom = 'x'")
+    expected = sorted((e["id"], d["id"]) for e, d in itertools.product(emps, deps)
+                      if e["dep"] == d["id"] and e["sal"] > 50 or d["nom"] == "x")
+    assert _pairs(result) == expected
+
+
+def test_jointure_ou_entre_parentheses(employes):
+    sgbdr, emps, deps = employes
+    result = sgbdr.execute_query("LOOT * DANS emp, dep AVEC emp.dep = dep.id ET (emp.sal > '50' OU dep.nom = 'x')")
+    expected = sorted((e["id"], d["id"]) for e, d in itertools.product(emps, deps)
+                      if e["dep"] == d["id"] and (e["sal"] > 50 or d["nom"] == "x"))
+    assert _pairs(result) == expected
+
+
+def test_jointure_condition_invalide(employes):
+    sgbdr, _, _ = employes
+    with pytest.raises(ValueError):
+        sgbdr.execute_query("LOOT * DANS emp, dep AVEC emp.sal > '50' OU emp.dep = dep.id")
+
+
+@pytest.mark.parametrize("employes", ENGINES, indirect=True)
+def test_planifier_ne_lit_pas_la_table(employes, monkeypatch):
+    sgbdr, emps, _ = employes
+    storage = sgbdr.storage_manager.get_storage("emp")
+    sgbdr.execute_query("POP DANS emp VALEURS " + ", ".join(f"({i}, 1, null)" for i in range(10, 110)))
+    sgbdr.execute_query("DEPOP DANS emp AVEC id < 5")
+    sgbdr.execute_query("EDIT emp DEFINIR sal = 5000 AVEC id = 5")
+    stats = storage.statistics.get()
+    assert stats.row_count == 105
+    assert stats.columns["id"].distinct == 105
+    assert stats.columns["sal"].max == 5000
+
+    monkeypatch.setattr(BUFFER_CACHE, "scan", lambda *args: pytest.fail("table lue en planifiant"))
+    monkeypatch.setattr(BUFFER_CACHE, "read", lambda *args: pytest.fail("table lue en planifiant"))
+    monkeypatch.setattr(storage.storage, "scan", lambda *args: pytest.fail("table lue en planifiant"))
+    sgbdr.execute_query("EXPLIQUER LOOT * DANS emp, dep AVEC emp.dep = dep.id ET emp.sal > '50'")
+    monkeypatch.undo()
+
+    exact = sgbdr.execute_query("ANALYSER TABLEAU emp")
+    assert exact.row_count == 105
+    assert exact.columns["sal"].nulls == 100
+    assert (exact.columns["sal"].min, exact.columns["sal"].max) == (60, 5000)
+
+
+def test_statistiques_persistees(employes, db_path):
+    sgbdr, _, _ = employes
+    sgbdr.execute_query("ANALYSER TABLEAU emp")
+    sgbdr.wal_manager.checkpoint()
+    BUFFER_CACHE.invalidate_database(db_path / "t")
+    reopened = open_database(db_path)
+    stats = reopened.storage_manager.get_storage("emp").statistics.get()
+    assert stats.row_count == 10
+    assert stats.columns["dep"].distinct == 3
+    assert (stats.columns["sal"].min, stats.columns["sal"].max) == (0, 90)
+
+
+def test_checkpointer_analyse_les_tables_inconnues(employes, db_path):
+    sgbdr, _, _ = employes
+    sgbdr.wal_manager.checkpoint()
+    for path in (db_path / "t" / "_index").glob("*.stats"):
+        path.unlink()
+    reopened = open_database(db_path)
+    storage = reopened.storage_manager.get_storage("emp")
+    assert storage.statistics.get() is None
+    reopened.execute_query("EXPLIQUER LOOT * DANS emp AVEC id = 3")
+    reopened.wal_manager.analyze()
+    assert storage.statistics.get().row_count == 10
+    assert not storage.statistics.stale()
@@ -0,0 +1,86 @@
+# tests/test_prepared_statement.py
+import pytest
+
+from conftest import ENGINES, rows
+from sgbdr.planner import IndexScan
+
+
+@pytest.fixture
+def prepared(sgbdr, request):
+    engine = getattr(request, "param", "PAGES")
+    sgbdr.execute_query(f"CRAFTER TABLEAU p (id INT PRIMARY KEY, code TEXT UNIQUE, n INT) STOCKAGE {engine}")
+    sgbdr.execute_query("POP DANS p VALEURS " + ", ".join(f"({i}, 'c{i}', {i % 10})" for i in range(200)))
+    sgbdr.execute_query("POP DANS p VALEURS (200, null, 3)")
+    plans = []
+    original = sgbdr.planner.plan
+    sgbdr.planner.plan = lambda *args, **kwargs: plans.append(args[0]) or original(*args, **kwargs)
+    return sgbdr, plans
+
+
+def _ids(result):
+    return sorted(row["id"] for row in result)
+
+
+def _index_scans(statement):
+    return [node for _, node in statement._plan.walk() if isinstance(node, IndexScan)]
+
+
+@pytest.mark.parametrize("prepared", ENGINES, indirect=True)
+def test_plan_garde_entre_executions(prepared):
+    sgbdr, plans = prepared
+    statement = sgbdr.prepare("LOOT * DANS p AVEC id = ?")
+    for i in (3, 150, 999):
+        assert _ids(statement.execute((i,))) == ([i] if i < 200 else [])
+    assert len(plans) == 1
+    assert _index_scans(statement)
+
+
+@pytest.mark.parametrize("prepared", ENGINES, indirect=True)
+def test_intervalle_sur_b_tree_parametre(prepared):
+    sgbdr, plans = prepared
+    sgbdr.execute_query("CRAFTER INDEX p_n SUR p(n)")
+    statement = sgbdr.prepare("LOOT * DANS p AVEC n > ? ET n < ? ET id < ?")
+    for low, high in ((2, 5), (7, 9), (5, 5)):
+        expected = _ids(rows(sgbdr, "p", f"n > {low} ET n < {high} ET id < 100"))
+        assert _ids(statement.execute((low, high, 100))) == expected
+    assert len(plans) == 1
+
+
+def test_catalogue_modifie_replanifie(prepared):
+    sgbdr, plans = prepared
+    statement = sgbdr.prepare("LOOT * DANS p AVEC n = ?")
+    assert len(statement.execute((4,))) == 20
+    assert not _index_scans(statement)
+    sgbdr.execute_query("CRAFTER INDEX p_n SUR p(n)")
+    assert len(statement.execute((4,))) == 20
+    assert len(plans) == 2
+    assert _index_scans(statement)
+    sgbdr.execute_query("DEPOP INDEX p_n")
+    assert len(statement.execute((3,))) == 21
+    assert len(plans) == 3
+
+
+def test_index_reconstruit_sous_le_plan(prepared):
+    sgbdr, plans = prepared
+    statement = sgbdr.prepare("LOOT * DANS p AVEC code = ?")
+    assert _ids(statement.execute(("c7",))) == [7]
+    sgbdr.storage_manager.get_storage("p").indexes.reset()
+    sgbdr.execute_query("EDIT p DEFINIR code = 'z' AVEC id = 7")
+    assert _ids(statement.execute(("z",))) == [7]
+    assert statement.execute(("c7",)) == []
+    assert len(plans) == 1
+
+
+def test_parametre_null_sur_colonne_unique(prepared):
+    sgbdr, _ = prepared
+    statement = sgbdr.prepare("LOOT * DANS p AVEC code = ?")
+    assert _ids(statement.execute((None,))) == [200]
+    assert _ids(statement.execute(("c1",))) == [1]
+
+
+def test_entier_au_dela_de_float64_en_parametre(prepared):
+    sgbdr, _ = prepared
+    sgbdr.execute_query("POP DANS p VALEURS (9007199254740993, 'g', 1)")
+    statement = sgbdr.prepare("LOOT * DANS p AVEC n = 1 ET id > ?")
+    assert _ids(statement.execute((9007199254740992,))) == [9007199254740993]
+    assert _ids(statement.execute((195,))) == [9007199254740993]
@@ -0,0 +1,46 @@
+# tests/test_query_parser.py
+import pytest
+
+from sgbdr import query_ast as ast
+from sgbdr.query_parser import parse
+
+
+@pytest.mark.parametrize("constraint", ["REFERENCES d(id)", "FOREIGN KEY REFERENCES d(id)",
+                                        "foreign key references d(id)"])
+def test_cle_etrangere(constraint):
+    statement = parse(f"CRAFTER TABLEAU e (id INT PRIMARY KEY, did INT {constraint})")
+    assert statement.columns[1] == ast.ColumnSpec("did", "INT", references=("d", "id"))
+
+
+def test_foreign_key_sans_references():
+    with pytest.raises(ValueError):
+        parse("CRAFTER TABLEAU e (did INT FOREIGN KEY)")
+
+
+def test_foreign_key_verifiee(sgbdr):
+    sgbdr.execute_query("CRAFTER TABLEAU d (id INT PRIMARY KEY)")
+    sgbdr.execute_query("CRAFTER TABLEAU e (id INT PRIMARY KEY, did INT FOREIGN KEY REFERENCES d(id))")
+    sgbdr.execute_query("POP DANS d VALEURS (1)")
+    sgbdr.execute_query("POP DANS e VALEURS (1, 1)")
+    with pytest.raises(ValueError):
+        sgbdr.execute_query("POP DANS e VALEURS (2, 7)")
+
+
+@pytest.mark.parametrize("condition, text", [
+    ("sal > 50", "sal > 50"),
+    ("sal > -2.5 ET nom = 'l''été'", "sal > -2.5 ET nom = 'l''été'"),
+    ("d = '2024-01-02' OU n != 'null'", "d = '2024-01-02' OU n != 'null'"),
+])
+def test_condition_affichee_comme_saisie(condition, text):
+    statement = parse(f"LOOT * DANS t AVEC {condition}")
+    assert str(statement.condition) == text
+    # Le texte affiché se relit en la même condition
+    assert parse(f"LOOT * DANS t AVEC {text}").condition == statement.condition
+
+
+def test_expliquer_nombre_sans_apostrophes(sgbdr, capsys):
+    sgbdr.execute_query("CRAFTER TABLEAU emp (id INT PRIMARY KEY, sal INT)")
+    capsys.readouterr()
+    sgbdr.execute_query("EXPLIQUER LOOT * DANS emp AVEC sal > 50")
+    out = capsys.readouterr().out
+    assert "sal > 50" in out and "'50'" not in out
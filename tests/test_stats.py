@@ -0,0 +1,26 @@
+# tests/test_stats.py
+import pytest
+
+from conftest import ENGINES
+from sgbdr import vectorized
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("numpy", [True, False])
+def test_stats_dates(sgbdr, engine, numpy, monkeypatch):
+    if numpy and not vectorized.available():
+        pytest.skip("NumPy absent")
+    if not numpy:
+        monkeypatch.setattr(vectorized, "available", lambda: False)
+    sgbdr.execute_query(f"CRAFTER TABLEAU e (id INT PRIMARY KEY, d DATE, sal FLOAT) STOCKAGE {engine}")
+    sgbdr.execute_query("POP DANS e VALEURS (1, '2024-01-01', 10), (2, '2024-01-03', 20), "
+                        "(3, null, null), (4, '2023-12-30', 30)")
+    stats = sgbdr.execute_query("STATS TABLEAU e")
+    assert stats["row_count"] == 4
+    assert stats["d"] == {"min": "2023-12-30", "max": "2024-01-03", "avg": "2024-01-01", "distinct_count": 3}
+    assert stats["sal"] == {"min": 10, "max": 30, "avg": 20}
+
+
+def test_numeros_de_jour():
+    assert vectorized.day_number("1970-01-02") == 1
+    assert vectorized.day_date(vectorized.day_number("2024-02-29")) == "2024-02-29"
@@ -0,0 +1,129 @@
+# tests/test_storage.py
+import pytest
+
+from conftest import open_database, rows
+from sgbdr.buffer_cache import BUFFER_CACHE
+from sgbdr.storage import PAGE_SIZE, HeapTableStorage, SlottedPage, split_rid
+
+# Lignes d'environ 200 octets : une page de 8 Ko en contient une quarantaine
+TEXT = "x" * 180
+
+
+def _heap(tmp_path, deferred=False):
+    storage = HeapTableStorage(tmp_path, "h")
+    storage.deferred = deferred
+    storage.create()
+    return storage
+
+
+def _row(i):
+    return {"id": i, "texte": TEXT}
+
+
+def _pages(rids):
+    return {split_rid(rid)[0] for rid in rids}
+
+
+@pytest.mark.parametrize("deferred", [False, True])
+def test_insertion_au_dela_d_une_page(tmp_path, deferred):
+    storage = _heap(tmp_path, deferred)
+    rids = [storage.insert(_row(i)) for i in range(100)]
+    storage.flush()
+    assert storage.page_count() >= 3
+    assert storage.path.stat().st_size == storage.page_count() * PAGE_SIZE
+    assert _pages(rids) == set(range(storage.page_count()))
+    assert [row["id"] for row in storage.read_all()] == list(range(100))
+    assert storage.fetch_many(rids[::-1]) == [_row(i) for i in range(100)]
+
+
+@pytest.mark.parametrize("deferred", [False, True])
+def test_suppression_puis_reinsertion_reutilise_les_slots(tmp_path, deferred):
+    storage = _heap(tmp_path, deferred)
+    rids = storage.insert_many([_row(i) for i in range(100)])
+    page_count = storage.page_count()
+    freed = [rid for rid in rids if split_rid(rid)[0] == 0]
+    storage.delete_many(freed)
+    # La dernière page est remplie d'abord, puis les slots libérés de la page 0 via la free-space map
+    reinserted = storage.insert_many([_row(100 + i) for i in range(len(freed))])
+    storage.flush()
+    assert storage.page_count() == page_count
+    assert set(reinserted) & set(freed)
+    assert len(list(storage.scan())) == 100
+
+
+def test_rid_stable_et_relocalisation(tmp_path):
+    storage = _heap(tmp_path)
+    rids = storage.insert_many([_row(i) for i in range(100)])
+    storage.delete_many(rids[:10])
+    # Une suppression ne décale pas les autres lignes
+    assert storage.fetch_map(rids[10:]) == {rid: _row(i) for i, rid in enumerate(rids) if i >= 10}
+    # Une ligne qui grandit reste à son row ID tant que sa page a la place, sinon elle déménage
+    moved = storage.update_many({rids[10]: {"id": 10, "texte": "court"}})
+    assert moved == {rids[10]: rids[10]}
+    last = rids[-1]
+    moved = storage.update_many({last: {"id": 99, "texte": "y" * 7000}})
+    assert moved[last] != last
+    assert storage.fetch(last) is None
+    assert storage.fetch(moved[last])["texte"] == "y" * 7000
+
+
+def test_fsm_reconstruite(tmp_path):
+    storage = _heap(tmp_path)
+    rids = storage.insert_many([_row(i) for i in range(100)])
+    storage.delete_many(rids[:5])
+    storage.fsm_path.unlink()
+    reopened = HeapTableStorage(tmp_path, "h")
+    assert list(reopened._load_fsm()) == [reopened.read_page(n).free_space() for n in range(reopened.page_count())]
+    assert reopened._fsm[0] > reopened._fsm[1]
+
+
+def test_ligne_trop_grande(tmp_path):
+    storage = _heap(tmp_path)
+    with pytest.raises(ValueError):
+        storage.insert({"id": 1, "texte": "x" * PAGE_SIZE})
+
+
+def _filled(sgbdr, count=100):
+    sgbdr.execute_query("CRAFTER TABLEAU h (id INT PRIMARY KEY, texte TEXT) STOCKAGE PAGES")
+    sgbdr.execute_query("POP DANS h VALEURS " + ", ".join(f"({i}, '{TEXT}')" for i in range(count)))
+    return sgbdr.storage_manager.get_storage("h")
+
+
+def test_reouverture_apres_checkpoint(sgbdr, db_path):
+    storage = _filled(sgbdr)
+    sgbdr.execute_query("DEPOP DANS h AVEC id < 20")
+    sgbdr.execute_query("POP DANS h VALEURS " + ", ".join(f"({i}, 'nouvelle')" for i in range(100, 120)))
+    sgbdr.execute_query("EDIT h DEFINIR texte = 'modifiée' AVEC id = 50")
+    expected = rows(sgbdr, "h")
+    sgbdr.wal_manager.checkpoint()
+    assert not storage.dirty
+    assert storage.storage.page_count() > 1
+    BUFFER_CACHE.invalidate_database(db_path / "t")
+    reopened = open_database(db_path)
+    assert rows(reopened, "h") == expected
+    assert rows(reopened, "h", "id = 50") == [{"id": 50, "texte": "modifiée"}]
+
+
+def test_doublewrite_repare_une_page_dechiree(sgbdr, db_path):
+    storage = _filled(sgbdr)
+    sgbdr.wal_manager.checkpoint()
+    sgbdr.execute_query("EDIT h DEFINIR texte = 'modifiée' AVEC id < 5")
+    expected = rows(sgbdr, "h")
+    wal, heap = storage.wal, storage.storage
+
+    def torn(pages):
+        # Pages sauvegardées, puis coupure pendant l'écriture en place : la page 0 est déchirée
+        wal.commit()
+        wal._write_doublewrite("h", wal._last_lsn, pages)
+        with open(heap.path, "r+b") as f:
+            f.write(b"\xff" * 64)
+        raise OSError("coupure")
+
+    assert [page_no for page_no, _ in sorted(heap._dirty_pages.items())] == [0]
+    with pytest.raises(OSError):
+        heap.flush(doublewrite=torn)
+    assert SlottedPage(heap.path.read_bytes()[:PAGE_SIZE]).slot_count() == 0xFFFF
+    BUFFER_CACHE.invalidate_database(db_path / "t")
+    reopened = open_database(db_path)
+    assert rows(reopened, "h") == expected
+    assert not wal.doublewrite_path.exists()
@@ -0,0 +1,213 @@
+# tests/test_transactions.py
+import pytest
+
+from conftest import ENGINES, LOGIN, open_database, rows, run_then_crash
+
+
+def _fill(sgbdr, engine, count=300):
+    sgbdr.execute_query(f"CRAFTER TABLEAU e (id INT PRIMARY KEY, nom TEXT, n INT) STOCKAGE {engine}")
+    sgbdr.execute_query("POP DANS e VALEURS " + ", ".join(f"({i}, 'nom {i}', {i % 10})" for i in range(count)))
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_annuler_restaure_les_lignes(sgbdr, engine):
+    _fill(sgbdr, engine)
+    before = rows(sgbdr, "e")
+    sgbdr.execute_query("DEBUT TRANSACTION")
+    sgbdr.execute_query("POP DANS e VALEURS (1000, 'x', 1), (1001, 'y', 2)")
+    # Lignes agrandies : déplacées vers une autre page dans le moteur PAGES
+    sgbdr.execute_query("EDIT e DEFINIR nom = '" + "long" * 300 + "' AVEC n = '3'")
+    sgbdr.execute_query("DEPOP DANS e AVEC n = '4'")
+    sgbdr.execute_query("EDIT e DEFINIR n = '9' AVEC id = '1000'")
+    # La transaction lit ses propres écritures
+    assert rows(sgbdr, "e", "id = '1000'") == [{"id": 1000, "nom": "x", "n": 9}]
+    assert rows(sgbdr, "e", "n = '4'") == []
+    sgbdr.execute_query("ANNULER TRANSACTION")
+
+    assert rows(sgbdr, "e") == before
+    # Index de clé primaire remis d'accord avec la table
+    assert rows(sgbdr, "e", "id = '44'") == [{"id": 44, "nom": "nom 44", "n": 4}]
+    assert rows(sgbdr, "e", "id = '1000'") == []
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_valider_garde_les_ecritures(sgbdr, engine, db_path):
+    _fill(sgbdr, engine)
+    sgbdr.execute_query("DEBUT TRANSACTION")
+    sgbdr.execute_query("POP DANS e VALEURS (1000, 'x', 1)")
+    sgbdr.execute_query("DEPOP DANS e AVEC n = '4'")
+    sgbdr.execute_query("VALIDER TRANSACTION")
+    assert not sgbdr.transaction_manager.in_transaction
+    expected = rows(sgbdr, "e")
+    assert len(expected) == 271
+
+    # Tables écrites par VALIDER : relues telles quelles par une autre instance
+    assert rows(open_database(db_path), "e") == expected
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_valider_ecrit_chaque_table_une_fois(sgbdr, engine, monkeypatch):
+    _fill(sgbdr, engine)
+    sgbdr.execute_query(f"CRAFTER TABLEAU g (id INT PRIMARY KEY) STOCKAGE {engine}")
+    sgbdr.wal_manager.checkpoint()
+    flushed = []
+    for storage in (sgbdr.storage_manager.get_storage(name).storage for name in ("e", "g")):
+        original = storage.flush
+        monkeypatch.setattr(storage, "flush",
+                            lambda *args, _flush=original, _name=storage.table_name, **kwargs:
+                            flushed.append(_name) or _flush(*args, **kwargs))
+
+    sgbdr.execute_query("DEBUT TRANSACTION")
+    for i in range(1000, 1100):
+        sgbdr.execute_query(f"POP DANS e VALEURS ({i}, 'x', 1)")
+        sgbdr.execute_query(f"POP DANS g VALEURS ({i})")
+    # Checkpoint en arrière-plan : la base en transaction est laissée de côté
+    sgbdr.wal_manager.checkpoint()
+    assert flushed == []
+    sgbdr.execute_query("VALIDER TRANSACTION")
+    assert sorted(flushed) == ["e", "g"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_transactions_imbriquees(sgbdr, engine):
+    _fill(sgbdr, engine)
+    before = rows(sgbdr, "e")
+    sgbdr.execute_query("DEBUT TRANSACTION")
+    sgbdr.execute_query("DEPOP DANS e AVEC n = '1'")
+    sgbdr.execute_query("DEBUT TRANSACTION")
+    sgbdr.execute_query("EDIT e DEFINIR nom = 'w' AVEC n = '2'")
+    sgbdr.execute_query("VALIDER TRANSACTION")
+    assert rows(sgbdr, "e", "id = '2'") == [{"id": 2, "nom": "w", "n": 2}]
+    # L'annulation englobante défait aussi la transaction interne validée
+    sgbdr.execute_query("ANNULER TRANSACTION")
+    assert rows(sgbdr, "e") == before
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_annulation_interne_seule(sgbdr, engine):
+    _fill(sgbdr, engine)
+    sgbdr.execute_query("DEBUT TRANSACTION")
+    sgbdr.execute_query("POP DANS e VALEURS (1000, 'gardée', 1)")
+    sgbdr.execute_query("DEBUT TRANSACTION")
+    sgbdr.execute_query("POP DANS e VALEURS (1001, 'annulée', 1)")
+    sgbdr.execute_query("ANNULER TRANSACTION")
+    sgbdr.execute_query("VALIDER TRANSACTION")
+    assert [row["id"] for row in rows(sgbdr, "e", "id > '999'")] == [1000]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_annuler_ddl(sgbdr, engine):
+    _fill(sgbdr, engine)
+    sgbdr.execute_query(f"CRAFTER TABLEAU f (id INT PRIMARY KEY, v TEXT) STOCKAGE {engine}")
+    sgbdr.execute_query("POP DANS f VALEURS " + ", ".join(f"({i}, 'v{i}')" for i in range(50)))
+    before = rows(sgbdr, "f")
+    sgbdr.execute_query("DEBUT TRANSACTION")
+    sgbdr.execute_query("POP DANS e VALEURS (1000, 'x', 1)")
+    sgbdr.execute_query(f"CRAFTER TABLEAU tmp (id INT PRIMARY KEY) STOCKAGE {engine}")
+    sgbdr.execute_query("POP DANS tmp VALEURS (1), (2)")
+    sgbdr.execute_query("DEPOP TABLEAU f")
+    sgbdr.execute_query("CRAFTER INDEX idx_n SUR e(n)")
+    assert "f" not in sgbdr.catalog_manager.get().tables
+    sgbdr.execute_query("ANNULER TRANSACTION")
+
+    catalog = sgbdr.catalog_manager.get()
+    assert "tmp" not in catalog.tables and not catalog.has_index("idx_n")
+    assert rows(sgbdr, "f") == before
+    assert rows(sgbdr, "f", "id = '40'") == [{"id": 40, "v": "v40"}]
+    assert rows(sgbdr, "e", "id = '1000'") == []
+    assert len(rows(sgbdr, "e", "n = '3'")) == 30
+
+
+def test_annuler_apres_changement_de_base(sgbdr):
+    sgbdr.execute_query("CRAFTER TABLEAU a (id INT PRIMARY KEY)")
+    sgbdr.execute_query("POP DANS a VALEURS (1)")
+    sgbdr.execute_query("DEBUT TRANSACTION")
+    sgbdr.execute_query("POP DANS a VALEURS (2)")
+    sgbdr.execute_query("CRAFTER BASE u")
+    sgbdr.execute_query("UTILISER u")
+    sgbdr.execute_query("ANNULER TRANSACTION")
+    sgbdr.execute_query("UTILISER t")
+    assert rows(sgbdr, "a") == [{"id": 1}]
+
+
+def test_valider_sans_transaction(sgbdr):
+    with pytest.raises(ValueError):
+        sgbdr.execute_query("VALIDER TRANSACTION")
+
+
+# --- Crash (processus arrêté par os._exit) puis réouverture ---
+
+def _setup_queries(engine):
+    return [LOGIN, "CRAFTER BASE t", "UTILISER t",
+            f"CRAFTER TABLEAU e (id INT PRIMARY KEY, nom TEXT) STOCKAGE {engine}",
+            "POP DANS e VALEURS (1, 'validée')"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_crash_avant_valider(db_path, engine):
+    run_then_crash(db_path, _setup_queries(engine) + [
+        "DEBUT TRANSACTION",
+        "POP DANS e VALEURS (2, 'non validée')",
+        "EDIT e DEFINIR nom = 'modifiée' AVEC id = '1'",
+    ])
+    assert rows(open_database(db_path), "e") == [{"id": 1, "nom": "validée"}]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_crash_apres_valider(db_path, engine):
+    run_then_crash(db_path, _setup_queries(engine) + [
+        "DEBUT TRANSACTION",
+        "POP DANS e VALEURS (2, 'validée')",
+        "VALIDER TRANSACTION",
+        "POP DANS e VALEURS (3, 'hors transaction')",
+    ])
+    assert [row["id"] for row in rows(open_database(db_path), "e")] == [1, 2, 3]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_crash_apres_depop_tableau_en_transaction(db_path, engine):
+    # Supprimer une table dans une transaction n'écrit pas les écritures non validées des autres
+    run_then_crash(db_path, _setup_queries(engine) + [
+        "DEBUT TRANSACTION",
+        "POP DANS e VALEURS (2, 'non validée')",
+        "CRAFTER TABLEAU y (id INT)",
+        "DEPOP TABLEAU y",
+    ])
+    assert rows(open_database(db_path), "e") == [{"id": 1, "nom": "validée"}]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_crash_apres_annulation_ddl_imbriquee(db_path, engine):
+    # Annuler une DDL (catalogue restauré) ni ses écritures d'annulation ne rendent durable la transaction englobante
+    run_then_crash(db_path, _setup_queries(engine) + [
+        "DEBUT TRANSACTION",
+        "POP DANS e VALEURS (2, 'non validée')",
+        "DEBUT TRANSACTION",
+        "CRAFTER TABLEAU x (id INT PRIMARY KEY)",
+        "POP DANS x VALEURS (1)",
+        "DEPOP DANS e AVEC id = '1'",
+        "ANNULER TRANSACTION",
+    ])
+    assert rows(open_database(db_path), "e") == [{"id": 1, "nom": "validée"}]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_remplacement_en_transaction(sgbdr, engine):
+    # write_all (VOYAGE TABLEAU, migration) dans une transaction : en mémoire, annulable
+    _fill(sgbdr, engine, count=20)
+    before = rows(sgbdr, "e")
+    storage = sgbdr.storage_manager.get_storage("e")
+    log_size = storage.wal.size()
+    sgbdr.execute_query("DEBUT TRANSACTION")
+    storage.write_all([{"id": 5, "nom": "seule", "n": 1}])
+    # Rien d'écrit dans le journal durable avant VALIDER
+    assert storage.wal.size() == log_size
+    assert rows(sgbdr, "e") == [{"id": 5, "nom": "seule", "n": 1}]
+    sgbdr.execute_query("ANNULER TRANSACTION")
+    assert rows(sgbdr, "e") == before
+
+
+def test_exporter_refuse_en_transaction(sgbdr):
+    sgbdr.execute_query("DEBUT TRANSACTION")
+    with pytest.raises(ValueError):
+        sgbdr.execute_query("EXPORTER BASE t")
@@ -0,0 +1,39 @@
+# tests/test_validation.py
+import pytest
+
+from conftest import rows
+
+
+@pytest.fixture
+def typed(sgbdr):
+    sgbdr.execute_query("CRAFTER TABLEAU v (id INT PRIMARY KEY, i INT, f FLOAT, b BOOLEAN, d DATE, "
+                        "c VARCHAR(3), n INT NOT NULL)")
+    sgbdr.execute_query("POP DANS v VALEURS (1, 1, 1.5, true, '2024-01-01', 'abc', 0)")
+    return sgbdr
+
+
+@pytest.mark.parametrize("column, value, stored", [
+    ("i", "-7", -7), ("f", "2.25", 2.25), ("b", "FALSE", False), ("d", "2024-02-29", "2024-02-29"),
+    ("c", "xy", "xy"), ("i", "null", None),
+])
+def test_insertion_et_mise_a_jour_stockent_la_meme_valeur(typed, column, value, stored):
+    values = {"id": "2", "i": "1", "f": "1.5", "b": "true", "d": "2024-01-01", "c": "abc", "n": "0", column: value}
+    quoted = ", ".join(f"'{values[name]}'" for name in ("id", "i", "f", "b", "d", "c", "n"))
+    typed.execute_query(f"POP DANS v VALEURS ({quoted})")
+    typed.execute_query(f"EDIT v DEFINIR {column} = '{value}' AVEC id = '1'")
+    assert rows(typed, "v", "id = '1'")[0][column] == stored
+    assert rows(typed, "v", "id = '2'")[0][column] == stored
+
+
+@pytest.mark.parametrize("column, value", [
+    ("i", "1.5"), ("f", "abc"), ("b", "maybe"), ("d", "2024-02-30"), ("d", "01/02/2024"),
+    ("c", "abcd"), ("n", "null"),
+])
+def test_insertion_et_mise_a_jour_refusent_la_meme_valeur(typed, column, value):
+    values = {"id": "2", "i": "1", "f": "1.5", "b": "true", "d": "2024-01-01", "c": "abc", "n": "0", column: value}
+    quoted = ", ".join(f"'{values[name]}'" for name in ("id", "i", "f", "b", "d", "c", "n"))
+    with pytest.raises(ValueError) as insert_error:
+        typed.execute_query(f"POP DANS v VALEURS ({quoted})")
+    with pytest.raises(ValueError) as update_error:
+        typed.execute_query(f"EDIT v DEFINIR {column} = '{value}' AVEC id = '1'")
+    assert str(insert_error.value) == str(update_error.value)
@@ -0,0 +1,77 @@
+# tests/test_wal.py
+import json
+import zlib
+
+import pytest
+
+from conftest import ENGINES, LOGIN, open_database, rows, run_then_crash
+
+# Écritures journalisées (une par requête) après la création de la table, sans checkpoint
+WRITES = [
+    "POP DANS e VALEURS (1, 'a'), (2, 'b'), (3, 'c')",
+    "POP DANS e VALEURS (4, 'd')",
+    "EDIT e DEFINIR nom = 'modifiée' AVEC id = 2",
+    "DEPOP DANS e AVEC id = 1",
+]
+EXPECTED = [{"id": 2, "nom": "modifiée"}, {"id": 3, "nom": "c"}, {"id": 4, "nom": "d"}]
+
+
+def _crash(db_path, engine, queries=WRITES):
+    run_then_crash(db_path, [LOGIN, "CRAFTER BASE t", "UTILISER t",
+                             f"CRAFTER TABLEAU e (id INT PRIMARY KEY, nom TEXT) STOCKAGE {engine}"] + queries)
+    return db_path / "t" / "_wal" / "wal.log"
+
+
+def _replayed(capsys):
+    out = capsys.readouterr().out
+    return [line for line in out.splitlines() if "rejouées depuis le WAL" in line]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_rejeu_apres_crash(db_path, engine, capsys):
+    log_path = _crash(db_path, engine)
+    ops = [json.loads(line.split(" ", 1)[1])["op"] for line in log_path.read_text().splitlines()]
+    assert ops == ["insert_many", "insert", "update", "delete"]
+    capsys.readouterr()
+    sgbdr = open_database(db_path)
+    assert _replayed(capsys) == ["║ Base t : 4 écritures rejouées depuis le WAL"]
+    assert rows(sgbdr, "e") == EXPECTED
+    assert rows(sgbdr, "e", "id = 4") == [{"id": 4, "nom": "d"}]
+    # Rejeu suivi d'un checkpoint : le journal est vidé, rien n'est rejoué à la réouverture suivante
+    assert log_path.read_text() == ""
+    sgbdr.wal_manager.stop_checkpointer()
+    assert rows(open_database(db_path), "e") == EXPECTED
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_rejeu_apres_checkpoint(db_path, engine, capsys):
+    # Premier rejeu suivi d'un checkpoint : seules les écritures du second crash sont rejouées
+    _crash(db_path, engine, WRITES[:2])
+    open_database(db_path).wal_manager.stop_checkpointer()
+    run_then_crash(db_path, [LOGIN, "UTILISER t"] + WRITES[2:])
+    capsys.readouterr()
+    sgbdr = open_database(db_path)
+    assert _replayed(capsys) == ["║ Base t : 2 écritures rejouées depuis le WAL"]
+    assert rows(sgbdr, "e") == EXPECTED
+
+
+def _record(lsn, op, **payload):
+    return json.dumps({"lsn": lsn, "table": "e", "op": op, **payload}, separators=(",", ":"))
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("tail", [
+    # CRC faux (enregistrement corrompu), suivi d'un enregistrement valide jamais atteint
+    f"00000000 {_record(5, 'delete', rids=[0])}\n"
+    f"{zlib.crc32(_record(6, 'delete', rids=[1]).encode()):08x} {_record(6, 'delete', rids=[1])}\n",
+    # Dernière ligne tronquée par la coupure
+    _record(5, "delete", rids=[0])[:20],
+])
+def test_enregistrement_final_invalide_ignore(db_path, engine, tail, capsys):
+    log_path = _crash(db_path, engine)
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(tail)
+    capsys.readouterr()
+    sgbdr = open_database(db_path)
+    assert _replayed(capsys) == ["║ Base t : 4 écritures rejouées depuis le WAL"]
+    assert rows(sgbdr, "e") == EXPECTED